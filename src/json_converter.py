@@ -1,11 +1,31 @@
 import json
-import pandas as pd
+import multiprocessing
 import os
+import queue
+import sys
+import threading
 import tkinter as tk
-from tkinter import filedialog, scrolledtext, messagebox, ttk
+from tkinter import filedialog, scrolledtext, messagebox, simpledialog, ttk
 from tkinter import font as tkFont
-from pandas import json_normalize
-import numpy as np
+
+# Add the utils directory to path to import the shared flattening engine
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'utils'))
+from flattener import (FlatTable, PathSelector, EXCLUDED, PARTIAL, SPARSE_DENSITY_THRESHOLD, conversion_options,
+                       flatten_file, parse_path_patterns)
+from frame_stats import memory_usage, missing_values, sparse_column_count
+from exporters import excel_sheet_ranges, split_data_sheets, stringify_nested, write_excel
+from merge_files import convert_in_chunks, merge_json_files
+from memory_guard import check_memory_budget
+from batch_jobs import BatchJob
+from column_index import ColumnIndex
+from table_query import TableQuery
+from path_profile import PathProfile
+from conversion_cache import ConversionCache
+from table_file import TABLE_EXTENSIONS, is_table_file, load_table, save_table, table_metadata
+from sqlite_writer import is_sqlite_file, write_sqlite
+from incremental import append_records
+from type_coercion import TypeCoercer
+from json_stream import iter_file_records
 
 class JSONToTabularConverter:
     def __init__(self, root):
@@ -16,7 +36,30 @@ class JSONToTabularConverter:
         
         # Data storage
         self.json_data = None
+        self.json_digest = None
+        self.flat_table = None
+        self.flat_table_filters = None
         self.flattened_df = None
+        # Flattening started in the background after a cache hit: (thread, result, JSON data, filters)
+        self.flat_table_build = None
+        
+        # Column paging of the tabular view
+        self.column_index = None
+        self.column_page = 0
+        
+        # Path statistics of the loaded JSON and the structure tree items materialized so far
+        self.path_profile = None
+        self.structure_items = {}
+        
+        # Filter/search/sort of the tabular view: row positions into flattened_df (None: all rows)
+        self.table_query = None
+        self.row_view = None
+        
+        # Cache of flattened results for files converted before
+        try:
+            self.cache = ConversionCache()
+        except OSError:
+            self.cache = None
         
         # Configure styles
         self.setup_styles()
@@ -123,7 +166,21 @@ class JSONToTabularConverter:
             pady=10,
             cursor="hand2"
         )
-        batch_btn.pack(side="left", padx=(0, 15))
+        batch_btn.pack(side="left", padx=(0, 10))
+        
+        merge_btn = tk.Button(
+            controls_frame,
+            text="🧩 Merge Files",
+            command=self.merge_files,
+            font=self.fonts['normal'],
+            bg=self.colors['success'],
+            fg=self.colors['white'],
+            relief="flat",
+            padx=15,
+            pady=10,
+            cursor="hand2"
+        )
+        merge_btn.pack(side="left", padx=(0, 15))
         
         file_label = tk.Label(
             controls_frame,
@@ -156,6 +213,11 @@ class JSONToTabularConverter:
         self.max_level_var = tk.StringVar(value="")
         self.handle_arrays_var = tk.BooleanVar(value=True)
         self.remove_nulls_var = tk.BooleanVar(value=False)
+        self.sparse_var = tk.BooleanVar(value=False)
+        self.categorical_var = tk.BooleanVar(value=False)
+        self.infer_types_var = tk.BooleanVar(value=False)
+        self.select_var = tk.StringVar(value="")
+        self.where_var = tk.StringVar(value="")
         
         # Separator option
         sep_frame = tk.Frame(options_frame, bg=self.colors['white'])
@@ -195,6 +257,44 @@ class JSONToTabularConverter:
         )
         level_entry.pack(side="left", padx=(10, 0))
         
+        # Path selection option
+        select_frame = tk.Frame(options_frame, bg=self.colors['white'])
+        select_frame.pack(anchor="w", pady=5)
+        
+        tk.Label(
+            select_frame,
+            text="Include only paths (comma-separated, e.g. employee.address.*; !notes excludes):",
+            font=self.fonts['normal'],
+            bg=self.colors['white']
+        ).pack(side="left")
+        
+        select_entry = tk.Entry(
+            select_frame,
+            textvariable=self.select_var,
+            font=self.fonts['normal'],
+            width=40
+        )
+        select_entry.pack(side="left", padx=(10, 0))
+        
+        # Row filter option
+        where_frame = tk.Frame(options_frame, bg=self.colors['white'])
+        where_frame.pack(anchor="w", pady=5)
+        
+        tk.Label(
+            where_frame,
+            text='Keep only rows where (e.g. status == "active"):',
+            font=self.fonts['normal'],
+            bg=self.colors['white']
+        ).pack(side="left")
+        
+        where_entry = tk.Entry(
+            where_frame,
+            textvariable=self.where_var,
+            font=self.fonts['normal'],
+            width=40
+        )
+        where_entry.pack(side="left", padx=(10, 0))
+        
         # Checkboxes
         tk.Checkbutton(
             options_frame,
@@ -212,6 +312,30 @@ class JSONToTabularConverter:
             bg=self.colors['white']
         ).pack(anchor="w", pady=2)
         
+        tk.Checkbutton(
+            options_frame,
+            text="Sparse storage for mostly-empty columns",
+            variable=self.sparse_var,
+            font=self.fonts['normal'],
+            bg=self.colors['white']
+        ).pack(anchor="w", pady=2)
+        
+        tk.Checkbutton(
+            options_frame,
+            text="Store repeated text values as categories",
+            variable=self.categorical_var,
+            font=self.fonts['normal'],
+            bg=self.colors['white']
+        ).pack(anchor="w", pady=2)
+        
+        tk.Checkbutton(
+            options_frame,
+            text="Convert text that looks like dates, numbers or true/false",
+            variable=self.infer_types_var,
+            font=self.fonts['normal'],
+            bg=self.colors['white']
+        ).pack(anchor="w", pady=2)
+        
         # Convert button
         convert_btn = tk.Button(
             conversion_frame,
@@ -263,19 +387,144 @@ class JSONToTabularConverter:
         )
         self.json_text.pack(fill="both", expand=True, padx=10, pady=10)
         
+        # Structure tab: tree of key paths, children are inserted only when a node is opened
+        self.structure_frame = tk.Frame(self.notebook, bg=self.colors['white'])
+        self.notebook.add(self.structure_frame, text="🌳 Structure")
+        
+        structure_bar = tk.Frame(self.structure_frame, bg=self.colors['white'])
+        structure_bar.pack(fill="x", padx=10, pady=(10, 0))
+        
+        tk.Label(
+            structure_bar,
+            text="Double-click a path to include or exclude it from flattening",
+            font=self.fonts['small'],
+            bg=self.colors['white'],
+            fg=self.colors['secondary']
+        ).pack(side="left")
+        
+        tk.Button(
+            structure_bar,
+            text="Include / Exclude",
+            command=self.toggle_structure_path,
+            font=self.fonts['small'],
+            bg=self.colors['primary'],
+            fg=self.colors['white'],
+            relief="flat",
+            padx=10,
+            cursor="hand2"
+        ).pack(side="right")
+        
+        tree_frame = tk.Frame(self.structure_frame, bg=self.colors['white'])
+        tree_frame.pack(fill="both", expand=True, padx=10, pady=(5, 10))
+        
+        self.structure_tree = ttk.Treeview(tree_frame, columns=("records", "types", "arrays", "flatten"))
+        for column, heading, width, anchor in (("#0", "Path", 260, "w"), ("records", "Records", 110, "e"),
+                                               ("types", "Types", 260, "w"), ("arrays", "Array lengths", 140, "w"),
+                                               ("flatten", "Flatten", 70, "center")):
+            self.structure_tree.heading(column, text=heading, anchor=anchor)
+            self.structure_tree.column(column, width=width, anchor=anchor, stretch=column in ("#0", "types"))
+        tree_scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.structure_tree.yview)
+        self.structure_tree.configure(yscrollcommand=tree_scroll.set)
+        self.structure_tree.pack(side="left", fill="both", expand=True)
+        tree_scroll.pack(side="right", fill="y")
+        
+        self.structure_tree.bind("<<TreeviewOpen>>", self.expand_structure_node)
+        self.structure_tree.bind("<Double-Button-1>", self.toggle_structure_path)
+        self.select_var.trace_add("write", lambda *_: self.refresh_structure_flags())
+        
         # Tabular data tab
         self.tabular_frame = tk.Frame(self.notebook, bg=self.colors['white'])
         self.notebook.add(self.tabular_frame, text="📋 Tabular Data")
         
+        # Column paging bar: only the columns on the current page are rendered
+        column_bar = tk.Frame(self.tabular_frame, bg=self.colors['white'])
+        column_bar.pack(fill="x", padx=10, pady=(10, 0))
+        
+        for text, step in (("◀ Columns", -1), ("Columns ▶", 1)):
+            tk.Button(
+                column_bar,
+                text=text,
+                command=lambda step=step: self.show_column_page(self.column_page + step),
+                font=self.fonts['small'],
+                bg=self.colors['light'],
+                fg=self.colors['dark'],
+                relief="flat",
+                padx=10,
+                cursor="hand2"
+            ).pack(side="left", padx=(0, 5))
+        
+        self.column_page_var = tk.StringVar(value="")
+        tk.Label(
+            column_bar,
+            textvariable=self.column_page_var,
+            font=self.fonts['small'],
+            bg=self.colors['white'],
+            fg=self.colors['secondary']
+        ).pack(side="left", padx=10)
+        
+        tk.Button(
+            column_bar,
+            text="🔎 Find Column",
+            command=self.show_column_browser,
+            font=self.fonts['small'],
+            bg=self.colors['primary'],
+            fg=self.colors['white'],
+            relief="flat",
+            padx=10,
+            cursor="hand2"
+        ).pack(side="right")
+        
+        # Query bar: filters, searches and sorts through cached column indexes without copying the frame
+        query_bar = tk.Frame(self.tabular_frame, bg=self.colors['white'])
+        query_bar.pack(fill="x", padx=10, pady=(5, 0))
+        
+        self.row_filter_var = tk.StringVar()
+        self.row_search_var = tk.StringVar()
+        for label, variable, width in (("Filter:", self.row_filter_var, 40), ("Search:", self.row_search_var, 20)):
+            tk.Label(query_bar, text=label, font=self.fonts['small'],
+                     bg=self.colors['white'], fg=self.colors['dark']).pack(side="left")
+            entry = tk.Entry(query_bar, textvariable=variable, width=width, font=self.fonts['small'], relief="solid", bd=1)
+            entry.pack(side="left", padx=(5, 10))
+            entry.bind("<Return>", lambda _: self.apply_row_query())
+        
+        tk.Label(query_bar, text="Sort by:", font=self.fonts['small'],
+                 bg=self.colors['white'], fg=self.colors['dark']).pack(side="left")
+        self.sort_column_var = tk.StringVar()
+        self.sort_column_combo = ttk.Combobox(query_bar, textvariable=self.sort_column_var, width=24, state="readonly")
+        self.sort_column_combo.pack(side="left", padx=(5, 5))
+        self.sort_descending_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(query_bar, text="Descending", variable=self.sort_descending_var, font=self.fonts['small'],
+                       bg=self.colors['white']).pack(side="left", padx=(0, 10))
+        
+        for text, command, bg in (("Apply", self.apply_row_query, self.colors['primary']),
+                                  ("Clear", self.clear_row_query, self.colors['light'])):
+            tk.Button(
+                query_bar,
+                text=text,
+                command=command,
+                font=self.fonts['small'],
+                bg=bg,
+                fg=self.colors['white'] if bg == self.colors['primary'] else self.colors['dark'],
+                relief="flat",
+                padx=10,
+                cursor="hand2"
+            ).pack(side="left", padx=(0, 5))
+        
+        self.row_view_var = tk.StringVar(value="")
+        tk.Label(query_bar, textvariable=self.row_view_var, font=self.fonts['small'],
+                 bg=self.colors['white'], fg=self.colors['secondary']).pack(side="right")
+        
         self.tabular_text = scrolledtext.ScrolledText(
             self.tabular_frame,
             font=tkFont.Font(family="Courier", size=9),
             bg=self.colors['light'],
             relief="flat",
             padx=15,
-            pady=15
+            pady=15,
+            wrap="none"
         )
-        self.tabular_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.tabular_text.tag_configure("found_column", background="#fde68a")
+        self.tabular_text.pack(fill="both", expand=True, padx=10, pady=(5, 10))
         
         # Summary tab
         self.summary_frame = tk.Frame(self.notebook, bg=self.colors['white'])
@@ -316,6 +565,7 @@ class JSONToTabularConverter:
                 title="Select JSON File",
                 filetypes=[
                     ("JSON files", "*.json"),
+                    ("Saved tables", " ".join(f"*{extension}" for extension in TABLE_EXTENSIONS)),
                     ("All files", "*.*")
                 ]
             )
@@ -329,11 +579,32 @@ class JSONToTabularConverter:
 
     def load_json_file(self, file_path):
         """Load and display JSON file"""
+        if is_table_file(file_path):
+            self.open_table_file(file_path)
+            return
+        
         try:
+            self.update_status("Checking memory needs...")
+            
+            # Files too large to hold in memory are streamed straight to an output file instead
+            budget_check = check_memory_budget(file_path)
+            if not budget_check['fits']:
+                self.convert_over_budget(file_path, budget_check)
+                return
+            
             self.update_status("Loading JSON file...")
             
-            with open(file_path, 'r', encoding='utf-8') as file:
-                self.json_data = json.load(file)
+            with open(file_path, 'rb') as file:
+                raw_data = file.read()
+            self.json_data = json.loads(raw_data.decode('utf-8'))
+            
+            # Identify the contents so conversions can be served from the cache
+            if self.cache is not None:
+                self.json_digest = self.cache.digest_bytes(raw_data)
+                self.cache.remember_digest(file_path, self.json_digest)
+            
+            # Flattening is redone lazily on the next conversion
+            self.flat_table = None
             
             # Store the current file name for export purposes
             self.current_file_name = os.path.basename(file_path)
@@ -343,12 +614,197 @@ class JSONToTabularConverter:
             formatted_json = json.dumps(self.json_data, indent=2, ensure_ascii=False)
             self.json_text.insert(tk.END, formatted_json)
             
+            # Collect path statistics in one scan; the tree shows them a level at a time
+            self.path_profile = PathProfile.from_json(self.json_data)
+            self.display_structure()
+            self.display_scan_summary()
+            
             self.update_status(f"JSON file loaded successfully: {os.path.basename(file_path)}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load JSON file: {str(e)}")
             self.update_status("Error loading JSON file")
 
+    def convert_over_budget(self, file_path, budget_check):
+        """Convert a file that would not fit in the memory budget in chunks, without loading it"""
+        needed = budget_check['estimated_bytes'] / 1024 / 1024
+        budget = budget_check['budget_bytes'] / 1024 / 1024
+        
+        # Nothing from a previous file should be exported as if it were this one
+        self.json_data = None
+        self.flat_table = None
+        self.flattened_df = None
+        self.column_index = None
+        self.table_query = None
+        self.path_profile = None
+        self.json_text.delete(1.0, tk.END)
+        self.json_text.insert(tk.END, f"{os.path.basename(file_path)} is too large to preview "
+                                      f"(about {needed:,.0f} MB needed, budget {budget:,.0f} MB).")
+        self.display_structure()
+        self.display_tabular_data()
+        self.summary_text.delete(1.0, tk.END)
+        
+        if not messagebox.askokcancel(
+            "Large File",
+            f"Loading {os.path.basename(file_path)} would need about {needed:,.0f} MB of memory, "
+            f"more than the {budget:,.0f} MB budget.\n\n"
+            "It will be converted in streaming mode straight to an output file instead, "
+            "using the current separator, nesting level, path and row filter options. "
+            "Set JSON_TABULAR_MEMORY_BUDGET_MB to change the budget.\n\nChoose where to save it?"
+        ):
+            self.update_status("Large file not loaded")
+            return
+        
+        output_file = filedialog.asksaveasfilename(
+            title="Save Converted File",
+            defaultextension=".xlsx",
+            initialfile=f"{os.path.splitext(os.path.basename(file_path))[0]}_converted.xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet"),
+                       ("Saved tables", "*.feather"), ("SQLite databases", "*.db *.sqlite")]
+        )
+        if not output_file:
+            self.update_status("Large file not loaded")
+            return
+        
+        try:
+            self.update_status("Converting in chunks...")
+            self.root.update_idletasks()
+            max_level = self.max_level_var.get()
+            options = dict(
+                separator=self.separator_var.get() or "_",
+                max_level=int(max_level) if max_level.isdigit() else None,
+                select=parse_path_patterns(self.select_var.get()),
+                where=self.where_var.get().strip() or None
+            )
+            if is_sqlite_file(output_file):
+                # The SQLite writer streams chunks itself
+                result = write_sqlite(iter_file_records(file_path), output_file, **options)
+                messagebox.showinfo("Success", f"Converted to:\n{output_file}\n\n"
+                                               f"{result['rows']:,} rows × {result['columns']:,} columns, "
+                                               f"{len(result['tables']) - 1} child tables")
+            else:
+                result = convert_in_chunks(file_path, output_file, **options)
+                messagebox.showinfo("Success", f"Converted in {result['chunks']} chunks to:\n{output_file}\n\n"
+                                               f"{result['rows']:,} rows × {result['columns']:,} columns")
+            self.update_status(f"Converted {os.path.basename(file_path)} in chunks")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to convert file: {str(e)}")
+            self.update_status("Error during chunked conversion")
+
+    def open_table_file(self, file_path):
+        """Open a saved table: it is already flattened, so it is shown and ready to export at once"""
+        try:
+            self.update_status("Opening saved table...")
+            self.root.update_idletasks()
+            df, metadata = load_table(file_path)
+            
+            # The table replaces the JSON; there is nothing left to flatten
+            self.json_data = None
+            self.json_digest = None
+            self.flat_table = None
+            self.path_profile = None
+            self.flattened_df = df
+            self.current_file_name = metadata.get('source') or os.path.basename(file_path)
+            
+            # Exports and column paths use the options the table was produced with
+            options = metadata.get('options', {})
+            self.separator_var.set(options.get('separator') or "_")
+            max_level = options.get('max_level')
+            self.max_level_var.set(str(max_level) if max_level is not None else "")
+            
+            self.json_text.delete(1.0, tk.END)
+            self.json_text.insert(tk.END, json.dumps(metadata, indent=2, ensure_ascii=False))
+            self.display_structure()
+            self.display_tabular_data()
+            self.display_summary()
+            self.create_export_section()
+            
+            self.update_status(f"Saved table opened: {os.path.basename(file_path)} "
+                               f"({len(df):,} rows × {len(df.columns):,} columns)")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open table: {str(e)}")
+            self.update_status("Error opening table")
+
+    def display_structure(self):
+        """Show the top-level paths of the loaded JSON in the structure tree"""
+        self.structure_tree.delete(*self.structure_tree.get_children())
+        self.structure_items = {}
+        if self.path_profile is not None:
+            self.insert_structure_children("", self.path_profile)
+
+    def insert_structure_children(self, parent_item, stats):
+        """Insert the child paths of stats under a tree item"""
+        records = max(self.path_profile.count, 1)
+        selector = self.structure_selector()
+        for key, child in stats.children.items():
+            item = self.structure_tree.insert(
+                parent_item, tk.END, text=str(key),
+                values=(f"{child.count:,} ({child.count / records:.0%})", child.type_summary(), child.array_summary(),
+                        self.structure_flag(selector, child))
+            )
+            self.structure_items[item] = child
+            if child.children:
+                # Placeholder so the node can be opened; replaced by the real children on first open
+                self.structure_tree.insert(item, tk.END, text="…")
+
+    def expand_structure_node(self, event=None):
+        """Materialize the children of the node being opened"""
+        item = self.structure_tree.focus()
+        stats = self.structure_items.get(item)
+        children = self.structure_tree.get_children(item)
+        if stats is not None and children and children[0] not in self.structure_items:
+            self.structure_tree.delete(*children)
+            self.insert_structure_children(item, stats)
+
+    def structure_selector(self):
+        """Return a PathSelector for the current path patterns, or None when all paths are kept"""
+        patterns = parse_path_patterns(self.select_var.get())
+        return PathSelector(patterns) if patterns else None
+
+    @staticmethod
+    def structure_flag(selector, stats):
+        """Return ✓ (flattened), ✗ (not flattened) or ◐ (only some descendants flattened) for a path"""
+        if selector is None:
+            return "✓"
+        decision = selector.decide(stats.path)
+        if decision == EXCLUDED or (decision == PARTIAL and not stats.children):
+            return "✗"
+        if decision == PARTIAL or selector.excludes_below(stats.path):
+            return "◐"
+        return "✓"
+
+    def refresh_structure_flags(self):
+        """Update the Flatten column of the materialized tree items"""
+        selector = self.structure_selector()
+        for item, stats in self.structure_items.items():
+            self.structure_tree.set(item, "flatten", self.structure_flag(selector, stats))
+
+    def toggle_structure_path(self, event=None):
+        """Include or exclude the selected path by editing the path patterns"""
+        stats = self.structure_items.get(self.structure_tree.focus())
+        if stats is None:
+            return
+        
+        path = stats.dotted
+        patterns = parse_path_patterns(self.select_var.get()) or []
+        if f"!{path}" in patterns:
+            patterns.remove(f"!{path}")
+        elif path in patterns:
+            patterns.remove(path)
+        elif self.structure_flag(self.structure_selector(), stats) == "✗":
+            covering = [pattern for pattern in patterns
+                        if pattern.startswith("!") and PathSelector([pattern]).decide(stats.path) == EXCLUDED]
+            if covering:
+                messagebox.showinfo("Info", f"{path} is excluded by {', '.join(covering)}; remove that exclusion first.")
+                return "break"
+            patterns.append(path)
+        else:
+            patterns.append(f"!{path}")
+        self.select_var.set(", ".join(patterns))
+        self.update_status(f"Path patterns: {self.select_var.get() or 'all paths'}")
+        return "break"
+
     def convert_json_to_tabular(self):
         """Convert JSON to tabular format"""
         if not self.json_data:
@@ -363,28 +819,39 @@ class JSONToTabularConverter:
             max_level = self.max_level_var.get()
             max_level = int(max_level) if max_level.isdigit() else None
             
-            # Convert JSON to DataFrame
-            if isinstance(self.json_data, list):
-                # Handle array of objects
-                self.flattened_df = json_normalize(
-                    self.json_data,
-                    sep=separator,
-                    max_level=max_level
-                )
-            elif isinstance(self.json_data, dict):
-                # Handle single object
-                self.flattened_df = json_normalize(
-                    [self.json_data],
-                    sep=separator,
-                    max_level=max_level
-                )
+            remove_nulls = self.remove_nulls_var.get()
+            select = parse_path_patterns(self.select_var.get())
+            where = self.where_var.get().strip() or None
+            sparse_threshold = SPARSE_DENSITY_THRESHOLD if self.sparse_var.get() else None
+            categorical = self.categorical_var.get()
+            
+            options = conversion_options(separator, max_level, remove_nulls, select, where, sparse_threshold, categorical)
+            
+            # Flatten once per loaded file, path selection and row filter; other option changes reuse the flattened table
+            self.flattened_df = None
+            self.finish_flat_table_build()
+            if self.flat_table is None or self.flat_table_filters != (select, where):
+                if self.cache is not None:
+                    self.flattened_df = self.cache.get(self.json_digest, options)
+                    if self.flattened_df is not None:
+                        # Shown at once; the table for later option changes is flattened in the background
+                        self.start_flat_table_build(select, where)
+                
+                if self.flattened_df is None:
+                    self.flat_table = FlatTable.from_json(self.json_data, select=select, where=where)
+                    self.flat_table_filters = (select, where)
+                    self.flattened_df = self.flat_table.to_dataframe(separator, max_level, remove_nulls, sparse_threshold, categorical)
+                    if self.cache is not None:
+                        try:
+                            self.cache.put(self.json_digest, options, self.flattened_df)
+                        except OSError:
+                            pass  # Caching is best-effort
             else:
-                raise ValueError("JSON data must be an object or array of objects")
+                self.flattened_df = self.flat_table.to_dataframe(separator, max_level, remove_nulls, sparse_threshold, categorical)
             
-            # Post-processing options
-            if self.remove_nulls_var.get():
-                self.flattened_df = self.flattened_df.dropna(how='all', axis=1)
-                self.flattened_df = self.flattened_df.replace('', np.nan).dropna(how='all', axis=1)
+            # Typed after caching, so the cached table serves both settings
+            if self.infer_types_var.get():
+                self.flattened_df = TypeCoercer(infer=True).coerce_frame(self.flattened_df)
             
             # Display results
             self.display_tabular_data()
@@ -399,17 +866,186 @@ class JSONToTabularConverter:
             messagebox.showerror("Error", f"Failed to convert JSON: {str(e)}")
             self.update_status("Error during conversion")
 
+    def start_flat_table_build(self, select, where):
+        """Flatten the loaded JSON in a worker thread, so option changes after a cache hit reuse the table"""
+        json_data = self.json_data
+        result = {}
+        
+        def build():
+            # No Tk calls here: the table is picked up by finish_flat_table_build()
+            result['table'] = FlatTable.from_json(json_data, select=select, where=where)
+        
+        thread = threading.Thread(target=build, daemon=True)
+        self.flat_table_build = (thread, result, json_data, (select, where))
+        thread.start()
+
+    def finish_flat_table_build(self):
+        """Adopt the table flattened in the background, waiting for it if it is still running"""
+        if self.flat_table_build is None:
+            return
+        thread, result, json_data, filters = self.flat_table_build
+        self.flat_table_build = None
+        if json_data is not self.json_data:
+            return  # Another file was loaded since; its table is not wanted
+        thread.join()
+        if 'table' in result:
+            self.flat_table = result['table']
+            self.flat_table_filters = filters
+
     def display_tabular_data(self):
-        """Display the converted tabular data"""
+        """Display the converted tabular data, one page of columns at a time"""
+        if self.flattened_df is not None:
+            self.column_index = ColumnIndex(self.flattened_df.columns)
+            # Column indexes are built on the first query that needs them
+            self.table_query = TableQuery(self.flattened_df, self.separator_var.get() or "_")
+            self.sort_column_combo['values'] = [""] + self.column_index.names
+        self.row_view = None
+        self.sort_column_var.set("")
+        self.show_column_page(self.column_page)
+
+    def apply_row_query(self):
+        """Filter, search and sort the tabular view with the query bar settings"""
+        if self.table_query is None:
+            messagebox.showwarning("Warning", "Convert a JSON file first!")
+            return
+        
+        filter_text = self.row_filter_var.get().strip()
+        search_text = self.row_search_var.get().strip()
+        sort_column = self.sort_column_var.get() or None
+        try:
+            self.update_status("Querying rows...")
+            if filter_text or search_text or sort_column:
+                self.row_view = self.table_query.view(filter_text, search_text, sort_column, self.sort_descending_var.get())
+            else:
+                self.row_view = None
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid filter: {str(e)}")
+            self.update_status("Invalid filter")
+            return
+        
+        self.show_column_page(self.column_page)
+        self.update_status(self.row_view_var.get())
+
+    def clear_row_query(self):
+        """Show all rows in their original order again"""
+        self.row_filter_var.set("")
+        self.row_search_var.set("")
+        self.sort_column_var.set("")
+        self.sort_descending_var.set(False)
+        self.row_view = None
+        self.show_column_page(self.column_page)
+
+    def show_column_page(self, page, highlight=None):
+        """Render the first 100 rows of the columns on a page"""
         self.tabular_text.delete(1.0, tk.END)
+        if self.flattened_df is None or self.column_index is None:
+            self.column_page_var.set("")
+            self.row_view_var.set("")
+            return
         
-        if self.flattened_df is not None:
-            # Display as formatted table
-            tabular_str = self.flattened_df.to_string(index=False, max_rows=100)
-            self.tabular_text.insert(tk.END, tabular_str)
-            
-            if len(self.flattened_df) > 100:
-                self.tabular_text.insert(tk.END, f"\n\n... and {len(self.flattened_df) - 100} more rows")
+        positions = self.column_index.page(page)
+        self.column_page = self.column_index.page_of(positions.start) if len(positions) else 0
+        self.column_page_var.set(
+            f"Columns {positions.start + 1:,}–{positions.stop:,} of {len(self.column_index):,} "
+            f"(page {self.column_page + 1} of {self.column_index.page_count})" if len(positions) else "No columns"
+        )
+        
+        # Display as formatted table; only the shown rows are taken from the frame
+        n_rows = len(self.flattened_df) if self.row_view is None else len(self.row_view)
+        rows = slice(0, 100) if self.row_view is None else self.row_view[:100]
+        view = self.flattened_df.iloc[rows, positions.start:positions.stop]
+        self.tabular_text.insert(tk.END, view.to_string(index=False))
+        self.row_view_var.set(
+            f"{n_rows:,} of {len(self.flattened_df):,} rows match" if self.row_view is not None
+            else f"{n_rows:,} rows"
+        )
+        
+        if n_rows > 100:
+            self.tabular_text.insert(tk.END, f"\n\n... and {n_rows - 100} more rows")
+        
+        if highlight is not None:
+            start = self.tabular_text.search(highlight, "1.0", stopindex="1.end")
+            if start:
+                self.tabular_text.tag_add("found_column", start, f"{start}+{len(highlight)}c")
+                self.tabular_text.see(start)
+
+    def show_column(self, position):
+        """Jump to the page holding a column and highlight it"""
+        name = self.column_index.names[position]
+        self.show_column_page(self.column_index.page_of(position), highlight=name)
+        self.notebook.select(self.tabular_frame)
+        self.update_status(f"Showing column {position + 1:,}: {name}")
+
+    def show_column_browser(self):
+        """Open a searchable list of all columns; choosing one jumps to it"""
+        if self.column_index is None:
+            messagebox.showwarning("Warning", "Convert a JSON file first!")
+            return
+        
+        browser = tk.Toplevel(self.root)
+        browser.title("Find Column")
+        browser.geometry("420x480")
+        browser.configure(bg=self.colors['white'])
+        browser.transient(self.root)
+        
+        frame = tk.Frame(browser, bg=self.colors['white'], padx=15, pady=15)
+        frame.pack(fill="both", expand=True)
+        
+        search_var = tk.StringVar()
+        search_entry = tk.Entry(frame, textvariable=search_var, font=self.fonts['normal'], relief="solid", bd=1)
+        search_entry.pack(fill="x")
+        
+        count_var = tk.StringVar()
+        tk.Label(frame, textvariable=count_var, font=self.fonts['small'],
+                 bg=self.colors['white'], fg=self.colors['secondary']).pack(anchor="w", pady=(5, 5))
+        
+        listbox = tk.Listbox(frame, font=("Courier", 9), activestyle="none", relief="flat", bg=self.colors['light'])
+        listbox.pack(fill="both", expand=True)
+        
+        # Only the first matches are listed; the index answers each keystroke without scanning the frame
+        shown = []
+        
+        def refresh(*_):
+            matches = self.column_index.search(search_var.get())
+            shown[:] = matches[:1000]
+            listbox.delete(0, tk.END)
+            for position in shown:
+                listbox.insert(tk.END, f"{position + 1:>6}. {self.column_index.names[position]}")
+            more = f" (showing first {len(shown):,})" if len(matches) > len(shown) else ""
+            count_var.set(f"{len(matches):,} of {len(self.column_index):,} columns{more}")
+        
+        def choose(*_):
+            selection = listbox.curselection()
+            if not selection and shown:
+                selection = (0,)
+            if selection:
+                self.show_column(shown[selection[0]])
+        
+        search_var.trace_add("write", refresh)
+        listbox.bind("<Double-Button-1>", choose)
+        listbox.bind("<Return>", choose)
+        search_entry.bind("<Return>", choose)
+        refresh()
+        search_entry.focus_set()
+
+    def display_scan_summary(self):
+        """Show what a conversion of the loaded file will produce, from the path statistics"""
+        self.summary_text.delete(1.0, tk.END)
+        if self.path_profile is None:
+            return
+        
+        max_level = self.max_level_var.get()
+        max_level = int(max_level) if max_level.isdigit() else None
+        select = parse_path_patterns(self.select_var.get())
+        summary = [
+            "🔍 PRE-CONVERSION SCAN",
+            "=" * 50,
+            "",
+            *self.path_profile.report(max_level, select, limit=200),
+            "",
+            "Estimates use the current nesting level and path patterns; convert to see the actual table.",
+        ]
+        self.summary_text.insert(tk.END, "\n".join(summary))
 
     def display_summary(self):
         """Display conversion summary"""
@@ -429,9 +1065,10 @@ class JSONToTabularConverter:
                 f"   Data types: {self.flattened_df.dtypes.value_counts().to_dict()}",
                 "",
                 f"🔍 Data Quality:",
-                f"   Missing values: {self.flattened_df.isnull().sum().sum():,}",
+                f"   Missing values: {missing_values(self.flattened_df):,}",
                 f"   Complete rows: {len(self.flattened_df.dropna()):,}",
-                f"   Memory usage: {self.flattened_df.memory_usage(deep=True).sum() / 1024 / 1024:.2f} MB",
+                f"   Memory usage: {memory_usage(self.flattened_df) / 1024 / 1024:.2f} MB",
+                f"   Sparse columns: {sparse_column_count(self.flattened_df):,}",
                 "",
                 f"📝 Column Names:",
             ]
@@ -440,7 +1077,8 @@ class JSONToTabularConverter:
             for i, col in enumerate(self.flattened_df.columns, 1):
                 summary.append(f"   {i:2d}. {col}")
                 if i >= 20:  # Limit display
-                    summary.append(f"   ... and {len(self.flattened_df.columns) - 20} more columns")
+                    summary.append(f"   ... and {len(self.flattened_df.columns) - 20} more columns "
+                                   f"(use 🔎 Find Column on the Tabular Data tab to browse them all)")
                     break
             
             self.summary_text.insert(tk.END, "\n".join(summary))
@@ -497,6 +1135,48 @@ class JSONToTabularConverter:
                             cursor="hand2"
                         )
                         excel_btn.pack(side="left", padx=(0, 10))
+                        
+                        table_btn = tk.Button(
+                            buttons_frame,
+                            text="📦 Save Table",
+                            command=self.save_table_file,
+                            font=self.fonts['normal'],
+                            bg=self.colors['primary'],
+                            fg=self.colors['white'],
+                            relief="flat",
+                            padx=15,
+                            pady=8,
+                            cursor="hand2"
+                        )
+                        table_btn.pack(side="left", padx=(0, 10))
+                        
+                        sqlite_btn = tk.Button(
+                            buttons_frame,
+                            text="🗄️ Export to SQLite",
+                            command=self.export_to_sqlite,
+                            font=self.fonts['normal'],
+                            bg=self.colors['success'],
+                            fg=self.colors['white'],
+                            relief="flat",
+                            padx=15,
+                            pady=8,
+                            cursor="hand2"
+                        )
+                        sqlite_btn.pack(side="left", padx=(0, 10))
+                        
+                        append_btn = tk.Button(
+                            buttons_frame,
+                            text="➕ Append to Output",
+                            command=self.append_to_output,
+                            font=self.fonts['normal'],
+                            bg=self.colors['secondary'],
+                            fg=self.colors['white'],
+                            relief="flat",
+                            padx=15,
+                            pady=8,
+                            cursor="hand2"
+                        )
+                        append_btn.pack(side="left", padx=(0, 10))
                     
                         return
 
@@ -521,6 +1201,137 @@ class JSONToTabularConverter:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export CSV: {str(e)}")
 
+    def save_table_file(self):
+        """Save the flattened data as a table file that reopens without converting again"""
+        if self.flattened_df is None:
+            messagebox.showwarning("Warning", "No data to export!")
+            return
+        
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".feather",
+                initialfile=f"{os.path.splitext(getattr(self, 'current_file_name', 'data'))[0]}.feather",
+                filetypes=[("Saved tables", "*.feather"), ("All files", "*.*")],
+                title="Save Table"
+            )
+            
+            if file_path:
+                max_level = self.max_level_var.get()
+                options = conversion_options(
+                    self.separator_var.get() or "_",
+                    int(max_level) if max_level.isdigit() else None,
+                    self.remove_nulls_var.get(),
+                    parse_path_patterns(self.select_var.get()),
+                    self.where_var.get().strip() or None,
+                    SPARSE_DENSITY_THRESHOLD if self.sparse_var.get() else None,
+                    self.categorical_var.get()
+                )
+                metadata = table_metadata(self.flattened_df, getattr(self, 'current_file_name', None), options)
+                save_table(self.flattened_df, file_path, metadata)
+                messagebox.showinfo("Success", f"Table saved to:\n{file_path}\n\n"
+                                               "Open it with 📂 Choose JSON File to skip the conversion next time.")
+                self.update_status(f"Saved table: {os.path.basename(file_path)}")
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save table: {str(e)}")
+
+    def export_to_sqlite(self):
+        """Export the loaded JSON to a SQLite database, with arrays in child tables"""
+        if self.json_data is None:
+            messagebox.showwarning("Warning", "SQLite export needs a loaded JSON file!")
+            return
+        
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".db",
+                initialfile=f"{os.path.splitext(getattr(self, 'current_file_name', 'data'))[0]}.db",
+                filetypes=[("SQLite databases", "*.db *.sqlite"), ("All files", "*.*")],
+                title="Export to SQLite"
+            )
+            if not file_path:
+                return
+            
+            index_columns = simpledialog.askstring(
+                "SQLite Indexes",
+                "Columns to index after loading (comma-separated, optional):",
+                initialvalue=self.sort_column_var.get(),
+                parent=self.root
+            )
+            
+            self.update_status("Exporting to SQLite...")
+            self.root.update_idletasks()
+            max_level = self.max_level_var.get()
+            records = self.json_data if isinstance(self.json_data, list) else [self.json_data]
+            # Records are flattened and inserted a chunk at a time, without the DataFrame,
+            # with the same null removal, filters and type conversion as the table view
+            result = write_sqlite(
+                records, file_path,
+                separator=self.separator_var.get() or "_",
+                max_level=int(max_level) if max_level.isdigit() else None,
+                select=parse_path_patterns(self.select_var.get()),
+                where=self.where_var.get().strip() or None,
+                index_columns=parse_path_patterns(index_columns),
+                remove_nulls=self.remove_nulls_var.get(),
+                coerce=TypeCoercer(infer=True) if self.infer_types_var.get() else None
+            )
+            
+            tables = "\n".join(f"   {table}: {rows:,} rows" for table, rows in result['tables'].items())
+            messagebox.showinfo("Success", f"Data exported successfully to:\n{file_path}\n\nTables:\n{tables}")
+            self.update_status(f"Exported to SQLite: {os.path.basename(file_path)}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export SQLite: {str(e)}")
+            self.update_status("Error during SQLite export")
+
+    def append_to_output(self):
+        """Append the loaded JSON to an existing CSV, Parquet or SQLite output, skipping keys already written"""
+        if self.json_data is None:
+            messagebox.showwarning("Warning", "Appending needs a loaded JSON file!")
+            return
+        
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".csv",
+                confirmoverwrite=False,
+                filetypes=[("CSV files", "*.csv"), ("Parquet datasets", "*.parquet"),
+                           ("SQLite databases", "*.db *.sqlite"), ("All files", "*.*")],
+                title="Append to Output"
+            )
+            if not file_path:
+                return
+            
+            key = simpledialog.askstring(
+                "Record Key",
+                "Dotted path identifying a record, to skip records already in the output (optional):",
+                parent=self.root
+            )
+            if key is None:
+                return
+            
+            self.update_status("Appending to output...")
+            self.root.update_idletasks()
+            max_level = self.max_level_var.get()
+            records = self.json_data if isinstance(self.json_data, list) else [self.json_data]
+            result = append_records(
+                records, file_path,
+                key=key.strip() or None,
+                separator=self.separator_var.get() or "_",
+                max_level=int(max_level) if max_level.isdigit() else None,
+                select=parse_path_patterns(self.select_var.get()),
+                where=self.where_var.get().strip() or None,
+                remove_nulls=self.remove_nulls_var.get(),
+                coerce=TypeCoercer(infer=True) if self.infer_types_var.get() else None
+            )
+            
+            messagebox.showinfo("Success", f"Appended {result['appended']:,} rows to:\n{file_path}\n\n"
+                                           f"Skipped (key already written): {result['skipped']:,}\n"
+                                           f"Output columns: {result['columns']}")
+            self.update_status(f"Appended {result['appended']:,} rows to {os.path.basename(file_path)}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to append: {str(e)}")
+            self.update_status("Error while appending")
+
     def export_to_excel(self):
         """Export tabular data to Excel with enhanced formatting"""
         if self.flattened_df is None:
@@ -535,99 +1346,20 @@ class JSONToTabularConverter:
             )
             
             if file_path:
-                # Convert any list/dict columns to strings for Excel compatibility
-                df_export = self.flattened_df.copy()
-                for col in df_export.columns:
-                    if df_export[col].dtype == 'object':
-                        df_export[col] = df_export[col].apply(lambda x: str(x) if isinstance(x, (list, dict)) else x)
+                # Check Excel's sheet limits before writing anything
+                n_sheets = len(excel_sheet_ranges(*self.flattened_df.shape))
+                if n_sheets > 1:
+                    self.update_status(f"Data exceeds Excel's sheet limits, splitting it across {n_sheets} data sheets...")
                 
-                # Create Excel writer object with openpyxl engine for enhanced formatting
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    # Write main data to 'Data' sheet
-                    df_export.to_excel(writer, sheet_name='Data', index=False)
-                    
-                    # Get the workbook and worksheet objects
-                    workbook = writer.book
-                    worksheet = writer.sheets['Data']
-                    
-                    # Auto-adjust column widths
-                    for column in worksheet.columns:
-                        max_length = 0
-                        column_letter = column[0].column_letter
-                        for cell in column:
-                            try:
-                                if len(str(cell.value)) > max_length:
-                                    max_length = len(str(cell.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                        worksheet.column_dimensions[column_letter].width = adjusted_width
-                    
-                    # Add header formatting
-                    try:
-                        from openpyxl.styles import Font, PatternFill, Alignment
-                        header_font = Font(bold=True, color="FFFFFF")
-                        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                        header_alignment = Alignment(horizontal="center", vertical="center")
-                        
-                        for cell in worksheet[1]:  # First row (headers)
-                            cell.font = header_font
-                            cell.fill = header_fill
-                            cell.alignment = header_alignment
-                    except ImportError:
-                        pass  # Skip formatting if styles not available
-                    
-                    # Create summary sheet with conversion details
-                    summary_data = {
-                        'Metric': [
-                            'Source File',
-                            'Total Rows',
-                            'Total Columns', 
-                            'Missing Values',
-                            'Complete Rows',
-                            'Memory Usage (MB)',
-                            'Conversion Date',
-                            'Separator Used'
-                        ],
-                        'Value': [
-                            getattr(self, 'current_file_name', 'Unknown'),
-                            len(df_export),
-                            len(df_export.columns),
-                            df_export.isnull().sum().sum(),
-                            len(df_export.dropna()),
-                            round(df_export.memory_usage(deep=True).sum() / 1024 / 1024, 2),
-                            pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            self.separator_var.get() or "_"
-                        ]
-                    }
-                    
-                    summary_df = pd.DataFrame(summary_data)
-                    summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    # Format summary sheet headers
-                    try:
-                        summary_sheet = writer.sheets['Summary']
-                        for cell in summary_sheet[1]:  # Headers
-                            cell.font = header_font
-                            cell.fill = header_fill
-                            cell.alignment = header_alignment
-                        
-                        # Auto-adjust summary sheet columns
-                        for column in summary_sheet.columns:
-                            max_length = 0
-                            column_letter = column[0].column_letter
-                            for cell in column:
-                                try:
-                                    if len(str(cell.value)) > max_length:
-                                        max_length = len(str(cell.value))
-                                except:
-                                    pass
-                            adjusted_width = max_length + 2
-                            summary_sheet.column_dimensions[column_letter].width = adjusted_width
-                    except:
-                        pass  # Skip formatting if there are issues
+                # Same workbook as the command line's: Data sheets (continued on Data_2, ... past
+                # Excel's sheet limits) with styled headers and sized columns, Summary and Column_Details
+                max_level = self.max_level_var.get()
+                sheet_names = write_excel(
+                    self.flattened_df, file_path, getattr(self, 'current_file_name', 'Unknown'),
+                    self.separator_var.get() or "_", int(max_level) if max_level.isdigit() else None
+                )
                 
-                messagebox.showinfo("Success", f"Excel file exported successfully:\n{file_path}\n\nFeatures included:\n• Formatted headers\n• Auto-sized columns\n• Data sheet with converted JSON\n• Summary sheet with conversion details")
+                messagebox.showinfo("Success", f"Excel file exported successfully:\n{file_path}\n\nFeatures included:\n• Formatted headers\n• Auto-sized columns\n• Data sheet with converted JSON\n• Summary sheet with conversion details\n• Column_Details sheet" + (f"\n• Data split across {len(sheet_names)} sheets (Excel sheet limit)" if len(sheet_names) > 1 else ""))
                 self.update_status(f"Exported to Excel: {os.path.basename(file_path)}")
                 
         except ImportError as e:
@@ -637,6 +1369,8 @@ class JSONToTabularConverter:
 
     def export_to_excel_multiple_sheets(self):
         """Export with advanced Excel features - multiple sheets by category"""
+        import pandas as pd
+        
         if self.flattened_df is None:
             messagebox.showwarning("Warning", "No data to export!")
             return
@@ -649,116 +1383,90 @@ class JSONToTabularConverter:
             )
             
             if file_path:
+                from xlsx_writer import write_workbook
+                
+                self.update_status("Building Excel sheets...")
+                self.root.update_idletasks()
+                
                 # Convert any list/dict columns to strings for Excel compatibility
-                df_export = self.flattened_df.copy()
+                df_export = stringify_nested(self.flattened_df.copy())
+                
+                # Main data sheet, continued on All_Data_2, ... past Excel's sheet limits
+                sheets = split_data_sheets(df_export, 'All_Data')
+                sheets_created = [name for name, _ in sheets]
+                
+                # Try to create separate sheets based on common patterns
+                # This is useful for nested JSON with different entity types
+                
+                # Look for columns that might represent different entity types
+                potential_categories = []
                 for col in df_export.columns:
-                    if df_export[col].dtype == 'object':
-                        df_export[col] = df_export[col].apply(lambda x: str(x) if isinstance(x, (list, dict)) else x)
+                    if any(keyword in col.lower() for keyword in ['type', 'category', 'kind', 'class', 'department']):
+                        if df_export[col].nunique() <= 10:  # Reasonable number of categories
+                            potential_categories.append(col)
                 
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    # Main data sheet
-                    df_export.to_excel(writer, sheet_name='All_Data', index=False)
-                    
-                    # Try to create separate sheets based on common patterns
-                    # This is useful for nested JSON with different entity types
-                    
-                    # Look for columns that might represent different entity types
-                    potential_categories = []
-                    for col in df_export.columns:
-                        if any(keyword in col.lower() for keyword in ['type', 'category', 'kind', 'class', 'department']):
-                            if df_export[col].nunique() <= 10:  # Reasonable number of categories
-                                potential_categories.append(col)
-                    
-                    # Create sheets by category if found
-                    sheets_created = ['All_Data']
-                    if potential_categories:
-                        category_col = potential_categories[0]  # Use first suitable column
-                        for category in df_export[category_col].unique():
-                            if pd.notna(category) and str(category).strip():
-                                category_data = df_export[df_export[category_col] == category]
-                                # Clean sheet name for Excel compatibility
-                                sheet_name = str(category).replace('/', '_').replace('\\', '_').replace('[', '').replace(']', '')[:31]
-                                if sheet_name not in sheets_created:
-                                    category_data.to_excel(writer, sheet_name=sheet_name, index=False)
-                                    sheets_created.append(sheet_name)
-                    
-                    # Column analysis sheet
-                    col_analysis = []
-                    for col in df_export.columns:
-                        col_info = {
-                            'Column_Name': col,
-                            'Data_Type': str(df_export[col].dtype),
-                            'Non_Null_Count': df_export[col].count(),
-                            'Null_Count': df_export[col].isnull().sum(),
-                            'Null_Percentage': round((df_export[col].isnull().sum() / len(df_export)) * 100, 2),
-                            'Unique_Values': df_export[col].nunique(),
-                            'Sample_Value': str(df_export[col].dropna().iloc[0]) if not df_export[col].dropna().empty else 'N/A'
-                        }
-                        col_analysis.append(col_info)
-                    
-                    analysis_df = pd.DataFrame(col_analysis)
-                    analysis_df.to_excel(writer, sheet_name='Column_Analysis', index=False)
-                    
-                    # Summary sheet
-                    summary_data = {
-                        'Metric': [
-                            'Source File',
-                            'Total Rows',
-                            'Total Columns', 
-                            'Missing Values',
-                            'Complete Rows',
-                            'Memory Usage (MB)',
-                            'Sheets Created',
-                            'Category Column Used',
-                            'Conversion Date',
-                            'Separator Used'
-                        ],
-                        'Value': [
-                            getattr(self, 'current_file_name', 'Unknown'),
-                            len(df_export),
-                            len(df_export.columns),
-                            df_export.isnull().sum().sum(),
-                            len(df_export.dropna()),
-                            round(df_export.memory_usage(deep=True).sum() / 1024 / 1024, 2),
-                            len(sheets_created),
-                            potential_categories[0] if potential_categories else 'None',
-                            pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
-                            self.separator_var.get() or "_"
-                        ]
+                # Create sheets by category if found
+                if potential_categories:
+                    category_col = potential_categories[0]  # Use first suitable column
+                    for category in df_export[category_col].unique():
+                        if pd.notna(category) and str(category).strip():
+                            category_data = df_export[df_export[category_col] == category]
+                            # Clean sheet name for Excel compatibility
+                            sheet_name = str(category).replace('/', '_').replace('\\', '_').replace('[', '').replace(']', '')[:31]
+                            if sheet_name not in sheets_created:
+                                category_sheets = split_data_sheets(category_data, sheet_name)
+                                sheets.extend(category_sheets)
+                                sheets_created.extend(name for name, _ in category_sheets)
+                
+                # Column analysis sheet
+                col_analysis = []
+                for col in df_export.columns:
+                    col_info = {
+                        'Column_Name': col,
+                        'Data_Type': str(df_export[col].dtype),
+                        'Non_Null_Count': df_export[col].count(),
+                        'Null_Count': df_export[col].isnull().sum(),
+                        'Null_Percentage': round((df_export[col].isnull().sum() / len(df_export)) * 100, 2),
+                        'Unique_Values': df_export[col].nunique(),
+                        'Sample_Value': str(df_export[col].dropna().iloc[0]) if not df_export[col].dropna().empty else 'N/A'
                     }
-                    
-                    summary_df = pd.DataFrame(summary_data)
-                    summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    # Apply formatting to all sheets
-                    try:
-                        from openpyxl.styles import Font, PatternFill, Alignment
-                        header_font = Font(bold=True, color="FFFFFF")
-                        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                        header_alignment = Alignment(horizontal="center", vertical="center")
-                        
-                        for sheet_name in writer.sheets:
-                            worksheet = writer.sheets[sheet_name]
-                            # Format headers
-                            for cell in worksheet[1]:
-                                cell.font = header_font
-                                cell.fill = header_fill
-                                cell.alignment = header_alignment
-                            
-                            # Auto-adjust column widths
-                            for column in worksheet.columns:
-                                max_length = 0
-                                column_letter = column[0].column_letter
-                                for cell in column:
-                                    try:
-                                        if len(str(cell.value)) > max_length:
-                                            max_length = len(str(cell.value))
-                                    except:
-                                        pass
-                                adjusted_width = min(max_length + 2, 50)
-                                worksheet.column_dimensions[column_letter].width = adjusted_width
-                    except ImportError:
-                        pass  # Skip formatting if not available
+                    col_analysis.append(col_info)
+                
+                sheets.append(('Column_Analysis', pd.DataFrame(col_analysis)))
+                
+                # Summary sheet
+                summary_data = {
+                    'Metric': [
+                        'Source File',
+                        'Total Rows',
+                        'Total Columns', 
+                        'Missing Values',
+                        'Complete Rows',
+                        'Memory Usage (MB)',
+                        'Sheets Created',
+                        'Category Column Used',
+                        'Conversion Date',
+                        'Separator Used'
+                    ],
+                    'Value': [
+                        getattr(self, 'current_file_name', 'Unknown'),
+                        len(df_export),
+                        len(df_export.columns),
+                        missing_values(df_export),
+                        len(df_export.dropna()),
+                        round(memory_usage(df_export) / 1024 / 1024, 2),
+                        len(sheets_created),
+                        potential_categories[0] if potential_categories else 'None',
+                        pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        self.separator_var.get() or "_"
+                    ]
+                }
+                
+                sheets.append(('Summary', pd.DataFrame(summary_data)))
+                
+                # Every sheet gets the styled header and sized columns; the sheets are
+                # rendered in worker processes and assembled in this order
+                write_workbook(file_path, [(name, frame, 'data', True) for name, frame in sheets])
                 
                 category_info = f"\n• {len(sheets_created)} sheets created" if len(sheets_created) > 3 else "\n• Standard sheets only"
                 messagebox.showinfo("Success", f"Advanced Excel file created:\n{file_path}\n\nIncludes:\n• All data sheet\n• Column analysis sheet\n• Summary sheet{category_info}")
@@ -896,7 +1604,7 @@ class JSONToTabularConverter:
             self.export_to_excel_multiple_sheets()
 
     def batch_convert_to_excel(self):
-        """Convert multiple JSON files to Excel in batch"""
+        """Convert multiple JSON files to Excel in batch, resuming an interrupted batch"""
         try:
             # Select multiple JSON files
             file_paths = filedialog.askopenfilenames(
@@ -912,6 +1620,17 @@ class JSONToTabularConverter:
             if not output_dir:
                 return
             
+            # The job manifest in the output directory remembers finished files
+            job = BatchJob(output_dir)
+            completed = job.completed(file_paths)
+            resume = True
+            if completed:
+                resume = messagebox.askyesno(
+                    "Resume Batch",
+                    f"{len(completed)} of {len(file_paths)} files were already converted in this folder "
+                    f"and have not changed.\n\nSkip them and convert the rest?"
+                )
+            
             # Create progress dialog
             progress_window = tk.Toplevel(self.root)
             progress_window.title("Batch Processing")
@@ -951,66 +1670,97 @@ class JSONToTabularConverter:
             )
             progress_bar.pack(pady=10)
             
-            # Process files
-            successful = 0
-            failed = 0
+            # Files are converted in a worker thread; the dialog polls its updates so the window stays responsive
+            updates = queue.Queue()
             
-            for i, file_path in enumerate(file_paths):
-                filename = os.path.basename(file_path)
-                progress_var.set(f"Processing: {filename}")
-                progress_window.update()
-                
+            def progress(index, total, file_path, status):
+                updates.put(('progress', (index, file_path, status)))
+            
+            def work():
                 try:
-                    # Load JSON
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        json_data = json.load(file)
-                    
-                    # Convert to DataFrame
-                    if isinstance(json_data, list):
-                        df = json_normalize(json_data, sep="_")
-                    elif isinstance(json_data, dict):
-                        df = json_normalize([json_data], sep="_")
-                    else:
-                        raise ValueError("Invalid JSON structure")
-                    
-                    # Convert any list/dict columns to strings
-                    for col in df.columns:
-                        if df[col].dtype == 'object':
-                            df[col] = df[col].apply(lambda x: str(x) if isinstance(x, (list, dict)) else x)
-                    
-                    # Generate output filename
-                    base_name = os.path.splitext(filename)[0]
-                    output_file = os.path.join(output_dir, f"{base_name}_converted.xlsx")
-                    
-                    # Export to Excel
-                    with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                        df.to_excel(writer, sheet_name='Data', index=False)
-                        
-                        # Add summary
-                        summary_data = {
-                            'Metric': ['Source File', 'Rows', 'Columns', 'Conversion Date'],
-                            'Value': [filename, len(df), len(df.columns), pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')]
-                        }
-                        summary_df = pd.DataFrame(summary_data)
-                        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    successful += 1
-                    
+                    # Each file is flattened and written in a worker process; cached results are reused.
+                    # Workers are spawned, as forking a process running Tk threads can deadlock, and
+                    # write the Data and Summary sheets without per-cell formatting, as batches always did
+                    counts = job.run_pipelined(file_paths, separator="_", cache=self.cache, resume=resume,
+                                               progress=progress, profile='standard', format_sheets=False,
+                                               mp_context=multiprocessing.get_context('spawn'))
+                    updates.put(('done', counts))
                 except Exception as e:
-                    print(f"Failed to process {filename}: {str(e)}")
-                    failed += 1
-                
-                progress_bar['value'] = i + 1
-                progress_window.update()
+                    updates.put(('error', e))
+            
+            def poll():
+                while not updates.empty():
+                    kind, value = updates.get()
+                    if kind == 'progress':
+                        index, file_path, status = value
+                        progress_var.set(f"{status.capitalize()}: {os.path.basename(file_path)}")
+                        progress_bar['value'] = index
+                        continue
+                    progress_window.destroy()
+                    if kind == 'error':
+                        messagebox.showerror("Error", f"Batch conversion failed: {str(value)}")
+                        return
+                    # Show results
+                    counts = value
+                    result_msg = f"Batch conversion completed!\n\n✅ Successful: {counts['converted']} files\n⏭️ Skipped (already converted): {counts['skipped']} files\n❌ Failed: {counts['failed']} files\n\n📁 Output directory: {output_dir}"
+                    if counts['failed']:
+                        result_msg += f"\n📄 Failure report: {os.path.basename(job.report_path)}"
+                    messagebox.showinfo("Batch Conversion Complete", result_msg)
+                    return
+                self.root.after(100, poll)
             
-            # Show results
-            progress_window.destroy()
-            result_msg = f"Batch conversion completed!\n\n✅ Successful: {successful} files\n❌ Failed: {failed} files\n\n📁 Output directory: {output_dir}"
-            messagebox.showinfo("Batch Conversion Complete", result_msg)
+            progress_var.set(f"Processing: {os.path.basename(file_paths[0])}")
+            threading.Thread(target=work, daemon=True).start()
+            self.root.after(100, poll)
             
         except Exception as e:
             messagebox.showerror("Error", f"Batch conversion failed: {str(e)}")
 
+    def merge_files(self):
+        """Merge multiple JSON files into a single table"""
+        try:
+            file_paths = filedialog.askopenfilenames(
+                title="Select JSON files to merge",
+                filetypes=[("JSON files", "*.json *.ndjson *.jsonl"), ("All files", "*.*")]
+            )
+            if not file_paths:
+                return
+            
+            output_file = filedialog.asksaveasfilename(
+                defaultextension=".csv",
+                filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("Parquet files", "*.parquet")],
+                title="Save merged table as"
+            )
+            if not output_file:
+                return
+            
+            add_source = messagebox.askyesno("Merge Files", "Add a 'source_file' column with each row's file name?")
+            
+            max_level = self.max_level_var.get()
+            self.update_status(f"Merging {len(file_paths)} files...")
+            self.root.update()
+            
+            result = merge_json_files(
+                list(file_paths),
+                output_file,
+                separator=self.separator_var.get() or "_",
+                max_level=int(max_level) if max_level.isdigit() else None,
+                source_column="source_file" if add_source else None,
+                select=parse_path_patterns(self.select_var.get()),
+                where=self.where_var.get().strip() or None
+            )
+            
+            messagebox.showinfo(
+                "Merge Complete",
+                f"Merged {result['files']} files into:\n{output_file}\n\n"
+                f"📈 {result['rows']:,} rows × {result['columns']:,} columns"
+            )
+            self.update_status(f"Merged {result['files']} files: {os.path.basename(output_file)}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Merge failed: {str(e)}")
+            self.update_status("Error during merge")
+
 
 if __name__ == "__main__":
     print("🔄 Starting JSON to Tabular Converter...")
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Resumable batch conversion of JSON files to Excel
+Usage: python batch_jobs.py output_dir input.json [input2.json ...] [--retries 2]
+
+A job manifest in the output directory records, for every input file, its
+status, output path, SHA-256 content hash, attempts and timings. It is
+rewritten after each file, so a batch that stops part-way resumes where it
+left off: files already converted whose contents are unchanged are skipped.
+Failed conversions are retried with exponential backoff (invalid JSON and
+missing files are not retried) and listed in a machine-readable failure report.
+
+The command line converts files in worker processes. Every input is read
+once, in the main process, and hashed from the bytes read; the bytes go to a
+worker that flattens and writes them while the next files are being read.
+With --save-table each flattened file is also saved as NAME_converted.feather
+(see table_file.py), which later conversions can open without flattening again.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import conversion_options, flatten_bytes, flatten_file
+from exporters import EXCEL_PROFILES, analysis_sidecar_path, write_excel
+from conversion_cache import ConversionCache, HASH_CHUNK_SIZE
+from table_file import is_table_file
+
+MANIFEST_NAME = ".batch_manifest.json"
+FAILURE_REPORT_NAME = "batch_failures.json"
+
+# Errors that another attempt cannot fix (JSONDecodeError is a ValueError)
+PERMANENT_ERRORS = (ValueError, FileNotFoundError)
+
+
+def file_digest(file_path):
+    """Return the SHA-256 digest of a file's contents"""
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def read_file(file_path):
+    """Return a file's contents and their SHA-256 digest, reading the file once"""
+    with open(file_path, 'rb') as file:
+        data = file.read()
+    return data, hashlib.sha256(data).hexdigest()
+
+
+def convert_to_excel(input_path, output_path, separator="_", max_level=None, cache=None, profile='full',
+                     analysis_file=None):
+    """Flatten one JSON file and write it as a formatted Excel workbook"""
+    df = flatten_file(input_path, separator=separator, max_level=max_level, cache=cache)
+    write_excel(df, output_path, os.path.basename(input_path), separator, max_level, profile=profile,
+                analysis_file=analysis_file)
+
+
+def _convert_file_atomic(input_path, data, digest, output_path, separator, max_level, cache, profile,
+                         analysis_file, table_path=None, format_sheets=True):
+    """
+    Flatten a file and write its workbook, and optionally a table file, in one worker process task
+
+    The file's bytes and digest come from the main process, which already
+    read them, so the worker never opens the input; saved tables are opened
+    by path instead (data None). Only success or an exception comes back,
+    so flattened frames are never pickled between processes.
+    """
+    if data is None:
+        df = flatten_file(input_path, separator=separator, max_level=max_level, cache=cache)
+    else:
+        df = flatten_bytes(data, separator=separator, max_level=max_level, cache=cache, digest=digest)
+    source_name = os.path.basename(input_path)
+    if table_path:
+        # Written first: the workbook's presence marks the file as done
+        _save_table_atomic(df, table_path, source_name, conversion_options(separator, max_level))
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), prefix=".tmp_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_excel(df, tmp_path, source_name, separator, max_level, profile=profile, analysis_file=analysis_file,
+                    format_sheets=format_sheets)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _save_table_atomic(df, table_path, source_name, options):
+    """Save a flattened table via a temporary file renamed into place"""
+    from table_file import save_table, table_metadata
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(table_path), prefix=".tmp_", suffix=".feather")
+    os.close(fd)
+    try:
+        save_table(df, tmp_path, table_metadata(df, source_name, options))
+        os.replace(tmp_path, table_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class BatchJob:
+    """Batch of file conversions tracked by a manifest in the output directory"""
+
+    def __init__(self, output_dir, max_retries=2, backoff=1.0):
+        """
+        Args:
+            output_dir (str): Directory receiving outputs, the manifest and the failure report
+            max_retries (int): Extra attempts for a failed conversion (default: 2)
+            backoff (float): Seconds before the first retry, doubled for each further one (default: 1.0)
+        """
+        self.output_dir = output_dir
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.report_path = os.path.join(output_dir, FAILURE_REPORT_NAME)
+        self.manifest = self._load_manifest()
+        self._started = {}
+
+    def _load_manifest(self):
+        """Load the job manifest, or start an empty one"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json_atomic(self, path, data):
+        """Write JSON via a temporary file so a crash never leaves it half written"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            json.dump(data, file, indent=2)
+        os.replace(tmp_path, path)
+
+    def output_path(self, input_path):
+        """Return the output file for an input file"""
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        return os.path.join(self.output_dir, f"{name}_converted.xlsx")
+
+    @staticmethod
+    def table_path(output_path):
+        """Return the saved table written next to an output workbook"""
+        return f"{os.path.splitext(output_path)[0]}.feather"
+
+    def is_complete(self, input_path, digest=None):
+        """Return True if input_path was converted from its current contents and the output still exists"""
+        record = self.manifest.get(os.path.abspath(input_path))
+        if not record or record.get('status') != 'done' or not os.path.exists(record.get('output') or ''):
+            return False
+        try:
+            return record.get('input_hash') == (digest or file_digest(input_path))
+        except OSError:
+            return False
+
+    def completed(self, input_files):
+        """Return the input files that a resumed run would skip"""
+        return [path for path in input_files if self.is_complete(path)]
+
+    def run(self, input_files, convert=convert_to_excel, resume=True, progress=None):
+        """
+        Convert input files one after another, recording each outcome in the manifest
+
+        Args:
+            input_files (list): Input JSON files
+            convert (callable): convert(input_path, output_path) raising on failure (default: convert_to_excel)
+            resume (bool): Skip files already converted from unchanged contents (default: True)
+            progress (callable): progress(index, total, input_path, status) after each file (default: None)
+
+        Returns:
+            dict: converted, skipped and failed counts
+        """
+        counts = {'converted': 0, 'skipped': 0, 'failed': 0}
+        for index, input_path in enumerate(input_files):
+            try:
+                digest = file_digest(input_path)
+            except OSError:
+                digest = None
+
+            if resume and digest and self.is_complete(input_path, digest):
+                status = 'skipped'
+            else:
+                record = self.begin(input_path, digest)
+                if digest is None:
+                    status = self.finish(record, 1, FileNotFoundError(f"File not found: {input_path}"))
+                else:
+                    _, attempts, error = self.retry(self._convert_atomic, convert, input_path, record['output'])
+                    status = self.finish(record, attempts, error)
+
+            counts[status] += 1
+            if progress:
+                progress(index + 1, len(input_files), input_path, status)
+
+        self.write_failure_report()
+        return counts
+
+    def run_pipelined(self, input_files, separator="_", max_level=None, cache=None, resume=True, progress=None,
+                      workers=None, queue_size=2, profile='full', analysis_sidecar=False, save_table=False,
+                      format_sheets=True, mp_context=None):
+        """
+        Convert input files to Excel in parallel worker processes
+
+        Files are read in a thread, once each, and hashed from the bytes read
+        (to skip finished ones and record their digest) while earlier ones
+        are flattened and written by the workers, so even with one worker the
+        next file's read overlaps the current file's conversion. A bounded
+        queue keeps at most queue_size files read and waiting for a worker,
+        which bounds the bytes held in memory.
+
+        Args:
+            input_files (list): Input JSON files
+            separator (str): Separator for nested keys (default: "_")
+            max_level (int): Maximum nesting level to flatten (default: None - all levels)
+            cache (ConversionCache): Reuse flattened results of unchanged files (default: None)
+            resume (bool): Skip files already converted from unchanged contents (default: True)
+            progress (callable): progress(index, total, input_path, status) after each file (default: None)
+            workers (int): Worker processes converting files (default: CPU count)
+            queue_size (int): Files read and waiting for a worker (default: 2)
+            profile (str): Excel metadata sheets: 'minimal', 'standard' or 'full' (default: 'full')
+            analysis_sidecar (bool): Write the metadata to .analysis.json files instead of sheets (default: False)
+            save_table (bool): Also save each flattened file as a .feather table, see table_path() (default: False)
+            format_sheets (bool): Auto-size and style the data sheets (default: True)
+            mp_context: multiprocessing context of the worker processes, e.g. spawn when
+                called from a threaded GUI process (default: None - the platform default)
+
+        Returns:
+            dict: converted, skipped and failed counts
+        """
+        counts = asyncio.run(self._pipeline(
+            input_files, separator, max_level, cache, resume, progress,
+            workers or os.cpu_count() or 1, queue_size, profile, analysis_sidecar, save_table, format_sheets,
+            mp_context
+        ))
+        self.write_failure_report()
+        return counts
+
+    async def _pipeline(self, input_files, separator, max_level, cache, resume, progress, workers, queue_size,
+                        profile, analysis_sidecar, save_table, format_sheets, mp_context):
+        """Run the read and convert stages connected by a bounded queue"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(queue_size)
+        counts = {'converted': 0, 'skipped': 0, 'failed': 0}
+
+        def report(input_path, status):
+            counts[status] += 1
+            if progress:
+                progress(sum(counts.values()), len(input_files), input_path, status)
+
+        async def read_stage():
+            for input_path in input_files:
+                read, attempts, error = await self.retry_async(lambda: asyncio.to_thread(read_file, input_path))
+                data, digest = read or (None, None)
+                if resume and digest and self.is_complete(input_path, digest):
+                    report(input_path, 'skipped')
+                    continue
+                record = self.begin(input_path, digest)
+                if error is not None:
+                    report(input_path, self.finish(record, attempts, error))
+                    continue
+                if is_table_file(input_path):
+                    data = None  # Opened by the worker with its columns' own types
+                await queue.put((input_path, data, record))
+                del read, data
+            for _ in range(workers):
+                await queue.put(None)
+
+        async def convert_stage(executor):
+            while (item := await queue.get()) is not None:
+                input_path, data, record = item
+                analysis_file = analysis_sidecar_path(record['output']) if analysis_sidecar else None
+                table_path = self.table_path(record['output']) if save_table else None
+                _, attempts, error = await self.retry_async(lambda: loop.run_in_executor(
+                    executor, _convert_file_atomic, input_path, data, record['input_hash'], record['output'],
+                    separator, max_level, cache, profile, analysis_file, table_path, format_sheets
+                ))
+                del item, data
+                report(input_path, self.finish(record, attempts, error))
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+            await asyncio.gather(read_stage(), *(convert_stage(executor) for _ in range(workers)))
+        return counts
+
+    def begin(self, input_path, digest):
+        """Record that a file's conversion has started and return its manifest record"""
+        key = os.path.abspath(input_path)
+        record = {
+            'input': key,
+            'output': self.output_path(input_path),
+            'input_hash': digest,
+            'status': 'running',
+            'attempts': 0,
+            'started_at': _now(),
+            'finished_at': None,
+            'seconds': None,
+            'error': None,
+            'error_type': None,
+        }
+        self.manifest[key] = record
+        self._started[key] = time.perf_counter()
+        self._write_json_atomic(self.manifest_path, self.manifest)
+        return record
+
+    def retry(self, call, *args):
+        """
+        Call call(*args), retrying failures with exponential backoff
+
+        Returns:
+            tuple: (result or None, attempts made, last exception or None)
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                return call(*args), attempts, None
+            except Exception as e:
+                if isinstance(e, PERMANENT_ERRORS) or attempts > self.max_retries:
+                    return None, attempts, e
+                time.sleep(self.backoff * 2 ** (attempts - 1))
+
+    async def retry_async(self, start):
+        """
+        Await start(), retrying failures with exponential backoff
+
+        Returns:
+            tuple: (result or None, attempts made, last exception or None)
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                return await start(), attempts, None
+            except Exception as e:
+                if isinstance(e, PERMANENT_ERRORS) or attempts > self.max_retries:
+                    return None, attempts, e
+                await asyncio.sleep(self.backoff * 2 ** (attempts - 1))
+
+    def finish(self, record, attempts, error=None):
+        """Record the outcome of a file's conversion; return 'converted' or 'failed'"""
+        record['attempts'] += attempts
+        record['status'] = 'failed' if error else 'done'
+        record['error'] = str(error) if error else None
+        record['error_type'] = type(error).__name__ if error else None
+        record['finished_at'] = _now()
+        record['seconds'] = round(time.perf_counter() - self._started.pop(record['input']), 3)
+        self._write_json_atomic(self.manifest_path, self.manifest)
+        return 'converted' if record['status'] == 'done' else 'failed'
+
+    def _convert_atomic(self, convert, input_path, output_path):
+        """Run convert into a temporary file and rename it into place on success"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix=".tmp_", suffix=os.path.splitext(output_path)[1])
+        os.close(fd)
+        try:
+            convert(input_path, tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def failures(self):
+        """Return manifest records of files whose last conversion failed"""
+        return [record for record in self.manifest.values() if record.get('status') == 'failed']
+
+    def write_failure_report(self):
+        """Write the failure report, or remove a stale one when nothing failed"""
+        failures = self.failures()
+        if failures:
+            self._write_json_atomic(self.report_path, {
+                'generated_at': _now(),
+                'failed': len(failures),
+                'files': [
+                    {name: record.get(name) for name in ('input', 'input_hash', 'attempts', 'error_type', 'error')}
+                    for record in failures
+                ],
+            })
+        elif os.path.exists(self.report_path):
+            os.remove(self.report_path)
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Convert many JSON files to Excel as a resumable batch job")
+    parser.add_argument("output_dir", help="Directory for Excel outputs, the job manifest and the failure report")
+    parser.add_argument("inputs", nargs="+", help="Input JSON files")
+    parser.add_argument("--retries", type=int, default=2, help="Retries for a failed file (default: 2)")
+    parser.add_argument("--backoff", type=float, default=1.0, help="Seconds before the first retry, doubled after each (default: 1)")
+    parser.add_argument("--restart", action="store_true", help="Convert every file again instead of resuming")
+    parser.add_argument("--separator", default="_", help="Separator for nested keys (default: _)")
+    parser.add_argument("--max-level", type=int, default=None, help="Maximum nesting level to flatten (default: all levels)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse and re-flatten inputs")
+    parser.add_argument("--profile", choices=tuple(EXCEL_PROFILES), default="full",
+                        help="Excel metadata: minimal (data only), standard (Summary) or full (Summary and Column_Details)")
+    parser.add_argument("--analysis-sidecar", action="store_true",
+                        help="Write each file's metadata to NAME_converted.analysis.json instead of extra sheets")
+    parser.add_argument("--save-table", action="store_true",
+                        help="Also save each flattened file as NAME_converted.feather for instant reopening (requires pyarrow)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for flattening (default: CPU count)")
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ConversionCache()
+        except OSError as e:
+            print(f"Warning: conversion cache disabled: {e}")
+
+    def progress(index, total, input_path, status):
+        mark = {'converted': "✅", 'skipped': "⏭️", 'failed': "❌"}[status]
+        print(f"{mark} [{index}/{total}] {os.path.basename(input_path)}: {status}")
+
+    job = BatchJob(args.output_dir, max_retries=args.retries, backoff=args.backoff)
+    counts = job.run_pipelined(args.inputs, args.separator, args.max_level, cache=cache, resume=not args.restart,
+                               progress=progress, workers=args.workers, profile=args.profile,
+                               analysis_sidecar=args.analysis_sidecar, save_table=args.save_table)
+
+    print(f"📊 Converted: {counts['converted']}, skipped: {counts['skipped']}, failed: {counts['failed']}")
+    if counts['failed']:
+        print(f"❌ Failure report: {job.report_path}")
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark type coercion of flattened text columns
+Usage: python benchmark_coercion.py [--rows 200000] [--chunk-rows 50000]
+
+Timestamps, epoch milliseconds, decimal strings and booleans are converted
+three ways: value by value in Python, with pandas inferring the date format
+again for every chunk, and with TypeCoercer, which detects each column's
+format once and parses every chunk with it. All three must agree.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+# Add this directory to path to import the coercion layer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from type_coercion import TypeCoercer, parse_coercion_rules
+
+RULES = "created_at=datetime,updated_ms=epoch_ms,amount=number,active=bool"
+
+
+def sample_frame(n_rows):
+    """Return a frame of text and number columns as flattened from an API export"""
+    import pandas as pd
+
+    start = 1767225600000  # 2026-01-01T00:00:00Z in milliseconds
+    return pd.DataFrame({
+        'created_at': [datetime.fromtimestamp((start + index * 61000) / 1000, timezone.utc)
+                       .strftime('%Y-%m-%dT%H:%M:%SZ') for index in range(n_rows)],
+        'updated_ms': [start + index * 1500 for index in range(n_rows)],
+        'amount': [f"{index % 10000}.{index % 100:02d}" for index in range(n_rows)],
+        'active': ['true' if index % 3 else 'false' for index in range(n_rows)],
+    })
+
+
+def per_value(df):
+    """Convert every value with the standard library, one at a time"""
+    import pandas as pd
+
+    return pd.DataFrame({
+        'created_at': [datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+                       for value in df['created_at']],
+        'updated_ms': [datetime.fromtimestamp(value / 1000, timezone.utc).replace(tzinfo=None)
+                       for value in df['updated_ms']],
+        'amount': [float(value) for value in df['amount']],
+        'active': [value == 'true' for value in df['active']],
+    })
+
+
+def format_per_chunk(df):
+    """Convert with pandas, letting it work out the date format for each chunk"""
+    import pandas as pd
+
+    return pd.DataFrame({
+        'created_at': pd.to_datetime(df['created_at'], utc=True).dt.tz_convert(None),
+        'updated_ms': pd.to_datetime(df['updated_ms'], unit='ms'),
+        'amount': pd.to_numeric(df['amount']),
+        'active': df['active'].map({'true': True, 'false': False}),
+    })
+
+
+def time_chunks(df, chunk_rows, convert):
+    """Return (seconds, converted frame) for converting df chunk by chunk"""
+    import pandas as pd
+
+    started = time.perf_counter()
+    chunks = [convert(df.iloc[start:start + chunk_rows]) for start in range(0, len(df), chunk_rows)]
+    return time.perf_counter() - started, pd.concat(chunks, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark type coercion of flattened columns")
+    parser.add_argument("--rows", type=int, default=200000, help="Rows in the benchmark frame (default: 200000)")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="Rows per chunk (default: 50000)")
+    args = parser.parse_args()
+
+    df = sample_frame(args.rows)
+    coercer = TypeCoercer(parse_coercion_rules(RULES))
+
+    print(f"⏱️  Type coercion benchmark: {len(df)} rows × {len(df.columns)} columns, "
+          f"chunks of {args.chunk_rows} rows")
+    print("=" * 50)
+    results = {}
+    for name, convert in [('per value', per_value), ('format per chunk', format_per_chunk),
+                          ('TypeCoercer', coercer.coerce_frame)]:
+        seconds, converted = time_chunks(df, args.chunk_rows, convert)
+        results[name] = (seconds, converted)
+        print(f"   {name:<18} {seconds:8.3f} s   {len(df) / seconds:12,.0f} rows/s")
+
+    fastest = results['TypeCoercer'][0]
+    print(f"\n🚀 TypeCoercer speed-up: {results['per value'][0] / fastest:.1f}x over per-value parsing, "
+          f"{results['format per chunk'][0] / fastest:.1f}x over per-chunk format inference")
+
+    reference = results['per value'][1].astype(str)
+    same = all(results[name][1].astype(str).equals(reference) for name in results)
+    print(f"{'✅' if same else '❌'} All methods {'agree' if same else 'disagree'}")
+    memory = df.memory_usage(deep=True).sum() / 1024 / 1024
+    coerced = results['TypeCoercer'][1].memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"📊 Memory: {memory:.1f} MB as text, {coerced:.1f} MB typed")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark command-line start-up and small-conversion times
+Usage: python benchmark_startup.py [--runs 10] [--max-help-ms 300]
+
+Each scenario runs in a fresh interpreter so import costs are included.
+With --max-help-ms the script exits non-zero when `--help` is slower than
+the budget, which makes it usable as a regression guard.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(UTILS_DIR, "json_to_excel.py")
+SAMPLE = os.path.join(os.path.dirname(UTILS_DIR), "examples", "sample_data", "employee_records.json")
+
+
+def time_command(args, runs):
+    """Return the median wall time in milliseconds of running args"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def heavy_modules_loaded(code):
+    """Return the heavy modules imported by running code in a fresh interpreter"""
+    probe = "\n".join([
+        "import sys",
+        f"sys.path.insert(0, {UTILS_DIR!r})",
+        code,
+        "print('HEAVY_MODULES:' + ','.join(m for m in ('pandas', 'numpy', 'openpyxl', 'tkinter') if m in sys.modules))",
+    ])
+    result = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True)
+    marker = [line for line in result.stdout.splitlines() if line.startswith('HEAVY_MODULES:')][-1]
+    return [name for name in marker.split(':', 1)[1].split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark json_to_excel.py start-up time")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per scenario (default: 10)")
+    parser.add_argument("--max-help-ms", type=float, default=None, help="Fail if --help takes longer than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scenarios = [
+            ("python -c pass", [sys.executable, "-c", "pass"]),
+            ("json_to_excel.py --help", [sys.executable, CLI, "--help"]),
+            ("small JSON -> CSV", [sys.executable, CLI, SAMPLE, os.path.join(tmp_dir, "out.csv")]),
+            ("small JSON -> XLSX", [sys.executable, CLI, SAMPLE, os.path.join(tmp_dir, "out.xlsx"), "--no-cache"]),
+        ]
+
+        print("⏱️  Start-up benchmark")
+        print("=" * 50)
+        results = {}
+        for name, command in scenarios:
+            results[name] = time_command(command, args.runs)
+            print(f"   {name:<28} {results[name]:8.1f} ms")
+
+    print("\n📦 Heavy modules loaded by `import json_to_excel`: "
+          f"{', '.join(heavy_modules_loaded('import json_to_excel')) or 'none'}")
+
+    if args.max_help_ms is not None and results["json_to_excel.py --help"] > args.max_help_ms:
+        print(f"❌ --help took longer than {args.max_help_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the native XLSX writer against the openpyxl export
+Usage: python benchmark_xlsx.py [--rows 50000] [--runs 3]
+
+Both engines write the same flattened frame, with Data, Summary and
+Column_Details sheets, and the native output is read back to check that it
+holds the same data.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import FlatTable
+from exporters import write_excel
+
+
+def sample_records(n_rows):
+    """Return employee-like records with repeated strings, numbers and nesting"""
+    departments = ["Sales", "Support", "Engineering", "Finance", "Operations"]
+    return [
+        {
+            'id': index,
+            'name': f"Employee {index}",
+            'active': index % 3 != 0,
+            'employee': {
+                'department': departments[index % len(departments)],
+                'salary': 40000 + (index * 37) % 60000,
+                'rating': round((index % 50) / 10, 1),
+                'address': {'city': f"City {index % 200}", 'zip': f"{10000 + index % 900}"},
+            },
+            'tags': ["remote", "senior"] if index % 4 == 0 else None,
+        }
+        for index in range(n_rows)
+    ]
+
+
+def time_engine(df, engine, output_file, runs):
+    """Return the median seconds taken to write df with engine"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        write_excel(df, output_file, "benchmark.json", engine=engine)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark native vs openpyxl Excel export")
+    parser.add_argument("--rows", type=int, default=50000, help="Rows in the benchmark frame (default: 50000)")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per engine (default: 3)")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    df = FlatTable.from_json(sample_records(args.rows)).to_dataframe()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"⏱️  Excel export benchmark: {len(df)} rows × {len(df.columns)} columns")
+        print("=" * 50)
+        results = {}
+        for engine in ('openpyxl', 'native'):
+            output_file = os.path.join(tmp_dir, f"{engine}.xlsx")
+            results[engine] = time_engine(df, engine, output_file, args.runs)
+            size = os.path.getsize(output_file) / 1024 / 1024
+            print(f"   {engine:<10} {results[engine]:8.2f} s   {size:6.2f} MB")
+
+        print(f"\n🚀 Native writer speed-up: {results['openpyxl'] / results['native']:.1f}x")
+
+        native = pd.read_excel(os.path.join(tmp_dir, "native.xlsx"), sheet_name='Data')
+        reference = pd.read_excel(os.path.join(tmp_dir, "openpyxl.xlsx"), sheet_name='Data')
+        same = native.shape == reference.shape and native.astype(str).equals(reference.astype(str))
+        print(f"{'✅' if same else '❌'} Native output {'matches' if same else 'differs from'} the openpyxl output")
+        if not same:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
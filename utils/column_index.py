@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Column name index for browsing very wide flattened tables
+
+Maps column names to positions so a viewer can jump to a column instantly,
+searches names case-insensitively, and splits the columns into fixed-size
+pages so only the columns in view need to be rendered.
+Usage: ColumnIndex(df.columns).search("address")
+"""
+
+# Columns rendered per page by the GUI's tabular view
+COLUMNS_PER_PAGE = 12
+
+
+class ColumnIndex:
+    """Index of column names → positions with search and paging"""
+
+    def __init__(self, columns, page_size=COLUMNS_PER_PAGE):
+        """
+        Args:
+            columns (iterable): Column names in table order
+            page_size (int): Columns per page (default: COLUMNS_PER_PAGE)
+        """
+        self.names = [str(column) for column in columns]
+        self.page_size = max(1, page_size)
+        self.positions = {}
+        for position, name in enumerate(self.names):
+            self.positions.setdefault(name, position)
+        self._folded = [name.casefold() for name in self.names]
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def page_count(self):
+        """Number of pages, at least one"""
+        return max(1, -(-len(self.names) // self.page_size))
+
+    def position(self, name):
+        """Return the position of a column, or None if there is no such column"""
+        return self.positions.get(name)
+
+    def page_of(self, position):
+        """Return the page holding the column at position"""
+        return position // self.page_size
+
+    def page(self, page):
+        """Return the range of column positions on a page, clamped to the valid pages"""
+        page = min(max(page, 0), self.page_count - 1)
+        start = page * self.page_size
+        return range(start, min(start + self.page_size, len(self.names)))
+
+    def search(self, text, limit=None):
+        """
+        Return positions of columns whose name contains text, ignoring case
+
+        Exact name matches come first; the rest keep table order. Every word
+        of text must appear in the name, so "addr city" finds "employee_address_city".
+        """
+        words = text.casefold().split()
+        if not words:
+            matches = range(len(self.names))
+        else:
+            matches = [position for position, name in enumerate(self._folded) if all(word in name for word in words)]
+            exact = self.positions.get(text.strip())
+            if exact is not None and matches and matches[0] != exact:
+                matches.remove(exact)
+                matches.insert(0, exact)
+        return list(matches[:limit] if limit is not None else matches)
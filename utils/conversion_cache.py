@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of flattened conversion results
+
+Entries are keyed by a SHA-256 digest of the source file contents plus the
+conversion options, so re-converting an unchanged file skips parsing and
+flattening. The key also holds a fingerprint of the flattening code and the
+pandas version, so entries written by another build are never returned.
+
+Entries are stored column by column: a JSON header describing each column,
+followed by one raw buffer per numeric, boolean or date column (read back
+with numpy without conversion). Text columns store each distinct string
+once plus integer codes, and other object columns a JSON array, so lists
+and dicts in cells round-trip exactly. Category columns keep their codes
+and sparse columns only their stored values. Anything else falls back to
+pickle, for that column only. Digests are remembered per (path, size, mtime) so unchanged files
+are not re-hashed. The cache is capped in size and evicts least recently used
+entries first.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import struct
+import sys
+import tempfile
+
+# Add this directory to path to import the flattening engine for its fingerprint
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Bump when the entry layout changes; changes to the flattening code are
+# picked up by format_fingerprint()
+CACHE_VERSION = 2
+
+# First bytes of an entry file, followed by the header length
+ENTRY_MAGIC = b'JTCOLS\x00\x02'
+
+# Modules whose code shapes the cached tables
+FINGERPRINT_MODULES = ('flattener', 'record_filter')
+
+_fingerprint = None
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "json_to_tabular")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Read size used when hashing source files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def format_fingerprint():
+    """Return a fingerprint of the code and pandas version that produce cached tables"""
+    global _fingerprint
+    if _fingerprint is None:
+        import importlib
+        import pandas as pd
+
+        sha = hashlib.sha256(f"{CACHE_VERSION}|{pd.__version__}".encode('utf-8'))
+        for name in FINGERPRINT_MODULES:
+            with open(importlib.import_module(name).__file__, 'rb') as file:
+                sha.update(file.read())
+        _fingerprint = sha.hexdigest()
+    return _fingerprint
+
+
+# Python types a JSON array holds exactly; JSON values and pandas text cells are always one of these
+_JSON_TYPES = (type(None), bool, int, float, str, list, dict)
+
+
+def _encode_column(values, buffers):
+    """Return the header spec of one column's values, appending its buffers"""
+    import numpy as np
+    import pandas as pd
+
+    def buffer(data):
+        buffers.append(data)
+        return len(buffers) - 1
+
+    dtype = values.dtype
+    if isinstance(dtype, pd.SparseDtype):
+        sparse = values.array
+        return {'encoding': 'sparse', 'fill_value': sparse.fill_value, 'rows': len(sparse),
+                'indices': buffer(np.ascontiguousarray(sparse.sp_index.indices, dtype=np.int64).tobytes()),
+                'values': _encode_column(pd.Series(sparse.sp_values, dtype=sparse.sp_values.dtype), buffers)}
+    if isinstance(dtype, pd.CategoricalDtype):
+        return {'encoding': 'category', 'ordered': bool(dtype.ordered),
+                'codes': _encode_column(pd.Series(values.cat.codes.to_numpy()), buffers),
+                'categories': _encode_column(pd.Series(dtype.categories), buffers)}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        return {'encoding': 'numpy', 'dtype': dtype.str, 'data': buffer(np.ascontiguousarray(values.to_numpy()).tobytes())}
+    if dtype != object and pd.api.types.is_string_dtype(dtype):
+        # Text columns repeat values often: store each distinct string once
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        return {'encoding': 'strings', 'dtype': str(dtype),
+                'codes': _encode_column(pd.Series(codes.astype(np.int32)), buffers),
+                'uniques': _encode_column(pd.Series(uniques.to_numpy(dtype=object), dtype=object), buffers)}
+    if dtype == object:
+        items = values.tolist()
+        if all(type(item) in _JSON_TYPES for item in items):
+            text = json.dumps(items, ensure_ascii=False, separators=(',', ':'))
+            return {'encoding': 'json', 'data': buffer(text.encode('utf-8', 'surrogatepass'))}
+    return {'encoding': 'pickle', 'data': buffer(pickle.dumps(values.array, protocol=pickle.HIGHEST_PROTOCOL))}
+
+
+def _decode_column(spec, buffers):
+    """Return the array described by a header spec"""
+    import numpy as np
+    import pandas as pd
+
+    encoding = spec['encoding']
+    if encoding == 'numpy':
+        return np.frombuffer(buffers[spec['data']], dtype=np.dtype(spec['dtype']))
+    if encoding == 'json':
+        items = json.loads(bytes(buffers[spec['data']]).decode('utf-8', 'surrogatepass'))
+        array = np.empty(len(items), dtype=object)
+        array[:] = items
+        return array
+    if encoding == 'strings':
+        # A trailing None is picked by the -1 code of missing values
+        uniques = np.append(_decode_column(spec['uniques'], buffers), None)
+        return pd.array(uniques[_decode_column(spec['codes'], buffers)], dtype=spec['dtype'])
+    if encoding == 'category':
+        categories = pd.Index(_decode_column(spec['categories'], buffers))
+        return pd.Categorical.from_codes(_decode_column(spec['codes'], buffers), categories=categories,
+                                         ordered=spec['ordered'])
+    if encoding == 'sparse':
+        sp_values = _decode_column(spec['values'], buffers)
+        fill_value = spec['fill_value']
+        dense = np.full(spec['rows'], fill_value, dtype=sp_values.dtype)
+        dense[np.frombuffer(buffers[spec['indices']], dtype=np.int64)] = sp_values
+        return pd.arrays.SparseArray(dense, fill_value=fill_value, dtype=pd.SparseDtype(sp_values.dtype, fill_value))
+    return pickle.loads(buffers[spec['data']])
+
+
+def _write_columns(df, path):
+    """Write a DataFrame as a columnar entry file"""
+    import pandas as pd
+
+    buffers = []
+    specs = [_encode_column(df.iloc[:, position], buffers) for position in range(df.shape[1])]
+    index = df.index
+    default_index = isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1 and index.name is None
+    header = {
+        'rows': len(df),
+        'columns': df.columns.tolist(),
+        'specs': specs,
+        'index': None if default_index else _encode_column(pd.Series(index), buffers),
+        'sizes': [len(data) for data in buffers],
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    with open(path, 'wb') as file:
+        file.write(ENTRY_MAGIC + struct.pack('<Q', len(header_bytes)) + header_bytes)
+        for data in buffers:
+            # Buffers start at multiples of 8 bytes, so numpy reads them aligned
+            file.write(bytes(-file.tell() % 8))
+            file.write(data)
+
+
+def _read_columns(path):
+    """Read a DataFrame from a columnar entry file, or raise ValueError if it is not one"""
+    import pandas as pd
+
+    with open(path, 'rb') as file:
+        # A writable buffer, so the arrays numpy builds over it are writable too
+        data = bytearray(os.fstat(file.fileno()).st_size)
+        file.readinto(data)
+    view = memoryview(data)
+    if bytes(view[:len(ENTRY_MAGIC)]) != ENTRY_MAGIC:
+        raise ValueError(f"Not a cache entry: {path}")
+    start = len(ENTRY_MAGIC) + 8
+    (header_length,) = struct.unpack('<Q', view[len(ENTRY_MAGIC):start])
+    header = json.loads(bytes(view[start:start + header_length]))
+
+    buffers = []
+    position = start + header_length
+    for size in header['sizes']:
+        position += -position % 8
+        buffers.append(view[position:position + size])
+        position += size
+
+    columns = {position: _decode_column(spec, buffers) for position, spec in enumerate(header['specs'])}
+    index = pd.RangeIndex(header['rows']) if header['index'] is None else pd.Index(_decode_column(header['index'], buffers))
+    df = pd.DataFrame(columns, index=index)
+    df.columns = pd.Index(header['columns'])
+    return df
+
+
+class ConversionCache:
+    """Size-capped LRU cache of flattened DataFrames stored on disk"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir (str): Cache directory (default: $JSON_TABULAR_CACHE_DIR or ~/.cache/json_to_tabular)
+            max_bytes (int): Size cap in bytes (default: $JSON_TABULAR_CACHE_MAX_MB or 512 MB)
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get("JSON_TABULAR_CACHE_DIR", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_mb = os.environ.get("JSON_TABULAR_CACHE_MAX_MB")
+            max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.tables_dir = os.path.join(cache_dir, "tables")
+        self.digests_dir = os.path.join(cache_dir, "digests")
+        os.makedirs(self.tables_dir, exist_ok=True)
+        os.makedirs(self.digests_dir, exist_ok=True)
+
+    @staticmethod
+    def digest_bytes(data):
+        """Return the content digest for raw file bytes"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _stat_path(self, file_path):
+        """Return the fast-path record location for a file's current size and mtime"""
+        stat = os.stat(file_path)
+        stat_key = f"{os.path.realpath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return os.path.join(self.digests_dir, hashlib.sha256(stat_key.encode('utf-8')).hexdigest())
+
+    def remember_digest(self, file_path, digest):
+        """Record the digest of a file whose bytes were already read and hashed"""
+        try:
+            self._write_atomic(self._stat_path(file_path), digest.encode('ascii'))
+        except OSError:
+            pass
+
+    def file_digest(self, file_path):
+        """
+        Return the content digest of a file
+
+        Files whose path, size and mtime match a previous call are not re-read.
+        """
+        stat_path = self._stat_path(file_path)
+        try:
+            with open(stat_path, 'r', encoding='ascii') as file:
+                digest = file.read().strip()
+            if digest:
+                return digest
+        except OSError:
+            pass
+
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        try:
+            self._write_atomic(stat_path, digest.encode('ascii'))
+        except OSError:
+            pass
+        return digest
+
+    def _entry_path(self, digest, options):
+        """Return the table location for a digest and conversion options"""
+        key = json.dumps({'format': format_fingerprint(), 'digest': digest, 'options': options}, sort_keys=True)
+        return os.path.join(self.tables_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + ".cols")
+
+    def get(self, digest, options):
+        """
+        Return the cached DataFrame for a digest and options, or None
+
+        Args:
+            digest (str): Source content digest from file_digest()/digest_bytes()
+            options (dict): JSON-serializable conversion options
+        """
+        entry_path = self._entry_path(digest, options)
+        try:
+            df = _read_columns(entry_path)
+        except Exception:
+            return None
+
+        # Touching the entry marks it as recently used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, digest, options, df):
+        """Store a DataFrame for a digest and options, then enforce the size cap"""
+        entry_path = self._entry_path(digest, options)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tables_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            _write_columns(df, tmp_path)
+            os.replace(tmp_path, entry_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used files until the cache fits in max_bytes"""
+        entries = []
+        total = 0
+        for directory in (self.tables_dir, self.digests_dir):
+            for name in os.listdir(directory):
+                if name.endswith(".tmp"):
+                    continue  # Being written by a concurrent put(); renamed into place when complete
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cache entry"""
+        for directory in (self.tables_dir, self.digests_dir):
+            for name in os.listdir(directory):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _write_atomic(path, data):
+        """Write bytes to path via a temporary file in the same directory"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Local HTTP service for JSON to tabular conversion
+Usage: python conversion_server.py [--port 8765] [--workers 4]
+
+Endpoints:
+    POST /convert?format=csv|xlsx|parquet|feather[&separator=_][&max_level=N][&select=a.b,c.*][&where=expr]
+        Request body: a JSON array/object or NDJSON document
+    POST /convert?path=/data/input.json&format=...
+        Converts a local file (only below --allow-path-root)
+    GET /health
+        Worker and request counters as JSON
+
+Conversions run in a pool of pre-forked worker processes that import pandas
+once at startup. Requests beyond the concurrency limit are rejected with
+503 and a Retry-After header instead of queueing without bound.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from exporters import OUTPUT_FORMATS
+from flattener import parse_path_patterns
+from record_filter import compile_filter
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+# Bytes copied per read/write when spooling bodies and streaming responses
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _warm_worker():
+    """Import the heavy conversion stack once per worker process"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import pandas  # noqa: F401
+    import openpyxl  # noqa: F401
+    import flattener  # noqa: F401
+    import exporters  # noqa: F401
+
+
+def _ping():
+    return os.getpid()
+
+
+def _convert(input_path, output_path, output_format, separator, max_level, source_name, select=None,
+             where=None):
+    """
+    Flatten a JSON/NDJSON file and write it in the requested format (worker side)
+
+    Returns:
+        tuple: (rows, columns)
+    """
+    from flattener import FlatTable, conversion_options
+    from json_stream import iter_file_records
+    from exporters import write_output
+
+    table = FlatTable(select=select, where=where)
+    table.extend(iter_file_records(input_path))
+    df = table.to_dataframe(separator=separator, max_level=max_level)
+    options = conversion_options(separator, max_level, select=select, where=where)
+    write_output(df, output_path, output_format, source_name, separator, max_level, options)
+    return df.shape
+
+
+def _remove_files(*paths):
+    """Remove the given temporary files if they exist"""
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server dispatching conversions to a pre-forked process pool"""
+
+    daemon_threads = True
+
+    def __init__(self, address, workers=None, max_pending=None, allow_path_root=None,
+                 max_body_bytes=None, request_timeout=600):
+        """
+        Args:
+            address (tuple): (host, port) to listen on
+            workers (int): Worker processes (default: CPU count)
+            max_pending (int): Conversions accepted at once, running or waiting (default: 2 per worker)
+            allow_path_root (str): Directory below which ?path= conversions are allowed (default: disabled)
+            max_body_bytes (int): Largest accepted request body (default: unlimited)
+            request_timeout (float): Seconds to wait for a conversion (default: 600)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self.allow_path_root = os.path.realpath(allow_path_root) if allow_path_root else None
+        self.max_body_bytes = max_body_bytes
+        self.request_timeout = request_timeout
+        self.spool_dir = tempfile.mkdtemp(prefix="json_convert_")
+
+        # Fork and warm every worker before accepting connections
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        for future in [self.executor.submit(_ping) for _ in range(self.workers)]:
+            future.result()
+
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.counters_lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = {
+            'active': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+        }
+
+        super().__init__(address, ConversionRequestHandler)
+
+    def count(self, **changes):
+        """Apply increments to the request counters"""
+        with self.counters_lock:
+            for key, delta in changes.items():
+                self.counters[key] += delta
+
+    def health(self):
+        """Return counters and pool configuration"""
+        with self.counters_lock:
+            status = dict(self.counters)
+        status.update({
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+        })
+        return status
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+        shutil.rmtree(self.spool_dir, ignore_errors=True)
+
+
+class PendingSlot:
+    """One of the server's pending slots, taken by a request and given back exactly once"""
+
+    def __init__(self, server):
+        self.server = server
+        self.lock = threading.Lock()
+        self.held = True
+        server.count(active=1)
+
+    def release(self):
+        """Give the slot back; safe to call more than once and from several threads"""
+        with self.lock:
+            if not self.held:
+                return
+            self.held = False
+        self.server.count(active=-1)
+        self.server.slots.release()
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """Handle /convert and /health requests"""
+
+    protocol_version = "HTTP/1.1"
+
+    # The pending slot held by the current request, if any
+    slot = None
+    # The conversion submitted to the worker pool for the current request, if any
+    conversion = None
+
+    def log_message(self, format, *args):
+        pass  # Keep stdout quiet; /health exposes the counters
+
+    def release_slot_if_idle(self):
+        """Give back the pending slot unless a conversion is still running for this request"""
+        if self.slot is not None and (self.conversion is None or self.conversion.done()):
+            self.slot.release()
+
+    def send_response(self, code, message=None):
+        # The work is done once a reply starts, so a client sending its next
+        # request as soon as it reads this one must not be turned away. A
+        # conversion still running after a timeout keeps its slot until it
+        # ends, so abandoned work still counts against max_pending.
+        self.release_slot_if_idle()
+        super().send_response(code, message)
+
+    def send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/health':
+            self.send_json(200, self.server.health())
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/convert':
+            self.discard_body()
+            self.send_json(404, {'error': 'Not found'})
+            return
+
+        # Backpressure: refuse work beyond the pending limit instead of queueing it
+        if not self.server.slots.acquire(blocking=False):
+            # Do not spend time reading a body we will not convert
+            self.close_connection = True
+            self.server.count(rejected=1)
+            self.send_json(503, {'error': 'Server busy, retry later'}, {'Retry-After': '1'})
+            return
+
+        self.slot = PendingSlot(self.server)
+        self.conversion = None
+        try:
+            self.handle_convert(parse_qs(url.query))
+        finally:
+            self.release_slot_if_idle()
+
+    def handle_convert(self, query):
+        def param(name, default=None):
+            return query.get(name, [default])[0]
+
+        output_format = param('format', 'csv').lower()
+        separator = param('separator', '_')
+        max_level = param('max_level')
+        if output_format not in OUTPUT_FORMATS:
+            self.discard_body()
+            self.send_json(400, {'error': f"format must be one of: {', '.join(OUTPUT_FORMATS)}"})
+            return
+        if max_level is not None and not max_level.isdigit():
+            self.discard_body()
+            self.send_json(400, {'error': 'max_level must be a non-negative integer'})
+            return
+        max_level = int(max_level) if max_level is not None else None
+        select = parse_path_patterns(param('select'))
+        where = param('where')
+        try:
+            compile_filter(where)
+        except ValueError as e:
+            self.discard_body()
+            self.send_json(400, {'error': str(e)})
+            return
+
+        spool_path = None
+        output_path = None
+        try:
+            local_path = param('path')
+            if local_path:
+                self.discard_body()
+                input_path = self.resolve_local_path(local_path)
+                if input_path is None:
+                    return
+                source_name = os.path.basename(input_path)
+            else:
+                spool_path = self.spool_body()
+                if spool_path is None:
+                    return
+                input_path = spool_path
+                source_name = "request body"
+
+            fd, output_path = tempfile.mkstemp(dir=self.server.spool_dir, suffix=f".{output_format}")
+            os.close(fd)
+            future = self.conversion = self.server.executor.submit(
+                _convert, input_path, output_path, output_format, separator, max_level, source_name, select, where
+            )
+            # Runs at once if the conversion has already finished; a later
+            # request on the same connection gets a slot of its own
+            slot = self.slot
+            future.add_done_callback(lambda _: slot.release())
+            try:
+                rows, columns = future.result(timeout=self.server.request_timeout)
+            except (ValueError, FileNotFoundError) as e:
+                # json.JSONDecodeError is a ValueError
+                self.server.count(failed=1)
+                self.send_json(400, {'error': str(e)})
+                return
+            except ImportError as e:
+                self.server.count(failed=1)
+                self.send_json(501, {'error': str(e)})
+                return
+            except TimeoutError:
+                self.server.count(failed=1)
+                self.send_json(504, {'error': 'Conversion timed out'})
+                return
+            except Exception as e:
+                self.server.count(failed=1)
+                self.send_json(500, {'error': str(e)})
+                return
+
+            self.stream_file(output_path, output_format, rows, columns)
+            self.server.count(completed=1)
+        finally:
+            if self.conversion is not None and not self.conversion.done():
+                # Timed out: the worker still uses the files, remove them once it ends
+                self.conversion.add_done_callback(lambda _: _remove_files(spool_path, output_path))
+            else:
+                _remove_files(spool_path, output_path)
+
+    def resolve_local_path(self, local_path):
+        """Return the real path of an allowed local input, or reply with an error and return None"""
+        root = self.server.allow_path_root
+        if root is None:
+            self.send_json(403, {'error': 'Local path conversion is disabled (see --allow-path-root)'})
+            return None
+        real_path = os.path.realpath(local_path)
+        if os.path.commonpath([root, real_path]) != root:
+            self.send_json(403, {'error': 'Path is outside the allowed root'})
+            return None
+        return real_path
+
+    def body_chunks(self):
+        """
+        Yield the request body in chunks, honouring Content-Length or chunked encoding
+
+        Raises:
+            ValueError: If the Content-Length or a chunk size is malformed
+        """
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            while True:
+                line = self.rfile.readline(COPY_CHUNK_SIZE)
+                try:
+                    size = int(line.split(b';')[0].strip() or b'0', 16)
+                except ValueError:
+                    raise ValueError(f"Malformed chunk size: {line[:40]!r}") from None
+                if size < 0:
+                    raise ValueError(f"Malformed chunk size: {line[:40]!r}")
+                if size == 0:
+                    # Trailer section ends with an empty line
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                remaining = size
+                while remaining:
+                    chunk = self.rfile.read(min(remaining, COPY_CHUNK_SIZE))
+                    if not chunk:
+                        return
+                    remaining -= len(chunk)
+                    yield chunk
+                self.rfile.readline()
+        else:
+            length = self.headers.get('Content-Length') or '0'
+            if not length.strip().isdigit():
+                raise ValueError(f"Malformed Content-Length: {length[:40]!r}")
+            remaining = int(length)
+            while remaining:
+                chunk = self.rfile.read(min(remaining, COPY_CHUNK_SIZE))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def discard_body(self):
+        """Read and drop the request body; after a malformed one the connection cannot be reused"""
+        try:
+            for _ in self.body_chunks():
+                pass
+        except ValueError:
+            self.close_connection = True
+
+    def spool_body(self):
+        """Stream the request body to a temporary file; reply and return None on error"""
+        fd, spool_path = tempfile.mkstemp(dir=self.server.spool_dir, suffix=".json")
+        received = 0
+        with os.fdopen(fd, 'wb') as file:
+            try:
+                for chunk in self.body_chunks():
+                    received += len(chunk)
+                    if self.server.max_body_bytes and received > self.server.max_body_bytes:
+                        file.close()
+                        os.remove(spool_path)
+                        self.close_connection = True
+                        self.send_json(413, {'error': 'Request body too large'})
+                        return None
+                    file.write(chunk)
+            except ValueError as e:
+                file.close()
+                os.remove(spool_path)
+                self.close_connection = True
+                self.send_json(400, {'error': str(e)})
+                return None
+        self.server.count(bytes_in=received)
+        if not received:
+            os.remove(spool_path)
+            self.send_json(400, {'error': 'Empty request body'})
+            return None
+        return spool_path
+
+    def stream_file(self, path, output_format, rows, columns):
+        """Send a converted output file in chunks"""
+        size = os.path.getsize(path)
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[output_format])
+        self.send_header("Content-Length", str(size))
+        self.send_header("Content-Disposition", f'attachment; filename="converted.{output_format}"')
+        self.send_header("X-Rows", str(rows))
+        self.send_header("X-Columns", str(columns))
+        self.end_headers()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(COPY_CHUNK_SIZE), b''):
+                self.wfile.write(chunk)
+        self.server.count(bytes_out=size)
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Serve JSON to CSV/Excel/Parquet/Feather conversion over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-pending", type=int, default=None, help="Conversions accepted at once (default: 2 per worker)")
+    parser.add_argument("--allow-path-root", default=None, help="Allow ?path= conversions of files below this directory")
+    parser.add_argument("--max-body-mb", type=int, default=None, help="Largest accepted request body in MB")
+    args = parser.parse_args()
+
+    server = ConversionServer(
+        (args.host, args.port),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        allow_path_root=args.allow_path_root,
+        max_body_bytes=args.max_body_mb * 1024 * 1024 if args.max_body_mb else None
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+
+    print(f"🌐 Conversion service listening on http://{args.host}:{args.port} ({server.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("👋 Conversion service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Output writers shared by the command-line tools and conversion services
+"""
+
+import json
+import os
+from datetime import datetime
+
+from frame_stats import is_sparse, memory_usage, missing_values, to_dense
+
+# Output formats understood by write_output()
+OUTPUT_FORMATS = ('csv', 'xlsx', 'parquet', 'feather')
+
+# Excel worksheet limits; the header row counts towards EXCEL_MAX_ROWS
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLUMNS = 16384
+
+# Excel sheet names are limited to 31 characters
+EXCEL_SHEET_NAME_LENGTH = 31
+
+# Metadata sheets written after the data by each Excel export profile.
+# 'standard' has a Summary of figures known without scanning the data;
+# 'full' adds missing/complete/memory figures and per-column analysis.
+EXCEL_PROFILES = {
+    'minimal': (),
+    'standard': ('Summary',),
+    'full': ('Summary', 'Column_Details'),
+}
+
+
+def stringify_nested(df):
+    """Convert list/dict cell values to strings for formats that need scalars"""
+    for col in df.columns:
+        # Sparse object columns only map their stored values
+        if df[col].dtype == 'object' or (is_sparse(df[col]) and df[col].dtype.subtype == object):
+            df[col] = df[col].apply(lambda x: str(x) if isinstance(x, (list, dict)) else x)
+    return df
+
+
+def excel_sheet_name(base_name, index):
+    """Return the name of the index-th (0-based) sheet of a split table: Data, Data_2, Data_3, ..."""
+    if index == 0:
+        return base_name[:EXCEL_SHEET_NAME_LENGTH]
+    suffix = f"_{index + 1}"
+    return base_name[:EXCEL_SHEET_NAME_LENGTH - len(suffix)] + suffix
+
+
+def excel_sheet_ranges(n_rows, n_columns):
+    """
+    Split an n_rows x n_columns table into blocks that each fit on one worksheet
+
+    Tables within Excel's limits are a single block. Longer tables continue on
+    further sheets every EXCEL_MAX_ROWS - 1 rows; wider tables are cut into
+    column blocks, each written with the same rows.
+
+    Returns:
+        list: (row_start, row_stop, column_start, column_stop) for each sheet in order
+    """
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    row_ranges = [(start, min(start + rows_per_sheet, n_rows)) for start in range(0, n_rows, rows_per_sheet)]
+    column_ranges = [(start, min(start + EXCEL_MAX_COLUMNS, n_columns))
+                     for start in range(0, n_columns, EXCEL_MAX_COLUMNS)]
+    return [
+        (row_start, row_stop, column_start, column_stop)
+        for row_start, row_stop in row_ranges or [(0, 0)]
+        for column_start, column_stop in column_ranges or [(0, 0)]
+    ]
+
+
+def split_data_sheets(df, base_name='Data'):
+    """Return (sheet name, block of df) for each sheet Excel's row and column limits require"""
+    return [
+        (excel_sheet_name(base_name, index), df.iloc[row_start:row_stop, column_start:column_stop])
+        for index, (row_start, row_stop, column_start, column_stop) in enumerate(
+            excel_sheet_ranges(len(df), len(df.columns)))
+    ]
+
+
+def format_data_sheet(worksheet):
+    """Auto-size the columns of a written worksheet and style its header row"""
+    for column in worksheet.columns:
+        max_length = 0
+        column_letter = column[0].column_letter
+        for cell in column:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
+        worksheet.column_dimensions[column_letter].width = adjusted_width
+    
+    try:
+        from openpyxl.styles import Font, PatternFill, Alignment
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        
+        for cell in worksheet[1]:  # First row (headers)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+    except ImportError:
+        print("Warning: openpyxl styling features not available. Basic export only.")
+
+
+def write_data_sheets(writer, df, base_name='Data', format_sheets=True):
+    """
+    Write df to as many sheets as Excel's row and column limits require
+
+    Args:
+        writer (ExcelWriter): Open openpyxl ExcelWriter
+        df (DataFrame): Data to write
+        base_name (str): Name of the first sheet; later ones get _2, _3, ... (default: 'Data')
+        format_sheets (bool): Auto-size columns and style headers (default: True)
+
+    Returns:
+        list: Names of the sheets written
+    """
+    sheet_names = []
+    for sheet_name, block in split_data_sheets(df, base_name):
+        block.to_excel(writer, sheet_name=sheet_name, index=False)
+        if format_sheets:
+            format_data_sheet(writer.sheets[sheet_name])
+        sheet_names.append(sheet_name)
+    return sheet_names
+
+
+def write_csv(df, output_file):
+    """Write a flattened DataFrame to CSV"""
+    df.to_csv(output_file, index=False)
+
+
+def write_parquet(df, output_file):
+    """Write a flattened DataFrame to Parquet (requires pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet export requires 'pyarrow' package.\nPlease install it using: pip install pyarrow")
+    # Arrow has no sparse column type
+    stringify_nested(to_dense(df).copy()).to_parquet(output_file, index=False)
+
+
+def summary_frame(df, source_name, separator="_", max_level=None, sheet_names=('Data',), detailed=True):
+    """
+    Return the Summary sheet of an Excel export as a Metric/Value DataFrame
+
+    With detailed=False the figures that scan every cell (missing values,
+    complete rows, memory usage) are left out.
+    """
+    import pandas as pd
+    
+    summary = [
+        ('Source File', source_name),
+        ('Total Rows', len(df)),
+        ('Total Columns', len(df.columns)),
+    ]
+    if detailed:
+        summary += [
+            ('Missing Values', missing_values(df)),
+            ('Complete Rows', len(df.dropna())),
+            ('Memory Usage (MB)', round(memory_usage(df) / 1024 / 1024, 2)),
+        ]
+    summary += [
+        ('Conversion Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        ('Separator Used', separator),
+        ('Max Level Used', str(max_level) if max_level else "All levels"),
+        ('Data Sheets', ', '.join(sheet_names)),
+    ]
+    return pd.DataFrame(summary, columns=['Metric', 'Value'])
+
+
+def column_details_frame(df):
+    """Return the Column_Details sheet of an Excel export as a DataFrame"""
+    import pandas as pd
+    
+    col_details = []
+    for col in df.columns:
+        col_info = {
+            'Column_Name': col,
+            'Data_Type': str(df[col].dtype),
+            'Non_Null_Count': df[col].count(),
+            'Null_Count': df[col].isnull().sum(),
+            'Unique_Values': df[col].nunique(),
+            'Sample_Value': str(df[col].dropna().iloc[0]) if not df[col].dropna().empty else 'N/A'
+        }
+        col_details.append(col_info)
+    
+    return pd.DataFrame(col_details)
+
+
+def analysis_frames(df, profile, source_name, separator="_", max_level=None, sheet_names=('Data',)):
+    """Return the (sheet name, DataFrame) metadata sheets of an export profile"""
+    if profile not in EXCEL_PROFILES:
+        raise ValueError(f"Unsupported export profile: {profile}")
+    frames = []
+    if 'Summary' in EXCEL_PROFILES[profile]:
+        frames.append(('Summary', summary_frame(df, source_name, separator, max_level, sheet_names,
+                                                detailed=profile == 'full')))
+    if 'Column_Details' in EXCEL_PROFILES[profile]:
+        frames.append(('Column_Details', column_details_frame(df)))
+    return frames
+
+
+def analysis_sidecar_path(output_file):
+    """Return the analysis sidecar file written next to an export"""
+    return os.path.splitext(output_file)[0] + ".analysis.json"
+
+
+def write_analysis_sidecar(frames, analysis_file, data_file):
+    """Write metadata sheets as JSON: the Summary as a dict, other sheets as lists of rows"""
+    def to_json(value):
+        return value.item() if hasattr(value, 'item') else str(value)
+    
+    analysis = {'data_file': os.path.basename(data_file)}
+    for name, frame in frames:
+        if name == 'Summary':
+            analysis['summary'] = dict(zip(frame['Metric'], frame['Value']))
+        else:
+            analysis[name.lower()] = frame.to_dict(orient='records')
+    with open(analysis_file, 'w', encoding='utf-8') as file:
+        json.dump(analysis, file, indent=2, default=to_json)
+
+
+def write_excel(df, output_file, source_name, separator="_", max_level=None, engine=None, profile='full',
+                analysis_file=None, format_sheets=True):
+    """
+    Write a flattened DataFrame to Excel with Data, Summary and Column_Details sheets
+    
+    Data beyond Excel's row or column limit continues on Data_2, Data_3, ...
+    The profile selects which metadata sheets follow the data; with
+    analysis_file they are computed once the workbook is written and saved
+    as JSON there instead.
+    
+    Args:
+        df (DataFrame): Flattened data
+        output_file (str): Path to output Excel file
+        source_name (str): Source file name shown on the Summary sheet
+        separator (str): Separator used for nested keys
+        max_level (int): Maximum nesting level used (None - all levels)
+        engine (str): 'openpyxl', or 'native' to write the sheet XML directly (default: 'openpyxl')
+        profile (str): 'minimal' (data only), 'standard' or 'full' metadata (default: 'full')
+        analysis_file (str): Write the metadata to this JSON file instead of sheets (default: None)
+        format_sheets (bool): Auto-size the data columns and style their headers (default: True)
+    
+    Returns:
+        list: Names of the data sheets written
+    """
+    import pandas as pd
+    
+    if engine not in (None, 'openpyxl', 'native'):
+        raise ValueError(f"Unsupported Excel engine: {engine}")
+    if profile not in EXCEL_PROFILES:
+        raise ValueError(f"Unsupported export profile: {profile}")
+    metadata_in_workbook = analysis_file is None
+    
+    # Convert any remaining list/dict columns to strings
+    df = stringify_nested(df.copy())
+    
+    if engine == 'native':
+        from xlsx_writer import XlsxWorkbook
+        with XlsxWorkbook(output_file) as workbook:
+            sheet_names = []
+            for sheet_name, block in split_data_sheets(df):
+                sheet_names.append(sheet_name)
+                workbook.add_sheet(sheet_name, block, header_style='data' if format_sheets else 'plain',
+                                   auto_width=format_sheets)
+            if metadata_in_workbook:
+                for name, frame in analysis_frames(df, profile, source_name, separator, max_level, sheet_names):
+                    workbook.add_sheet(name, frame)
+    else:
+        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+            # Write main data to 'Data' (and 'Data_2', ... past Excel's sheet limits)
+            sheet_names = write_data_sheets(writer, df, format_sheets=format_sheets)
+            
+            # Summary and column details sheets, as the profile asks
+            if metadata_in_workbook:
+                for name, frame in analysis_frames(df, profile, source_name, separator, max_level, sheet_names):
+                    frame.to_excel(writer, sheet_name=name, index=False)
+    
+    # Deferred analysis: the data is already on disk when this runs
+    if not metadata_in_workbook and EXCEL_PROFILES[profile]:
+        write_analysis_sidecar(analysis_frames(df, profile, source_name, separator, max_level, sheet_names),
+                               analysis_file, output_file)
+    
+    return sheet_names
+
+
+def write_output(df, output_file, output_format, source_name="Unknown", separator="_", max_level=None, options=None):
+    """
+    Write a flattened DataFrame in one of OUTPUT_FORMATS
+
+    options (a flattener.conversion_options() dict) is stored in table files so
+    they record how they were produced (default: None - separator and max_level only).
+    """
+    if output_format == 'csv':
+        write_csv(df, output_file)
+    elif output_format == 'xlsx':
+        write_excel(df, output_file, source_name, separator, max_level)
+    elif output_format == 'parquet':
+        write_parquet(df, output_file)
+    elif output_format == 'feather':
+        from table_file import save_table, table_metadata
+        save_table(df, output_file, table_metadata(df, source_name, options or {'separator': separator, 'max_level': max_level}))
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
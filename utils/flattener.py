@@ -0,0 +1,717 @@
+#!/usr/bin/env python3
+"""
+Flattening engine shared by the GUI and command-line converters
+
+JSON records are walked once into an intermediate table that maps key paths
+(tuples of keys) to columns. Each column keeps only the values that are
+present plus a presence bitmap with one bit per row, so optional keys that
+appear in few records cost almost nothing. DataFrames for a given separator, nesting
+level or null-handling choice are derived from that table, so changing those
+options does not require flattening the JSON again.
+
+A path selection (dotted paths or glob patterns such as employee.address.*)
+is applied during the walk, so unselected subtrees are never stored. A row
+filter expression is tested against each raw record before it is walked, so
+rejected records are never stored either.
+
+Columns whose density is below a threshold can be produced as pandas sparse
+columns instead of dense ones (see SPARSE_DENSITY_THRESHOLD). String values
+are dictionary encoded while walking, so repeated values are stored once per
+column and can be produced as category columns without re-hashing.
+"""
+
+import csv
+import json
+import os
+from array import array
+from fnmatch import fnmatchcase
+
+from record_filter import compile_filter
+
+# Default density below which sparse mode stores a column as a SparseArray
+SPARSE_DENSITY_THRESHOLD = 0.25
+
+# Dictionary-encoded columns with at least this many distinct strings switch
+# to plain values once fewer than two rows share each string on average
+DICTIONARY_MIN_SIZE = 4096
+
+# PathSelector decisions
+EXCLUDED = 0
+PARTIAL = 1
+SELECTED = 2
+
+
+def parse_path_patterns(text):
+    """Split a comma-separated pattern string into a list, or None when empty"""
+    if not text:
+        return None
+    if isinstance(text, str):
+        text = text.split(',')
+    patterns = [pattern.strip() for pattern in text if pattern and pattern.strip()]
+    return patterns or None
+
+
+class PathSelector:
+    """
+    Match key paths against dotted path patterns
+
+    Each pattern segment is a glob matched against one key, so "employee.*"
+    selects every field of employee and "*.id" selects id under any top-level
+    key. A path matching a pattern selects its whole subtree. Patterns starting
+    with "!" exclude a subtree instead, e.g. "!employee.address"; with only
+    exclusions, every other path is selected.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = [tuple(pattern.split('.')) for pattern in patterns if not pattern.startswith('!')]
+        self.excludes = [tuple(pattern[1:].split('.')) for pattern in patterns if pattern.startswith('!')]
+        # Decisions are memoized per path, since records repeat the same paths
+        self._decisions = {}
+
+    @staticmethod
+    def _matches(path, pattern):
+        """Return whether the first segments of path and pattern all match"""
+        return all(fnmatchcase(str(path[i]), pattern[i]) for i in range(min(len(path), len(pattern))))
+
+    def decide(self, path):
+        """Return SELECTED, PARTIAL (a descendant may match) or EXCLUDED for a path"""
+        decision = self._decisions.get(path)
+        if decision is None:
+            decision = EXCLUDED if self.patterns else SELECTED
+            for pattern in self.patterns:
+                if self._matches(path, pattern):
+                    if len(path) >= len(pattern):
+                        decision = SELECTED
+                        break
+                    decision = PARTIAL
+            if any(len(path) >= len(pattern) and self._matches(path, pattern) for pattern in self.excludes):
+                decision = EXCLUDED
+            self._decisions[path] = decision
+        return decision
+
+    def excludes_below(self, path):
+        """Return whether an exclusion pattern may exclude a descendant of path"""
+        return any(len(pattern) > len(path) and self._matches(path, pattern) for pattern in self.excludes)
+
+
+class Column:
+    """
+    Values present in one key path column, with a presence bitmap over rows
+
+    String values are dictionary encoded: each distinct string is stored once
+    in categories and rows hold integer codes into it (-1 for null). A column
+    switches to plain values when it receives a non-string or too many
+    distinct strings to be worth encoding.
+    """
+
+    __slots__ = ('present', 'codes', 'categories', 'lookup', 'values')
+
+    def __init__(self):
+        # Bit (row & 7) of byte (row >> 3) is set when the row has a value
+        self.present = bytearray()
+        self.codes = array('i')
+        self.categories = []
+        self.lookup = {}
+        self.values = None
+
+    def __len__(self):
+        """Number of rows that have a value"""
+        return len(self.codes) if self.values is None else len(self.values)
+
+    def append(self, row, value):
+        """Record value for row; rows must be appended in increasing order"""
+        byte = row >> 3
+        if byte >= len(self.present):
+            self.present.extend(bytes(byte + 1 - len(self.present)))
+        self.present[byte] |= 1 << (row & 7)
+        self.add(value)
+
+    def add(self, value):
+        """Store the value of the next present row"""
+        if self.values is None:
+            if value is None:
+                self.codes.append(-1)
+                return
+            if value.__class__ is str:
+                code = self.lookup.get(value)
+                if code is None:
+                    distinct = len(self.categories)
+                    if distinct >= DICTIONARY_MIN_SIZE and distinct * 2 > len(self.codes):
+                        # Mostly unique strings: codes would only add overhead
+                        self.decode()
+                        self.values.append(value)
+                        return
+                    code = self.lookup[value] = distinct
+                    self.categories.append(value)
+                self.codes.append(code)
+                return
+            self.decode()
+        self.values.append(value)
+
+    def decode(self):
+        """Switch from dictionary codes to plain values"""
+        self.values = self.decoded()
+        self.codes = self.categories = self.lookup = None
+
+    @property
+    def encoded(self):
+        """True while the column holds dictionary codes"""
+        return self.values is None
+
+    def decoded(self):
+        """Return the present values as a list"""
+        if self.values is not None:
+            return self.values
+        categories = self.categories
+        return [categories[code] if code >= 0 else None for code in self.codes]
+
+    def code_array(self):
+        """Return the dictionary codes as a numpy int32 array"""
+        import numpy as np
+
+        return np.frombuffer(self.codes, dtype=np.int32) if len(self.codes) else np.empty(0, dtype=np.int32)
+
+    def rows(self):
+        """Yield the indices of rows that have a value, in order"""
+        for byte_index, byte in enumerate(self.present):
+            if byte:
+                base = byte_index << 3
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield base + bit
+
+    def row_array(self):
+        """Return the indices of rows that have a value as a numpy array"""
+        import numpy as np
+
+        bits = np.unpackbits(np.frombuffer(bytes(self.present), dtype=np.uint8), bitorder='little')
+        return np.flatnonzero(bits)
+
+    def dense(self, n_rows):
+        """Return one value per row, with None for absent rows"""
+        present = self.decoded()
+        if len(present) == n_rows:
+            return present
+        values = [None] * n_rows
+        for row, value in zip(self.rows(), present):
+            values[row] = value
+        return values
+
+    def has_content(self, remove_blank=False):
+        """Return True if any value is non-null (and non-empty when remove_blank)"""
+        if self.values is None:
+            return any(not (remove_blank and value == '') for value in self.categories)
+        for value in self.values:
+            if value is not None and value == value and not (remove_blank and value == ''):
+                return True
+        return False
+
+
+class _PathNode:
+    """Interned key path with its selection state, children, column and position among its siblings"""
+
+    __slots__ = ('path', 'inside', 'excluded', 'children', 'column', 'position')
+
+    def __init__(self, path, inside, excluded, position=0):
+        self.path = path
+        self.inside = inside
+        self.excluded = excluded
+        self.children = {}
+        self.column = None
+        self.position = position
+
+
+class FlatTable:
+    """Flattened JSON records stored as key path -> Column"""
+
+    def __init__(self, select=None, where=None):
+        """
+        Args:
+            select (list): Dotted path patterns to keep (default: None - all paths)
+            where (str): Row filter expression, e.g. 'status == "active"' (default: None - all rows)
+        """
+        self.selector = PathSelector(select) if select else None
+        self.row_filter = compile_filter(where)
+        self.n_filtered = 0
+
+        # Columns keyed by path tuple, in order of first appearance
+        self.columns = {}
+        self.n_rows = 0
+
+        # Top-level keys in their original record order
+        self._top_keys = {}
+
+        # Paths holding an empty object -> (rows holding it, number of columns when first seen).
+        # They produce no columns but are kept in objects folded back below max_level
+        self.empty_objects = {}
+
+        # Object path -> {row: keys} for nested objects whose keys came in another order
+        # than first seen, so objects folded back below max_level keep their own order
+        self.key_orders = {}
+
+        # Trie of interned key paths, so paths are built and matched once per key
+        self._root = _PathNode((), self.selector is None, False)
+
+        # Per max_level cache of (path, Column) pairs
+        self._levels = {}
+
+        # Per (max_level, sparse_threshold) cache: (frame with positional labels, column paths)
+        self._frames = {}
+
+    @classmethod
+    def from_json(cls, json_data, select=None, where=None):
+        """
+        Build a table from parsed JSON data
+
+        Args:
+            json_data: A JSON object or an array of JSON objects
+            select (list): Dotted path patterns to keep (default: None - all paths)
+            where (str): Row filter expression (default: None - all rows)
+        """
+        if isinstance(json_data, list):
+            records = json_data
+        elif isinstance(json_data, dict):
+            records = [json_data]
+        else:
+            raise ValueError("JSON data must be an object or array of objects")
+
+        table = cls(select=select, where=where)
+        table.extend(records)
+        return table
+
+    def extend(self, records):
+        """Append several records"""
+        for record in records:
+            self.append(record)
+
+    def append(self, record):
+        """Append one JSON object as a new row"""
+        if not isinstance(record, dict):
+            raise ValueError("JSON data must be an object or array of objects")
+
+        if self.row_filter is not None and not self.row_filter(record):
+            self.n_filtered += 1
+            return
+
+        # json_normalize places top-level plain values before nested objects
+        row = self.n_rows
+        for key in record:
+            self._top_keys.setdefault(key, len(self._top_keys))
+        self._walk({k: v for k, v in record.items() if not isinstance(v, dict)}, self._root, row)
+        self._walk({k: v for k, v in record.items() if isinstance(v, dict)}, self._root, row)
+        self.n_rows += 1
+
+        # Any derived columns and frames are now stale
+        self._levels.clear()
+        self._frames.clear()
+
+    def _child_node(self, parent, key):
+        """Create the trie node for key under parent"""
+        path = parent.path + (key,)
+        position = len(parent.children)
+        if parent.inside and (self.selector is None or not self.selector.excludes):
+            return _PathNode(path, True, False, position)
+        decision = self.selector.decide(path)
+        return _PathNode(path, decision == SELECTED, decision == EXCLUDED, position)
+
+    def _walk(self, obj, parent, row):
+        """Recursively store the leaves of obj under the parent path node for the given row"""
+        children = parent.children
+        last = -1
+        for key, value in obj.items():
+            node = children.get(key)
+            if node is None:
+                node = children[key] = self._child_node(parent, key)
+            elif node.position < last and parent.path:
+                # Keys in another order than first seen: kept for objects folded below max_level
+                self.key_orders.setdefault(parent.path, {})[row] = tuple(obj)
+            last = node.position
+            if node.excluded:
+                continue
+
+            if isinstance(value, dict):
+                if value:
+                    self._walk(value, node, row)
+                elif node.inside:
+                    # Empty objects produce no columns, as with json_normalize, unless folded
+                    empty = self.empty_objects.get(node.path)
+                    if empty is None:
+                        empty = self.empty_objects[node.path] = (array('i'), len(self.columns))
+                    empty[0].append(row)
+            elif node.inside:
+                column = node.column
+                if column is None:
+                    column = node.column = self.columns[node.path] = Column()
+                # Inlined Column.append(); this is the hot loop
+                present = column.present
+                byte = row >> 3
+                if byte >= len(present):
+                    present.extend(bytes(byte + 1 - len(present)))
+                present[byte] |= 1 << (row & 7)
+                if column.values is not None:
+                    column.values.append(value)
+                else:
+                    code = column.lookup.get(value) if value.__class__ is str else None
+                    if code is None:
+                        column.add(value)
+                    else:
+                        column.codes.append(code)
+
+    def _level_columns(self, max_level):
+        """
+        Return (path, Column) pairs for the given nesting level
+
+        Paths deeper than max_level are folded back into dict values on
+        their ancestor column, matching json_normalize(max_level=...),
+        explicit nulls and empty objects included.
+        """
+        items = self._levels.get(max_level)
+        if items is None:
+            items = self._levels[max_level] = self._build_level_columns(max_level)
+        return items
+
+    def level_columns(self, max_level=None):
+        """Return (path, Column) pairs for a nesting level (None - all levels)"""
+        return self._level_columns(max_level)
+
+    def _build_level_columns(self, max_level):
+        """Compute the (path, Column) pairs returned by _level_columns()"""
+        if max_level is None:
+            return list(self.columns.items())
+
+        depth = max_level + 1
+        # Empty objects at or below the folding depth take the place they were first seen at
+        empty_before = {}
+        for path, (_, position) in self.empty_objects.items():
+            if len(path) >= depth:
+                empty_before.setdefault(position, []).append(path)
+        groups = {}
+        for position, path in enumerate(list(self.columns) + [None]):
+            for empty_path in empty_before.get(position, ()):
+                groups.setdefault(empty_path[:depth], []).append(empty_path)
+            if path is not None:
+                groups.setdefault(path[:depth], []).append(path)
+
+        if max_level == 0:
+            # Nothing is flattened, so columns keep the original key order
+            prefixes = sorted(groups, key=lambda prefix: self._top_keys[prefix[0]])
+        else:
+            prefixes = list(groups)
+
+        items = []
+        key_order = None
+        for prefix in prefixes:
+            paths = groups[prefix]
+            if paths == [prefix] and prefix in self.columns:
+                items.append((prefix, self.columns[prefix]))
+            else:
+                if key_order is None:
+                    key_order = self._key_order()
+                items.append((prefix, self._rebuild_objects(prefix, sorted(paths, key=key_order.__getitem__))))
+        return items
+
+    def _key_order(self):
+        """Return {path: position} for every key path, parents first and keys in order of first appearance"""
+        order = {}
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            order[node.path] = len(order)
+            stack.extend(reversed(list(node.children.values())))
+        return order
+
+    def _rebuild_objects(self, prefix, paths):
+        """Rebuild a column of nested dict values for prefix from its descendant columns and empty objects"""
+        values = {}
+
+        # Scalars stored directly at the prefix take precedence
+        if prefix in self.columns:
+            column = self.columns[prefix]
+            for row, value in zip(column.rows(), column.decoded()):
+                if value is not None:
+                    values[row] = value
+
+        for path in paths:
+            relative = path[len(prefix):]
+            empty = self.empty_objects.get(path) if path not in self.columns else None
+            if empty is not None:
+                pairs = ((row, {}) for row in empty[0])
+            elif path == prefix:
+                continue
+            else:
+                column = self.columns[path]
+                pairs = zip(column.rows(), column.decoded())
+            for row, value in pairs:
+                node = values.get(row)
+                if not relative:
+                    values.setdefault(row, value)  # An empty object at the prefix itself
+                    continue
+                if node is None:
+                    node = values[row] = {}
+                elif not isinstance(node, dict):
+                    continue
+                for key in relative[:-1]:
+                    node = node.setdefault(key, {})
+                node.setdefault(relative[-1], value)
+
+        # Objects whose keys came in their own order get it back
+        for path, orders in self.key_orders.items():
+            if path[:len(prefix)] != prefix:
+                continue
+            relative = path[len(prefix):]
+            for row, keys in orders.items():
+                node = values.get(row)
+                for key in relative:
+                    node = node.get(key) if isinstance(node, dict) else None
+                if isinstance(node, dict):
+                    items = [(key, node.pop(key)) for key in keys if key in node]
+                    items += list(node.items())
+                    node.clear()
+                    node.update(items)
+
+        rebuilt = Column()
+        for row in sorted(values):
+            rebuilt.append(row, values[row])
+        return rebuilt
+
+    def _level_frame(self, max_level, sparse_threshold=None, categorical=False):
+        """Return the cached (frame, paths) pair for a nesting level and storage options"""
+        key = (max_level, sparse_threshold, categorical)
+        cached = self._frames.get(key)
+        if cached is None:
+            import pandas as pd
+
+            items = self._level_columns(max_level)
+            data = {}
+            for position, (_, column) in enumerate(items):
+                if categorical and column.encoded and column.categories:
+                    data[position] = self._categorical_data(column)
+                elif sparse_threshold is not None and len(column) < sparse_threshold * self.n_rows:
+                    data[position] = self._sparse_data(column)
+                else:
+                    data[position] = self._column_data(column)
+            frame = pd.DataFrame(data, index=pd.RangeIndex(self.n_rows))
+            cached = self._frames[key] = (frame, [path for path, _ in items])
+        return cached
+
+    def _column_data(self, column):
+        """Return dense column values, using NaN for columns that are never present"""
+        if not column.has_content():
+            # json_normalize yields a float column of NaN for absent keys
+            return [float('nan')] * self.n_rows
+        return column.dense(self.n_rows)
+
+    def _categorical_data(self, column):
+        """Return a Categorical built directly from a dictionary-encoded column"""
+        import numpy as np
+        import pandas as pd
+
+        codes = column.code_array()
+        if len(codes) != self.n_rows:
+            full = np.full(self.n_rows, -1, dtype=np.int32)
+            full[column.row_array()] = codes
+            codes = full
+        return pd.Categorical.from_codes(codes, categories=column.categories)
+
+    def _sparse_data(self, column):
+        """Return a SparseArray holding only the non-null values of column"""
+        import numpy as np
+        import pandas as pd
+
+        rows = column.row_array()
+        values = column.decoded()
+        present = [value is not None for value in values]
+        if not all(present):
+            rows = rows[np.asarray(present, dtype=bool)]
+            values = [value for value in values if value is not None]
+
+        # Missing numbers become NaN floats and anything else object, as in a dense column
+        kind = pd.Series(values).dtype.kind if values else 'f'
+        if kind in 'iuf':
+            subtype = np.float64
+            present_values = np.asarray(values, dtype=np.float64)
+        else:
+            subtype = object
+            present_values = np.fromiter(values, dtype=object, count=len(values))
+
+        # Laid out densely only while SparseArray collects the present values again
+        dense = np.full(self.n_rows, np.nan, dtype=subtype)
+        dense[rows] = present_values
+        return pd.arrays.SparseArray(dense, fill_value=np.nan, dtype=pd.SparseDtype(subtype, np.nan))
+
+    def column_names(self, separator="_", max_level=None):
+        """Return the flattened column names for the given options"""
+        return [separator.join(str(key) for key in path) for path, _ in self._level_columns(max_level)]
+
+    def to_dataframe(self, separator="_", max_level=None, remove_nulls=False, sparse_threshold=None,
+                     categorical=False):
+        """
+        Produce a DataFrame view of the table
+
+        Args:
+            separator (str): Separator for nested keys (default: "_")
+            max_level (int): Maximum nesting level to flatten (default: None - all levels)
+            remove_nulls (bool): Drop columns that only contain null/empty values
+            sparse_threshold (float): Store columns with a lower fraction of present values
+                as pandas sparse columns (default: None - all columns dense)
+            categorical (bool): Produce dictionary-encoded string columns as category dtype
+        """
+        frame, paths = self._level_frame(max_level, sparse_threshold, categorical)
+
+        # Renaming a shallow copy leaves the cached frame untouched
+        df = frame.copy(deep=False)
+        df.columns = [separator.join(str(key) for key in path) for path in paths]
+
+        if remove_nulls:
+            columns = dict(self._level_columns(max_level))
+            df = df.loc[:, [columns[path].has_content(remove_blank=True) for path in paths]]
+            if sparse_threshold is None:
+                df = df.replace('', float('nan'))
+            else:
+                # SparseArray does not support replace(); mask blanks column by column
+                for position in range(df.shape[1]):
+                    column = df.iloc[:, position]
+                    blank = column.isin([''])
+                    if blank.any():
+                        df.isetitem(position, column.where(~blank))
+
+        return df
+
+    def write_csv(self, output_file, separator="_", max_level=None, remove_nulls=False):
+        """
+        Write the table as CSV using only the standard library
+
+        Used for small inputs, where importing pandas would take longer than
+        the conversion itself. Values are written as DataFrame.to_csv writes
+        them, so the output does not depend on which path produced it.
+
+        Returns:
+            tuple: (rows, columns) written
+        """
+        items = [(path, column.dense(self.n_rows) if column.encoded else _csv_values(column.dense(self.n_rows)))
+                 for path, column in self._level_columns(max_level)
+                 if not remove_nulls or column.has_content(remove_blank=True)]
+        if remove_nulls:
+            items = [(path, [None if value == '' else value for value in values]) for path, values in items]
+
+        with open(output_file, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerow([separator.join(str(key) for key in path) for path, _ in items])
+            writer.writerows(zip(*[values for _, values in items]))
+
+        return self.n_rows, len(items)
+
+
+def _csv_values(values):
+    """
+    Return dense column values formatted as DataFrame.to_csv writes them
+
+    pandas stores a column of numbers with gaps or any float as float64, so
+    its integers are written as "30.0"; NaN is written as an empty field.
+    """
+    numbers = True
+    floats = False
+    missing = False
+    for value in values:
+        if value is None:
+            missing = True
+        elif value.__class__ is float:
+            floats = True
+        elif value.__class__ is not int or not -2 ** 63 <= value < 2 ** 64:
+            # Booleans, strings, nested values and integers beyond 64 bits make an object column
+            numbers = False
+    if numbers and (floats or missing):
+        return [None if value is None or value != value else repr(float(value)) for value in values]
+    if floats:
+        return [None if value.__class__ is float and value != value else value for value in values]
+    return values
+
+
+def conversion_options(separator="_", max_level=None, remove_nulls=False, select=None, where=None,
+                       sparse_threshold=None, categorical=False):
+    """Return the conversion options that identify a flattened result"""
+    return {
+        'separator': separator,
+        'max_level': max_level,
+        'remove_nulls': remove_nulls,
+        'sparse_threshold': sparse_threshold,
+        'categorical': categorical,
+        'select': list(select) if select else None,
+        'where': where.strip() if where and where.strip() else None,
+    }
+
+
+def flatten_file(file_path, separator="_", max_level=None, remove_nulls=False, cache=None, select=None,
+                 where=None, sparse_threshold=None, categorical=False):
+    """
+    Load a JSON file and flatten it into a DataFrame
+
+    Saved tables (see table_file.py) are already flattened and are opened as
+    they are; the flattening options and the cache do not apply to them.
+
+    Args:
+        file_path (str): Path to input JSON file
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        remove_nulls (bool): Drop columns that only contain null/empty values
+        cache (ConversionCache): Optional cache consulted before parsing (default: None)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        sparse_threshold (float): Density below which columns are stored sparse (default: None - dense)
+        categorical (bool): Produce repeated string columns as category dtype (default: False)
+    """
+    from table_file import is_table_file, load_table
+
+    if is_table_file(file_path):
+        return load_table(file_path)[0]
+
+    options = conversion_options(separator, max_level, remove_nulls, select, where, sparse_threshold, categorical)
+
+    digest = None
+    if cache is not None:
+        digest = cache.file_digest(file_path)
+        df = cache.get(digest, options)
+        if df is not None:
+            return df
+
+    with open(file_path, 'r', encoding='utf-8') as file:
+        json_data = json.load(file)
+
+    return _flatten_and_cache(json_data, options, cache, digest)
+
+
+def flatten_bytes(data, separator="_", max_level=None, remove_nulls=False, cache=None, digest=None, select=None,
+                  where=None, sparse_threshold=None, categorical=False):
+    """
+    Flatten the contents of a JSON file that were already read into a DataFrame
+
+    Args:
+        data (bytes): Contents of a JSON file
+        digest (str): Content digest of data, if the caller already hashed it (default: None)
+
+    The other arguments are those of flatten_file().
+    """
+    options = conversion_options(separator, max_level, remove_nulls, select, where, sparse_threshold, categorical)
+
+    if cache is not None:
+        digest = digest or cache.digest_bytes(data)
+        df = cache.get(digest, options)
+        if df is not None:
+            return df
+
+    return _flatten_and_cache(json.loads(data), options, cache, digest)
+
+
+def _flatten_and_cache(json_data, options, cache, digest):
+    """Flatten parsed JSON with conversion options, storing the result in the cache if there is one"""
+    table = FlatTable.from_json(json_data, select=options['select'], where=options['where'])
+    df = table.to_dataframe(options['separator'], options['max_level'], options['remove_nulls'],
+                            options['sparse_threshold'], options['categorical'])
+
+    if cache is not None:
+        try:
+            cache.put(digest, options, df)
+        except OSError:
+            pass  # A full or read-only cache must not fail the conversion
+
+    return df
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Summary statistics for flattened DataFrames that may hold sparse columns
+
+Several pandas frame-wide reductions (memory_usage(deep=True), isnull().sum()
+over mixed sparse/dense frames) fail or densify when some columns are
+SparseArrays, so the GUI summary and the exporters compute them column by
+column here.
+"""
+
+
+def is_sparse(series):
+    """Return True if a Series is backed by a pandas SparseArray"""
+    import pandas as pd
+
+    return isinstance(series.dtype, pd.SparseDtype)
+
+
+def sparse_column_count(df):
+    """Return the number of sparse columns in df"""
+    return sum(1 for _, series in df.items() if is_sparse(series))
+
+
+def missing_values(df):
+    """Return the total number of null cells in df"""
+    return int(sum(series.isnull().sum() for _, series in df.items()))
+
+
+def memory_usage(df):
+    """
+    Return the deep memory usage of df in bytes
+
+    Sparse columns count their stored values and index only.
+    """
+    import pandas as pd
+
+    total = df.index.memory_usage()
+    for _, series in df.items():
+        if is_sparse(series):
+            array = series.array
+            total += pd.Series(array.sp_values).memory_usage(index=False, deep=True)
+            total += array.sp_index.indices.nbytes
+        else:
+            total += series.memory_usage(index=False, deep=True)
+    return int(total)
+
+
+def to_dense(df):
+    """Return df with any sparse columns converted to dense ones"""
+    if not sparse_column_count(df):
+        return df
+    df = df.copy(deep=False)
+    for position, (_, series) in enumerate(df.items()):
+        if is_sparse(series):
+            df.isetitem(position, series.sparse.to_dense())
+    return df
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Incremental exports: append new records to an existing output
+Usage: append_records(iter_file_records("today.ndjson"), "history.csv", key="id")
+
+Daily feeds only need their new records written, so instead of regenerating
+the output from the full history, records are flattened a chunk at a time
+and appended:
+
+- CSV: rows are appended under the existing header. Columns the file has
+  not seen before widen the header, which rewrites the file once.
+- Parquet: the output is a dataset directory and every chunk is written as
+  a new part file. An existing single-file export becomes its first part.
+  Parts can have different columns, so read the dataset with a unified
+  schema (pyarrow.dataset with pyarrow.unify_schemas) to see all of them.
+- SQLite: rows are added to the existing tables (see sqlite_writer.py).
+
+With a key (a dotted path such as customer.id), records whose key was
+already written are skipped. For CSV and Parquet, the written keys are kept
+in an on-disk key index next to the output, so a run checks only its own
+records against it and never reads the history. The index is rebuilt from
+the output if the output changed without it. SQLite outputs are indexed on
+the key column inside the database, and can also replace the existing rows
+(and their child rows) with the new ones.
+"""
+
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from itertools import islice
+
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import FlatTable
+from record_filter import compile_filter
+from sqlite_writer import CHUNK_RECORDS, SQLiteWriter, is_sqlite_file
+
+# What to do with a record whose key was already written
+DUPLICATE_ACTIONS = ('skip', 'replace')
+
+# Key index file next to a CSV output, and inside a Parquet dataset directory
+# (names starting with _ are ignored by Parquet readers)
+KEY_INDEX_SUFFIX = '.keys.sqlite'
+DATASET_KEY_INDEX = '_keys.sqlite'
+
+_PART_PATTERN = re.compile(r'^part-(\d+)\.parquet$')
+
+
+def incremental_format(output_file):
+    """
+    Return the incremental format of an output path: 'csv', 'parquet' or 'sqlite'
+
+    Raises:
+        ValueError: For formats that can only be written whole, such as Excel
+    """
+    if is_sqlite_file(output_file):
+        return 'sqlite'
+    output_format = os.path.splitext(output_file)[1].lower().lstrip('.')
+    if output_format not in ('csv', 'parquet'):
+        raise ValueError(f"Appending is supported for CSV, Parquet and SQLite outputs, not: {output_file}")
+    return output_format
+
+
+def record_key(record, key_path):
+    """Return the value at a key path of a record, or None if it is missing"""
+    value = record
+    for key in key_path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def key_text(value):
+    """Return a key value as the text stored in the key index (None stays None)"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True)
+    return str(value)
+
+
+def output_size(output_file):
+    """Return the bytes of an output file or Parquet dataset directory (0 if missing)"""
+    if os.path.isdir(output_file):
+        return sum(os.path.getsize(os.path.join(output_file, name)) for name in os.listdir(output_file)
+                   if _PART_PATTERN.match(name))
+    return os.path.getsize(output_file) if os.path.exists(output_file) else 0
+
+
+class KeyIndex:
+    """Keys already written to an output, stored in a SQLite file"""
+
+    def __init__(self, index_file, key):
+        """
+        Args:
+            index_file (str): Path to the index database, created if missing
+            key (str): Dotted key path; an index built for another key is cleared
+        """
+        self.connection = sqlite3.connect(index_file)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.meta = dict(self.connection.execute("SELECT name, value FROM meta"))
+        if self.meta.get('key') != key:
+            self.clear()
+            self.set_meta('key', key)
+            self.connection.commit()
+
+    def set_meta(self, name, value):
+        """Store a metadata value, committed with the next commit()"""
+        self.meta[name] = str(value)
+        self.connection.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, str(value)))
+
+    def clear(self):
+        """Forget every key"""
+        self.connection.execute("DELETE FROM keys")
+        self.connection.execute("DELETE FROM meta WHERE name = 'output_size'")
+        self.meta.pop('output_size', None)
+
+    def add(self, key):
+        """Record a key; return True if it was not in the index yet"""
+        return self.connection.execute("INSERT OR IGNORE INTO keys VALUES (?)", (key,)).rowcount == 1
+
+    def extend(self, keys):
+        """Record several keys"""
+        self.connection.executemany("INSERT OR IGNORE INTO keys VALUES (?)", ((key,) for key in keys))
+
+    def is_current(self, output_file):
+        """Return True if the index was last updated together with the output as it is now"""
+        return self.meta.get('output_size') == str(output_size(output_file))
+
+    def commit(self, output_file):
+        """Commit the keys added, recording the output they describe"""
+        self.set_meta('output_size', output_size(output_file))
+        self.connection.commit()
+
+    def close(self):
+        """Close the index; keys not committed are discarded"""
+        self.connection.close()
+
+
+def _existing_csv_keys(output_file, column):
+    """Yield the key column of an existing CSV output as text"""
+    with open(output_file, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        if column not in header:
+            return
+        position = header.index(column)
+        for row in reader:
+            if position < len(row) and row[position] != '':
+                yield row[position]
+
+
+def _existing_parquet_keys(output_dir, column):
+    """Yield the key column of an existing Parquet dataset as text"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires 'pyarrow' package.\nPlease install it using: pip install pyarrow")
+
+    for name in sorted(os.listdir(output_dir)):
+        if not _PART_PATTERN.match(name):
+            continue
+        part = pq.ParquetFile(os.path.join(output_dir, name))
+        if column not in part.schema_arrow.names:
+            continue
+        for value in part.read(columns=[column]).column(0).to_pylist():
+            if value is not None:
+                yield key_text(value)
+
+
+def _flatten(records, select, separator, max_level, remove_nulls=False, coerce=None):
+    """Flatten a chunk of records and return (rows, [(column name, values)])"""
+    table = FlatTable(select=select)
+    table.extend(records)
+    columns = [(separator.join(str(key) for key in path), column.dense(table.n_rows))
+               for path, column in table.level_columns(max_level)
+               if not remove_nulls or column.has_content(remove_blank=True)]
+    if coerce:
+        columns = [(name, coerce.coerce_values(name, values)) for name, values in columns]
+    return table.n_rows, columns
+
+
+def _read_csv_header(output_file):
+    """Return the header of an existing CSV output, or [] if there is none"""
+    if not os.path.exists(output_file):
+        return []
+    with open(output_file, 'r', newline='', encoding='utf-8') as file:
+        return next(csv.reader(file), [])
+
+
+def _rewrite_csv_header(output_file, old_header, header):
+    """Rewrite a CSV output under a wider header, padding existing rows with empty cells"""
+    padding = [''] * (len(header) - len(old_header))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_file)), prefix=".tmp_", suffix=".csv")
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerow(header)
+            if old_header:
+                with open(output_file, 'r', newline='', encoding='utf-8') as source:
+                    reader = csv.reader(source)
+                    next(reader, None)
+                    writer.writerows(row + padding for row in reader)
+        os.replace(tmp_path, output_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class _CSVTarget:
+    """Appends flattened chunks to a CSV file"""
+
+    def __init__(self, output_file, separator, max_level, select, remove_nulls=False, coerce=None):
+        self.output_file = output_file
+        self.separator = separator
+        self.max_level = max_level
+        self.select = select
+        self.remove_nulls = remove_nulls
+        self.coerce = coerce
+        self.header = _read_csv_header(output_file)
+
+    def existing_keys(self, column):
+        return _existing_csv_keys(self.output_file, column) if self.header else ()
+
+    def write(self, records):
+        n_rows, columns = _flatten(records, self.select, self.separator, self.max_level, self.remove_nulls,
+                                   self.coerce)
+        known = set(self.header)
+        new = [name for name, _ in columns if name not in known]
+        if new or not self.header:
+            _rewrite_csv_header(self.output_file, self.header, self.header + new)
+            self.header = self.header + new
+
+        values = dict(columns)
+        absent = [None] * n_rows
+        with open(self.output_file, 'a', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerows(zip(*[values.get(name, absent) for name in self.header]))
+
+    @property
+    def n_columns(self):
+        return len(self.header)
+
+
+class _ParquetTarget:
+    """Writes flattened chunks as new part files of a Parquet dataset directory"""
+
+    def __init__(self, output_dir, separator, max_level, select, remove_nulls=False, coerce=None):
+        self.output_dir = output_dir
+        self.separator = separator
+        self.max_level = max_level
+        self.select = select
+        self.remove_nulls = remove_nulls
+        self.coerce = coerce
+        self.columns = set()
+
+        if os.path.isfile(output_dir):
+            # A whole-file export becomes the first part of the dataset
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_dir)), prefix=".tmp_")
+            os.close(fd)
+            os.replace(output_dir, tmp_path)
+            os.makedirs(output_dir)
+            os.replace(tmp_path, os.path.join(output_dir, "part-00000.parquet"))
+        os.makedirs(output_dir, exist_ok=True)
+        numbers = [int(match.group(1)) for match in map(_PART_PATTERN.match, os.listdir(output_dir)) if match]
+        self.next_part = max(numbers, default=-1) + 1
+
+    def existing_keys(self, column):
+        return _existing_parquet_keys(self.output_dir, column)
+
+    def write(self, records):
+        from exporters import write_parquet
+
+        table = FlatTable(select=self.select)
+        table.extend(records)
+        if not table.n_rows:
+            return
+        df = table.to_dataframe(self.separator, self.max_level, self.remove_nulls)
+        if self.coerce:
+            df = self.coerce.coerce_frame(df)
+        self.columns.update(df.columns)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix=".tmp_", suffix=".parquet")
+        os.close(fd)
+        try:
+            write_parquet(df, tmp_path)
+            os.replace(tmp_path, os.path.join(self.output_dir, f"part-{self.next_part:05d}.parquet"))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.next_part += 1
+
+    @property
+    def n_columns(self):
+        import pyarrow.parquet as pq
+
+        for name in os.listdir(self.output_dir):
+            if _PART_PATTERN.match(name):
+                self.columns.update(pq.read_schema(os.path.join(self.output_dir, name)).names)
+        return len(self.columns)
+
+
+def _unique_records(records, key_path, keep_last):
+    """Return records with at most one per key (first or last occurrence); records without a key are kept"""
+    by_key = {}
+    unkeyed = []
+    for position, record in enumerate(records):
+        key = key_text(record_key(record, key_path))
+        if key is None:
+            unkeyed.append((position, record))
+        elif keep_last or key not in by_key:
+            by_key[key] = (position, record)
+    return [record for _, record in sorted(unkeyed + list(by_key.values()), key=lambda item: item[0])]
+
+
+def append_records(records, output_file, key=None, on_duplicate='skip', separator="_", max_level=None, select=None,
+                   where=None, child_tables=True, table='records', chunk_records=CHUNK_RECORDS, remove_nulls=False,
+                   coerce=None):
+    """
+    Append JSON records to an existing CSV, Parquet or SQLite output, creating it if missing
+
+    Args:
+        records (iterable): JSON objects, e.g. from json_stream.iter_file_records()
+        output_file (str): CSV file, Parquet dataset directory (.parquet) or SQLite database (.db, .sqlite)
+        key (str): Dotted path identifying a record; records whose key was already written are
+            skipped or replaced (default: None - append every record)
+        on_duplicate (str): 'skip', or 'replace' the existing row (SQLite only) (default: 'skip')
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        child_tables (bool): SQLite: write arrays to child tables (default: True)
+        table (str): SQLite: name of the records table (default: 'records')
+        chunk_records (int): Records flattened and written at a time (default: CHUNK_RECORDS)
+        remove_nulls (bool): Write empty strings as missing and leave out columns that only
+            hold null/empty values (default: False)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans; the kinds are
+            decided from the first chunk, not from the rows already in the output (default: None)
+
+    Returns:
+        dict: appended, skipped and replaced record counts, and the output's columns
+    """
+    output_format = incremental_format(output_file)
+    if on_duplicate not in DUPLICATE_ACTIONS:
+        raise ValueError(f"on_duplicate must be one of: {', '.join(DUPLICATE_ACTIONS)}")
+    if on_duplicate == 'replace' and output_format != 'sqlite':
+        raise ValueError("Replacing existing rows needs a SQLite output; CSV and Parquet rows can only be skipped")
+
+    # Filter before the key check, so a rejected record never claims its key
+    row_filter = compile_filter(where)
+    records = iter(records)
+    if row_filter is not None:
+        records = (record for record in records if not isinstance(record, dict) or row_filter(record))
+    chunks = iter(lambda: list(islice(records, chunk_records)), [])
+    key_path = tuple(key.split('.')) if key else None
+
+    if output_format == 'sqlite':
+        return _append_sqlite(chunks, output_file, key_path, on_duplicate, separator, max_level, select,
+                              child_tables, table, remove_nulls, coerce)
+
+    if output_format == 'csv':
+        target = _CSVTarget(output_file, separator, max_level, select, remove_nulls, coerce)
+    else:
+        target = _ParquetTarget(output_file, separator, max_level, select, remove_nulls, coerce)
+    counts = {'appended': 0, 'skipped': 0, 'replaced': 0}
+
+    index = None
+    if key_path:
+        index_file = (os.path.join(output_file, DATASET_KEY_INDEX) if output_format == 'parquet'
+                      else output_file + KEY_INDEX_SUFFIX)
+        index = KeyIndex(index_file, key)
+        if not index.is_current(output_file):
+            # The output was written or changed without the index: re-read its keys once
+            index.clear()
+            index.extend(target.existing_keys(separator.join(key_path)))
+            index.commit(output_file)
+
+    try:
+        for chunk in chunks:
+            if index is not None:
+                kept = []
+                for record in chunk:
+                    value = key_text(record_key(record, key_path))
+                    if value is None or index.add(value):
+                        kept.append(record)
+                counts['skipped'] += len(chunk) - len(kept)
+                chunk = kept
+            if chunk:
+                target.write(chunk)
+            counts['appended'] += len(chunk)
+            if index is not None:
+                # Committed after the rows are written, so a failed write never hides its records
+                index.commit(output_file)
+    finally:
+        if index is not None:
+            index.close()
+
+    counts['columns'] = target.n_columns
+    return counts
+
+
+def _append_sqlite(chunks, output_file, key_path, on_duplicate, separator, max_level, select, child_tables, table,
+                   remove_nulls=False, coerce=None):
+    """Append chunks to a SQLite database, using an index on the key column to find duplicates"""
+    writer = SQLiteWriter(output_file, table, separator, max_level, select, child_tables=child_tables, append=True,
+                          remove_nulls=remove_nulls, coerce=coerce)
+    key_column = separator.join(key_path) if key_path else None
+    counts = {'appended': 0, 'skipped': 0, 'replaced': 0}
+    try:
+        for chunk in chunks:
+            replace_rows = []
+            if key_column:
+                unique = _unique_records(chunk, key_path, keep_last=on_duplicate == 'replace')
+                counts['skipped'] += len(chunk) - len(unique)
+                values = {key_text(record_key(record, key_path)): record_key(record, key_path) for record in unique}
+                values.pop(None, None)
+                found = {}
+                lookup = [value if not isinstance(value, (dict, list)) else text for text, value in values.items()]
+                for row_id, value in writer.find_rows(key_column, lookup):
+                    found.setdefault(key_text(value), []).append(row_id)
+                if on_duplicate == 'skip':
+                    chunk = [record for record in unique if key_text(record_key(record, key_path)) not in found]
+                    counts['skipped'] += len(unique) - len(chunk)
+                else:
+                    chunk = unique
+                    replace_rows = [row_id for row_ids in found.values() for row_id in row_ids]
+                    counts['replaced'] += len(found)
+                    counts['appended'] -= len(found)
+            writer.write(chunk, replace_rows)
+            counts['appended'] += len(chunk)
+        if table not in writer.parents:
+            writer.write([])  # No records: still create the table
+        writer.create_indexes()
+    finally:
+        writer.close()
+
+    counts['columns'] = len(writer.columns.get(table, {}))
+    return counts
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Incremental reading of JSON records from files and streams
+
+Supports a top-level JSON array of objects, a single JSON object, and
+newline-delimited JSON (NDJSON, one object per line). Records are decoded
+one at a time from a bounded buffer, so the whole document never has to be
+held in memory at once.
+"""
+
+import codecs
+import json
+
+# Bytes read from the stream per refill
+READ_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_records(stream, read_size=READ_SIZE):
+    """
+    Yield JSON objects from a binary or text stream
+
+    Args:
+        stream: File-like object opened in binary or text mode
+        read_size (int): Bytes/characters to read per refill (default: 64 KB)
+
+    Raises:
+        json.JSONDecodeError: If the input is not valid JSON
+        ValueError: If a record is not a JSON object
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def refill(size):
+        nonlocal buffer, pos, eof
+        data = stream.read(size)
+        if not data:
+            eof = True
+            if isinstance(data, bytes):
+                buffer = buffer[pos:] + utf8.decode(b'', final=True)
+                pos = 0
+            return
+        if isinstance(data, bytes):
+            data = utf8.decode(data)
+        # Drop the consumed prefix so the buffer stays bounded
+        buffer = buffer[pos:] + data
+        pos = 0
+
+    def skip(chars):
+        """Advance past any of chars, refilling as needed; return the next char or ''"""
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if eof:
+                return ''
+            refill(read_size)
+
+    def decode_value():
+        """Decode one JSON value at pos, reading more input until it is complete"""
+        nonlocal pos
+        size = read_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # A number at the end of the buffer may continue in the next read
+                if end < len(buffer) or eof or buffer[end - 1] in '}]"':
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            refill(size)
+            # Grow reads for records larger than the buffer to avoid re-parsing often
+            size *= 2
+
+    if skip(_WHITESPACE + '\ufeff') == '[':
+        # Top-level array: decode elements one by one
+        pos += 1
+        first = True
+        while True:
+            char = skip(_WHITESPACE)
+            if not char:
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            if char == ']':
+                pos += 1
+                break
+            if not first:
+                if char != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                skip(_WHITESPACE)
+            record = decode_value()
+            if not isinstance(record, dict):
+                raise ValueError("JSON data must be an object or array of objects")
+            yield record
+            first = False
+        if skip(_WHITESPACE):
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+    else:
+        # A single object or NDJSON: whitespace-separated objects
+        while skip(_WHITESPACE):
+            record = decode_value()
+            if not isinstance(record, dict):
+                raise ValueError("JSON data must be an object or array of objects")
+            yield record
+
+
+def iter_file_records(file_path):
+    """Yield JSON objects from a .json or .ndjson file"""
+    with open(file_path, 'rb') as file:
+        yield from iter_records(file)
@@ -2,16 +2,38 @@
 """
 Command-line utility to convert JSON files directly to Excel format
 Usage: python json_to_excel.py input.json output.xlsx
+
+The output extension selects the format (.xlsx, .csv, .parquet, .feather, or
+.db/.sqlite for a SQLite database streamed without building a DataFrame).
+A .feather table saves the flattened data with its conversion options, and
+can be given as the input of later conversions to skip flattening (see
+table_file.py). With --append, the records are added to an existing CSV,
+Parquet dataset or SQLite output, optionally skipping keys already written
+(see incremental.py). Heavy dependencies (pandas, openpyxl) are imported only when
+a conversion needs them; small CSV conversions run on the standard library alone.
 """
 
+import argparse
 import json
-import pandas as pd
 import sys
 import os
-from pandas import json_normalize
-from datetime import datetime
 
-def json_to_excel(input_file, output_file, separator="_", max_level=None):
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import FlatTable, SPARSE_DENSITY_THRESHOLD, conversion_options, flatten_file, parse_path_patterns
+from conversion_cache import ConversionCache
+from exporters import (EXCEL_PROFILES, OUTPUT_FORMATS, analysis_sidecar_path, excel_sheet_ranges, write_excel,
+                       write_output)
+from table_file import is_table_file
+from sqlite_writer import is_sqlite_file
+from type_coercion import TypeCoercer, parse_coercion_rules
+
+# Inputs up to this size are converted to CSV without importing pandas
+FAST_PATH_MAX_BYTES = 1024 * 1024
+
+def json_to_excel(input_file, output_file, separator="_", max_level=None, cache=None, select=None,
+                  where=None, sparse_threshold=None, categorical=False, engine=None, profile='full',
+                  analysis_sidecar=False, coerce=None):
     """
     Convert JSON file to Excel with enhanced formatting
     
@@ -20,117 +42,46 @@ def json_to_excel(input_file, output_file, separator="_", max_level=None):
         output_file (str): Path to output Excel file
         separator (str): Separator for nested keys (default: "_")
         max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        cache (ConversionCache): Reuse flattened results of unchanged files (default: None)
+        select (list): Dotted path patterns to keep, e.g. ["employee.address.*"] (default: None - all paths)
+        where (str): Row filter expression, e.g. 'status == "active"' (default: None - all rows)
+        sparse_threshold (float): Density below which columns are stored sparse (default: None - dense)
+        categorical (bool): Produce repeated string columns as category dtype (default: False)
+        engine (str): 'openpyxl', or 'native' to write the sheet XML directly (default: 'openpyxl')
+        profile (str): Metadata sheets: 'minimal' (none), 'standard' (Summary) or 'full' (default: 'full')
+        analysis_sidecar (bool): Write the metadata to a .analysis.json file after the data (default: False)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
     """
     try:
-        # Load JSON data
+        # Load and flatten JSON data
         print(f"Loading JSON file: {input_file}")
-        with open(input_file, 'r', encoding='utf-8') as file:
-            json_data = json.load(file)
-        
         print(f"Converting JSON to tabular format...")
-        
-        # Convert JSON to DataFrame
-        if isinstance(json_data, list):
-            # Handle array of objects
-            df = json_normalize(json_data, sep=separator, max_level=max_level)
-        elif isinstance(json_data, dict):
-            # Handle single object
-            df = json_normalize([json_data], sep=separator, max_level=max_level)
-        else:
-            raise ValueError("JSON data must be an object or array of objects")
-        
-        # Convert any remaining list/dict columns to strings
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].apply(lambda x: str(x) if isinstance(x, (list, dict)) else x)
+        df = flatten_file(input_file, separator=separator, max_level=max_level, cache=cache, select=select,
+                          where=where, sparse_threshold=sparse_threshold,
+                          categorical=categorical)
+        df = coerce_columns(df, coerce)
         
         print(f"Data shape: {df.shape[0]} rows, {df.shape[1]} columns")
         
+        # Check Excel's sheet limits before writing anything
+        n_sheets = len(excel_sheet_ranges(*df.shape))
+        if n_sheets > 1:
+            print(f"Data exceeds Excel's sheet limits, splitting it across {n_sheets} data sheets")
+        
         # Export to Excel with formatting
         print(f"Exporting to Excel: {output_file}")
         
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Write main data to 'Data' sheet
-            df.to_excel(writer, sheet_name='Data', index=False)
-            
-            # Get the workbook and worksheet objects
-            workbook = writer.book
-            worksheet = writer.sheets['Data']
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            # Add header formatting
-            try:
-                from openpyxl.styles import Font, PatternFill, Alignment
-                header_font = Font(bold=True, color="FFFFFF")
-                header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                header_alignment = Alignment(horizontal="center", vertical="center")
-                
-                for cell in worksheet[1]:  # First row (headers)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-            except ImportError:
-                print("Warning: openpyxl styling features not available. Basic export only.")
-            
-            # Create summary sheet
-            summary_data = {
-                'Metric': [
-                    'Source File',
-                    'Total Rows',
-                    'Total Columns', 
-                    'Missing Values',
-                    'Complete Rows',
-                    'Memory Usage (MB)',
-                    'Conversion Date',
-                    'Separator Used',
-                    'Max Level Used'
-                ],
-                'Value': [
-                    os.path.basename(input_file),
-                    len(df),
-                    len(df.columns),
-                    df.isnull().sum().sum(),
-                    len(df.dropna()),
-                    round(df.memory_usage(deep=True).sum() / 1024 / 1024, 2),
-                    datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    separator,
-                    str(max_level) if max_level else "All levels"
-                ]
-            }
-            
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
-            # Column details sheet
-            col_details = []
-            for col in df.columns:
-                col_info = {
-                    'Column_Name': col,
-                    'Data_Type': str(df[col].dtype),
-                    'Non_Null_Count': df[col].count(),
-                    'Null_Count': df[col].isnull().sum(),
-                    'Unique_Values': df[col].nunique(),
-                    'Sample_Value': str(df[col].dropna().iloc[0]) if not df[col].dropna().empty else 'N/A'
-                }
-                col_details.append(col_info)
-            
-            details_df = pd.DataFrame(col_details)
-            details_df.to_excel(writer, sheet_name='Column_Details', index=False)
+        analysis_file = analysis_sidecar_path(output_file) if analysis_sidecar else None
+        sheet_names = write_excel(df, output_file, os.path.basename(input_file), separator, max_level,
+                                  engine=engine, profile=profile, analysis_file=analysis_file)
         
         print(f"✅ Successfully exported to: {output_file}")
-        print(f"📊 Sheets created: Data, Summary, Column_Details")
+        if analysis_file:
+            print(f"📊 Sheets created: {', '.join(sheet_names)}")
+            if EXCEL_PROFILES[profile]:
+                print(f"📊 Analysis written to: {analysis_file}")
+        else:
+            print(f"📊 Sheets created: {', '.join(list(sheet_names) + list(EXCEL_PROFILES[profile]))}")
         print(f"📈 Data: {len(df)} rows × {len(df.columns)} columns")
         
         return True
@@ -145,23 +96,354 @@ def json_to_excel(input_file, output_file, separator="_", max_level=None):
         print(f"❌ Error: {str(e)}")
         return False
 
+def print_coerced(coerce):
+    """Print the columns a TypeCoercer converted, if any"""
+    if coerce and coerce.coerced:
+        print(f"🔧 Converted columns: {', '.join(f'{name} ({kind})' for name, kind in coerce.coerced.items())}")
+
+def coerce_columns(df, coerce):
+    """Convert the columns of df with a TypeCoercer, reporting the columns converted"""
+    if not coerce:
+        return df
+    df = coerce.coerce_frame(df)
+    print_coerced(coerce)
+    return df
+
+def convert_json_file(input_file, output_file, output_format, separator="_", max_level=None, cache=None, select=None,
+                      where=None, sparse_threshold=None, categorical=False, coerce=None):
+    """
+    Convert JSON file to CSV, Parquet or a table file
+    
+    Args:
+        input_file (str): Path to input JSON file or saved table
+        output_file (str): Path to output file
+        output_format (str): 'csv', 'parquet' or 'feather'
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        cache (ConversionCache): Reuse flattened results of unchanged files (default: None)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        sparse_threshold (float): Density below which columns are stored sparse (default: None - dense)
+        categorical (bool): Produce repeated string columns as category dtype (default: False)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+    """
+    try:
+        print(f"Loading JSON file: {input_file}")
+        print(f"Converting JSON to tabular format...")
+        
+        if (output_format == 'csv' and not coerce and not is_table_file(input_file)
+                and os.path.getsize(input_file) <= FAST_PATH_MAX_BYTES):
+            # Small input: flatten and write in pure Python, skipping the pandas import
+            with open(input_file, 'r', encoding='utf-8') as file:
+                table = FlatTable.from_json(json.load(file), select=select, where=where)
+            shape = table.write_csv(output_file, separator=separator, max_level=max_level)
+        else:
+            df = flatten_file(input_file, separator=separator, max_level=max_level, cache=cache, select=select,
+                              where=where, sparse_threshold=sparse_threshold,
+                              categorical=categorical)
+            df = coerce_columns(df, coerce)
+            options = conversion_options(separator, max_level, select=select, where=where,
+                                         sparse_threshold=sparse_threshold, categorical=categorical)
+            write_output(df, output_file, output_format, os.path.basename(input_file), separator, max_level, options)
+            shape = df.shape
+        
+        print(f"✅ Successfully exported to: {output_file}")
+        print(f"📈 Data: {shape[0]} rows × {shape[1]} columns")
+        
+        return True
+        
+    except FileNotFoundError:
+        print(f"❌ Error: File not found: {input_file}")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON format: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
+def convert_in_chunks_file(input_file, output_file, output_format, separator="_", max_level=None, select=None,
+                           where=None, coerce=None):
+    """
+    Convert a JSON/NDJSON file too large for memory by streaming it in chunks
+
+    Sparse, categorical and Excel profile options do not apply in this mode.
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    from merge_files import convert_in_chunks
+
+    try:
+        print(f"Converting {input_file} in chunks...")
+        result = convert_in_chunks(input_file, output_file, output_format, separator=separator, max_level=max_level,
+                                   select=select, where=where, coerce=coerce)
+        print_coerced(coerce)
+        print(f"✅ Successfully exported to: {output_file}")
+        print(f"📈 Data: {result['rows']} rows × {result['columns']} columns ({result['chunks']} chunks)")
+        return True
+    except FileNotFoundError:
+        print(f"❌ Error: Input file '{input_file}' not found.")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON format: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
+def convert_to_sqlite_file(input_file, output_file, separator="_", max_level=None, select=None, where=None,
+                           index_columns=None, child_tables=True, coerce=None):
+    """
+    Stream a JSON/NDJSON file into a SQLite database
+
+    Args:
+        input_file (str): Path to input JSON or NDJSON file
+        output_file (str): Path to the database, replaced if it exists
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        index_columns (list): Columns of the records table to index after loading (default: None)
+        child_tables (bool): Write arrays to child tables instead of JSON text (default: True)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    from json_stream import iter_file_records
+    from sqlite_writer import write_sqlite
+
+    try:
+        if is_table_file(input_file):
+            raise ValueError("SQLite output is written from the JSON file, not from a saved table")
+        print(f"Loading {input_file} into SQLite...")
+        result = write_sqlite(iter_file_records(input_file), output_file, separator=separator, max_level=max_level,
+                              select=select, where=where, child_tables=child_tables, index_columns=index_columns,
+                              coerce=coerce)
+        print_coerced(coerce)
+        print(f"✅ Successfully exported to: {output_file}")
+        print(f"📈 Data: {result['rows']} rows × {result['columns']} columns")
+        for table, rows in list(result['tables'].items())[1:]:
+            print(f"📊 Child table {table}: {rows} rows")
+        return True
+    except FileNotFoundError:
+        print(f"❌ Error: Input file '{input_file}' not found.")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON format: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
+def append_json_file(input_file, output_file, separator="_", max_level=None, select=None, where=None, key=None,
+                     on_duplicate='skip', child_tables=True, coerce=None):
+    """
+    Append the records of a JSON/NDJSON file to an existing CSV, Parquet or SQLite output
+
+    Args:
+        input_file (str): Path to input JSON or NDJSON file
+        output_file (str): Output to append to, created if missing
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        key (str): Dotted path identifying a record, for de-duplication (default: None)
+        on_duplicate (str): 'skip' or 'replace' records whose key was already written (default: 'skip')
+        child_tables (bool): SQLite: write arrays to child tables (default: True)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    from incremental import append_records
+    from json_stream import iter_file_records
+
+    try:
+        if is_table_file(input_file):
+            raise ValueError("Appending reads the JSON file, not a saved table")
+        print(f"Appending {input_file} to {output_file}...")
+        result = append_records(iter_file_records(input_file), output_file, key=key, on_duplicate=on_duplicate,
+                                separator=separator, max_level=max_level, select=select, where=where,
+                                child_tables=child_tables, coerce=coerce)
+        print_coerced(coerce)
+        print(f"✅ Appended {result['appended']} rows to: {output_file}")
+        if result['replaced']:
+            print(f"🔁 Replaced {result['replaced']} existing rows")
+        if result['skipped']:
+            print(f"⏭️  Skipped {result['skipped']} records with keys already written")
+        print(f"📈 Output columns: {result['columns']}")
+        return True
+    except FileNotFoundError:
+        print(f"❌ Error: Input file '{input_file}' not found.")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON format: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
+def scan_json_file(input_file, max_level=None, select=None):
+    """
+    Print the paths, types and array lengths of a JSON/NDJSON file and the expected output size
+
+    The file is read one record at a time, so large inputs can be checked
+    before committing to a conversion.
+
+    Args:
+        input_file (str): Path to input JSON or NDJSON file
+        max_level (int): Nesting level for the column estimate (default: None - all levels)
+        select (list): Path patterns for the column estimate (default: None - all paths)
+
+    Returns:
+        bool: True if the file could be scanned
+    """
+    from path_profile import PathProfile
+
+    try:
+        print(f"🔍 Scanning {input_file}...")
+        if is_table_file(input_file):
+            # Already flattened: report what the table records about itself
+            from table_file import read_table_metadata
+            metadata = read_table_metadata(input_file)
+            stats = metadata.get('stats', {})
+            print(f"📦 Saved table from {metadata.get('source') or 'unknown source'} ({metadata.get('created', '?')})")
+            print(f"📈 Data: {stats.get('rows', '?')} rows × {stats.get('columns', '?')} columns")
+            print(f"⚙️  Options: {json.dumps(metadata.get('options', {}))}")
+            return True
+        profile = PathProfile.from_file(input_file)
+        print("\n".join(profile.report(max_level, select)))
+        return True
+    except FileNotFoundError:
+        print(f"❌ Error: Input file '{input_file}' not found.")
+        return False
+    except json.JSONDecodeError as e:
+        print(f"❌ Error: Invalid JSON format: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return False
+
 def main():
     """Main function for command-line usage"""
-    if len(sys.argv) < 3:
-        print("Usage: python json_to_excel.py <input.json> <output.xlsx> [separator] [max_level]")
-        print("Example: python json_to_excel.py data.json output.xlsx")
-        print("Example: python json_to_excel.py data.json output.xlsx . 3")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Convert a JSON file to a formatted Excel workbook, CSV, Parquet, a Feather table or SQLite",
+        epilog="Example: python json_to_excel.py data.json output.xlsx . 3"
+    )
+    parser.add_argument("input_file", help="Path to input JSON file, or a .feather table saved by an earlier conversion")
+    parser.add_argument("output_file", nargs="?", default=None,
+                        help="Path to output file (.xlsx, .csv, .parquet, .feather or .db); may be omitted with --scan")
+    parser.add_argument("separator", nargs="?", default="_", help="Separator for nested keys (default: _)")
+    parser.add_argument("max_level", nargs="?", default=None, help="Maximum nesting level to flatten (default: all levels)")
+    parser.add_argument("--select", action="append", default=None, metavar="PATTERNS",
+                        help="Only convert these dotted paths or globs, comma-separated or repeated (e.g. employee.address.*); prefix with ! to exclude a path")
+    parser.add_argument("--where", default=None, metavar="EXPRESSION",
+                        help='Only convert records matching a filter, e.g. \'status == "active" and date >= 2026-01-01\'')
+    parser.add_argument("--sparse", nargs="?", type=float, const=SPARSE_DENSITY_THRESHOLD, default=None, metavar="DENSITY",
+                        help=f"Store columns where a smaller fraction of rows than DENSITY has a value as sparse (default: {SPARSE_DENSITY_THRESHOLD})")
+    parser.add_argument("--categorical", action="store_true",
+                        help="Dictionary-encode repeated string values as category columns")
+    parser.add_argument("--xlsx-engine", choices=("openpyxl", "native"), default="openpyxl",
+                        help="Excel writer; 'native' writes the sheet XML directly and is much faster for large files")
+    parser.add_argument("--profile", choices=tuple(EXCEL_PROFILES), default="full",
+                        help="Excel metadata: minimal (data only), standard (Summary) or full (Summary and Column_Details)")
+    parser.add_argument("--analysis-sidecar", action="store_true",
+                        help="Write the profile's metadata to OUTPUT.analysis.json after the data instead of extra sheets")
+    parser.add_argument("--scan", action="store_true",
+                        help="Report every path with its frequency and types and the estimated columns and memory before converting")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="Inputs estimated to need more memory than this are converted in chunks "
+                             "(default: $JSON_TABULAR_MEMORY_BUDGET_MB or half of the available memory)")
+    parser.add_argument("--sqlite-index", action="append", default=None, metavar="COLUMNS",
+                        help="SQLite output: index these flattened columns after loading, comma-separated or repeated")
+    parser.add_argument("--sqlite-json-arrays", action="store_true",
+                        help="SQLite output: store arrays as JSON text instead of child tables")
+    parser.add_argument("--coerce", default=None, metavar="RULES",
+                        help="Convert columns by rule, e.g. 'created_at=datetime,*_ms=epoch_ms,amount=number,active=bool'")
+    parser.add_argument("--infer-types", action="store_true",
+                        help="Convert text columns whose values all look like ISO dates, numbers or true/false")
+    parser.add_argument("--append", action="store_true",
+                        help="Add the records to an existing .csv, .parquet dataset or SQLite output instead of replacing it")
+    parser.add_argument("--key", default=None, metavar="PATH",
+                        help="With --append: dotted path identifying a record; records with a key already written are skipped")
+    parser.add_argument("--on-duplicate", choices=("skip", "replace"), default="skip",
+                        help="With --append and --key: skip new records with a known key, or replace the old rows (SQLite only)")
+    parser.add_argument("--cache-dir", default=None, help="Conversion cache directory (default: ~/.cache/json_to_tabular)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse and re-flatten the input")
+    args = parser.parse_args()
+    if args.output_file is None and not args.scan:
+        parser.error("the following arguments are required: output_file")
+    
+    output_file = args.output_file
+    max_level = int(args.max_level) if args.max_level and args.max_level.isdigit() else None
+    select = parse_path_patterns(",".join(args.select)) if args.select else None
+    try:
+        coerce = TypeCoercer(parse_coercion_rules(args.coerce), infer=args.infer_types)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.scan:
+        scanned = scan_json_file(args.input_file, max_level, select)
+        if not scanned or output_file is None:
+            sys.exit(0 if scanned else 1)
+        print()
+    
+    if (args.append or is_sqlite_file(output_file)) and (args.sparse is not None or args.categorical):
+        # Both only change how an in-memory DataFrame stores its columns
+        print("⚠️  --sparse and --categorical do not apply to SQLite outputs or --append; ignoring them")
+    
+    if args.append:
+        success = append_json_file(args.input_file, output_file, args.separator, max_level, select=select,
+                                   where=args.where, key=args.key, on_duplicate=args.on_duplicate,
+                                   child_tables=not args.sqlite_json_arrays, coerce=coerce)
+        sys.exit(0 if success else 1)
+    if args.key:
+        parser.error("--key requires --append")
     
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    separator = sys.argv[3] if len(sys.argv) > 3 else "_"
-    max_level = int(sys.argv[4]) if len(sys.argv) > 4 and sys.argv[4].isdigit() else None
+    if is_sqlite_file(output_file):
+        index_columns = parse_path_patterns(",".join(args.sqlite_index)) if args.sqlite_index else None
+        success = convert_to_sqlite_file(args.input_file, output_file, args.separator, max_level, select=select,
+                                         where=args.where, index_columns=index_columns,
+                                         child_tables=not args.sqlite_json_arrays, coerce=coerce)
+        sys.exit(0 if success else 1)
     
-    if not output_file.endswith('.xlsx'):
+    output_format = os.path.splitext(output_file)[1].lower().lstrip('.')
+    if output_format not in OUTPUT_FORMATS:
         output_file += '.xlsx'
+        output_format = 'xlsx'
+    
+    # Fall back to the streaming path instead of running out of memory on large inputs
+    if (os.path.isfile(args.input_file) and not is_table_file(args.input_file)
+            and os.path.getsize(args.input_file) > FAST_PATH_MAX_BYTES):
+        from memory_guard import check_memory_budget
+        
+        budget_check = check_memory_budget(args.input_file, args.memory_budget)
+        if not budget_check['fits']:
+            print(f"⚠️  {args.input_file} needs about {budget_check['estimated_bytes'] / 1024 / 1024:,.0f} MB to convert "
+                  f"in memory, over the {budget_check['budget_bytes'] / 1024 / 1024:,.0f} MB budget; "
+                  f"switching to chunked conversion")
+            success = convert_in_chunks_file(args.input_file, output_file, output_format, args.separator, max_level,
+                                             select=select, where=args.where, coerce=coerce)
+            sys.exit(0 if success else 1)
+    
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ConversionCache(args.cache_dir)
+        except OSError as e:
+            print(f"Warning: conversion cache disabled: {e}")
     
-    success = json_to_excel(input_file, output_file, separator, max_level)
+    if output_format == 'xlsx':
+        success = json_to_excel(args.input_file, output_file, args.separator, max_level, cache=cache, select=select,
+                                where=args.where, sparse_threshold=args.sparse,
+                                categorical=args.categorical, engine=args.xlsx_engine, profile=args.profile,
+                                analysis_sidecar=args.analysis_sidecar, coerce=coerce)
+    else:
+        success = convert_json_file(args.input_file, output_file, output_format, args.separator, max_level,
+                                    cache=cache, select=select, where=args.where, sparse_threshold=args.sparse,
+                                    categorical=args.categorical, coerce=coerce)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Merge many JSON files into a single CSV, Parquet, Feather or Excel table
+Usage: python merge_files.py <output_file> <input files or directories...> [--source-column source_file]
+
+Files are processed one at a time. Each file is flattened and spilled to a
+temporary directory while the union schema is collected: columns keep the
+order in which they are first seen, and columns whose values have different
+types across files are reconciled (int + float become float, any other mix
+becomes text). With a type_coercion.TypeCoercer, text columns are converted
+to dates, numbers or booleans as each source is flattened, reusing the formats
+detected in the first source for the rest. The spilled files are then written to the output in one
+streaming pass, so at most one input file is held in memory.
+
+convert_in_chunks() runs a single large file through the same path, a
+fixed number of records at a time.
+"""
+
+import argparse
+import csv
+import json
+import os
+import pickle
+import sys
+import tempfile
+from datetime import datetime
+from itertools import islice
+
+# Add parent directory to path to import the flattener
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import FlatTable, conversion_options, parse_path_patterns
+from json_stream import iter_file_records
+from exporters import OUTPUT_FORMATS, excel_sheet_name, excel_sheet_ranges
+from type_coercion import TypeCoercer, parse_coercion_rules
+
+# Extensions picked up when an input is a directory
+INPUT_EXTENSIONS = ('.json', '.ndjson', '.jsonl')
+
+# Records flattened at a time by convert_in_chunks()
+CHUNK_RECORDS = 50000
+
+# Rows per file sampled when sizing Excel columns
+WIDTH_SAMPLE_ROWS = 1000
+
+_KINDS = {bool: 'bool', int: 'int', float: 'float', str: 'str', datetime: 'datetime'}
+
+
+def expand_inputs(inputs):
+    """Return input files, expanding directories to their JSON files in name order"""
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(INPUT_EXTENSIONS)
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def reconcile_kind(kinds):
+    """Return the output type for a column from the set of value kinds seen in it"""
+    if not kinds:
+        return 'float'  # Never present: an all-NaN column, as with json_normalize
+    if len(kinds) == 1:
+        kind = next(iter(kinds))
+        return 'str' if kind == 'nested' else kind
+    if kinds == {'int', 'float'}:
+        return 'float'
+    return 'str'
+
+
+def _to_text(value):
+    """Convert a value to text for a column reconciled to strings"""
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+class SchemaUnion:
+    """Union of flattened columns across files, with per-column statistics"""
+
+    def __init__(self, separator="_"):
+        self.separator = separator
+        self.paths = {}
+        self.kinds = {}
+        self.non_null = {}
+        self.samples = {}
+        self.widths = {}
+        # Paths holding integers beyond 64 bits, which pandas keeps as Python objects
+        self.wide_ints = set()
+        self.rows = 0
+
+    def add(self, columns, n_rows, sample_widths=False):
+        """Record a file's (path, values) columns"""
+        self.rows += n_rows
+        for path, values in columns:
+            if path not in self.paths:
+                self.paths[path] = self.separator.join(str(key) for key in path)
+                self.kinds[path] = set()
+                self.non_null[path] = 0
+                self.widths[path] = len(self.paths[path])
+
+            present = [value for value in values if value is not None]
+            self.non_null[path] += len(present)
+            self.kinds[path].update(_KINDS.get(type(value), 'nested') for value in present)
+            if path not in self.wide_ints and any(value.__class__ is int and not -2 ** 63 <= value < 2 ** 64
+                                                  for value in present):
+                self.wide_ints.add(path)
+            if present and path not in self.samples:
+                self.samples[path] = present[0]
+            if sample_widths:
+                width = max((len(str(value)) for value in present[:WIDTH_SAMPLE_ROWS]), default=0)
+                self.widths[path] = max(self.widths[path], width)
+
+    def column_types(self):
+        """Return the reconciled output type of every column"""
+        return {path: reconcile_kind(kinds) for path, kinds in self.kinds.items()}
+
+    def float_columns(self):
+        """Return the paths of number columns pandas would hold as float64: any float, or integers with gaps"""
+        return {path for path, kind in self.column_types().items()
+                if self.kinds[path] and path not in self.wide_ints
+                and (kind == 'float' or kind == 'int' and self.non_null[path] < self.rows)}
+
+
+def merge_json_files(input_files, output_file, output_format=None, separator="_", max_level=None,
+                     source_column=None, select=None, where=None, coerce=None):
+    """
+    Merge JSON/NDJSON files into one output table
+
+    Args:
+        input_files (list): Input files, in the order their rows are written
+        output_file (str): Path to the output file
+        output_format (str): 'csv', 'xlsx', 'parquet' or 'feather' (default: from the output extension)
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        source_column (str): Name of a column holding each row's source file name (default: None - no column)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+
+    Returns:
+        dict: rows, columns, files and the reconciled column types
+    """
+    if output_format is None:
+        output_format = os.path.splitext(output_file)[1].lower().lstrip('.')
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if not input_files:
+        raise ValueError("No input files to merge")
+
+    sources = ((os.path.basename(input_file), iter_file_records(input_file)) for input_file in input_files)
+    return _merge_sources(sources, len(input_files), output_file, output_format, separator, max_level,
+                          source_column, select, where, coerce)
+
+
+def convert_in_chunks(input_file, output_file, output_format=None, separator="_", max_level=None, select=None,
+                      where=None, chunk_records=CHUNK_RECORDS, coerce=None):
+    """
+    Convert one JSON/NDJSON file without holding it in memory
+
+    The file is read record by record and flattened chunk_records records at
+    a time through the same spill-and-stream path as a merge, so memory use is
+    bounded by one chunk instead of the whole file. Columns whose types differ
+    between chunks are reconciled as in a merge.
+
+    Args:
+        input_file (str): Path to the input file
+        output_file (str): Path to the output file
+        output_format (str): 'csv', 'xlsx', 'parquet' or 'feather' (default: from the output extension)
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        chunk_records (int): Records flattened per chunk (default: CHUNK_RECORDS)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+
+    Returns:
+        dict: rows, columns, chunks and the reconciled column types
+    """
+    if output_format is None:
+        output_format = os.path.splitext(output_file)[1].lower().lstrip('.')
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    records = iter_file_records(input_file)
+    chunks = iter(lambda: list(islice(records, chunk_records)), [])
+    name = os.path.basename(input_file)
+    result = _merge_sources(((name, chunk) for chunk in chunks), 1, output_file, output_format, separator,
+                            max_level, None, select, where, coerce)
+    result['chunks'] = result.pop('files')
+    return result
+
+
+def _merge_sources(sources, n_files, output_file, output_format, separator, max_level, source_column, select,
+                   where, coerce=None):
+    """
+    Flatten (name, records) sources one at a time, spilling each, then write them all in one pass
+
+    Returns:
+        dict: rows, columns, files (sources flattened) and the reconciled column types
+    """
+    schema = SchemaUnion(separator)
+
+    with tempfile.TemporaryDirectory(prefix="json_merge_") as spill_dir:
+        # Pass 1: flatten each source once, spill its columns and grow the union schema
+        spills = []
+        names = {}
+        for index, (name, records) in enumerate(sources):
+            names[name] = None
+            table = FlatTable(select=select, where=where)
+            table.extend(records)
+            columns = [(path, column.dense(table.n_rows)) for path, column in table.level_columns(max_level)]
+            if coerce:
+                columns = [(path, coerce.coerce_values(separator.join(str(key) for key in path), values))
+                           for path, values in columns]
+            if source_column:
+                source = (source_column,)
+                columns = [(source, [name] * table.n_rows)] + [
+                    (path, values) for path, values in columns if path != source
+                ]
+            schema.add(columns, table.n_rows, sample_widths=output_format == 'xlsx')
+
+            spill_path = os.path.join(spill_dir, f"{index}.pkl")
+            with open(spill_path, 'wb') as file:
+                pickle.dump((table.n_rows, dict(columns)), file, protocol=pickle.HIGHEST_PROTOCOL)
+            spills.append(spill_path)
+            del table, columns, records
+
+        # Pass 2: write every spilled source against the final schema
+        types = schema.column_types()
+        paths = list(schema.paths)
+
+        def file_columns():
+            for spill_path in spills:
+                with open(spill_path, 'rb') as file:
+                    n_rows, columns = pickle.load(file)
+                os.remove(spill_path)
+                aligned = []
+                for path in paths:
+                    values = columns.get(path)
+                    if values is None:
+                        values = [None] * n_rows
+                    elif types[path] == 'str':
+                        values = [_to_text(value) for value in values]
+                    aligned.append(values)
+                yield n_rows, aligned
+
+        if output_format == 'csv':
+            _write_csv(output_file, schema, paths, file_columns())
+        elif output_format == 'parquet':
+            _write_parquet(output_file, schema, paths, types, file_columns())
+        elif output_format == 'feather':
+            options = conversion_options(separator, max_level, select=select, where=where)
+            _write_feather(output_file, schema, paths, types, file_columns(), ', '.join(names), options)
+        else:
+            _write_excel(output_file, schema, paths, types, file_columns(), n_files, max_level)
+
+    return {
+        'rows': schema.rows,
+        'columns': len(paths),
+        'files': len(spills),
+        'types': {schema.paths[path]: types[path] for path in paths},
+    }
+
+
+def _write_csv(output_file, schema, paths, file_columns):
+    """Stream merged rows to CSV, writing numbers as DataFrame.to_csv writes the concatenated input"""
+    float_columns = schema.float_columns()
+    floats = [position for position, path in enumerate(paths) if path in float_columns]
+    with open(output_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator=os.linesep)
+        writer.writerow([schema.paths[path] for path in paths])
+        for _, aligned in file_columns:
+            for position in floats:
+                # Integers of a float64 column are written as "5.0", NaN as an empty field
+                aligned[position] = [None if value is None or value != value else repr(float(value))
+                                     for value in aligned[position]]
+            writer.writerows(zip(*aligned))
+
+
+def _arrow_schema(pa, schema, paths, types):
+    """Return the Arrow schema of the reconciled columns"""
+    arrow_types = {'bool': pa.bool_(), 'int': pa.int64(), 'float': pa.float64(), 'str': pa.string(),
+                   'datetime': pa.timestamp('us')}
+    return pa.schema([(schema.paths[path], arrow_types[types[path]]) for path in paths])
+
+
+def _write_parquet(output_file, schema, paths, types, file_columns):
+    """Stream merged rows to Parquet, one row group per input file (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires 'pyarrow' package.\nPlease install it using: pip install pyarrow")
+
+    arrow_schema = _arrow_schema(pa, schema, paths, types)
+
+    with pq.ParquetWriter(output_file, arrow_schema) as writer:
+        for n_rows, aligned in file_columns:
+            if n_rows:
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(aligned, arrow_schema)],
+                    schema=arrow_schema
+                ))
+
+
+def _write_feather(output_file, schema, paths, types, file_columns, source_name, options):
+    """Stream merged rows to a table file (see table_file.py), one record batch per input file (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("Table files require 'pyarrow' package.\nPlease install it using: pip install pyarrow")
+    from table_file import METADATA_KEY, table_metadata
+
+    missing = schema.rows * len(paths) - sum(schema.non_null[path] for path in paths)
+    stats = {'rows': schema.rows, 'columns': len(paths), 'missing_values': missing, 'sparse_columns': 0}
+    metadata = table_metadata(None, source_name, options, stats)
+    arrow_schema = _arrow_schema(pa, schema, paths, types).with_metadata(
+        {METADATA_KEY: json.dumps(metadata, default=str).encode('utf-8')}
+    )
+
+    with pa.OSFile(output_file, 'wb') as sink:
+        with pa.ipc.new_file(sink, arrow_schema) as writer:
+            for n_rows, aligned in file_columns:
+                if n_rows:
+                    writer.write_batch(pa.RecordBatch.from_arrays(
+                        [pa.array(values, type=field.type) for values, field in zip(aligned, arrow_schema)],
+                        schema=arrow_schema
+                    ))
+
+
+def _write_excel(output_file, schema, paths, types, file_columns, n_files, max_level):
+    """
+    Stream merged rows to an Excel workbook with Data, Summary and Column_Details sheets
+
+    Rows or columns beyond Excel's sheet limits continue on Data_2, Data_3, ...
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+
+    # The row count is known after pass 1, so every sheet needed to stay within
+    # Excel's limits is created up front; rows then roll over to the next block
+    row_blocks = []
+    sheet_names = []
+    for index, (_, row_stop, column_start, column_stop) in enumerate(
+            excel_sheet_ranges(schema.rows, len(paths))):
+        sheet_names.append(excel_sheet_name('Data', index))
+        worksheet = workbook.create_sheet(sheet_names[-1])
+        block_paths = paths[column_start:column_stop]
+
+        # Widths must be set before rows are streamed
+        for position, path in enumerate(block_paths, 1):
+            worksheet.column_dimensions[get_column_letter(position)].width = min(schema.widths[path] + 2, 50)
+
+        header = []
+        for path in block_paths:
+            cell = WriteOnlyCell(worksheet, value=schema.paths[path])
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header.append(cell)
+        worksheet.append(header)
+
+        if not row_blocks or row_blocks[-1][0] != row_stop:
+            row_blocks.append((row_stop, []))
+        row_blocks[-1][1].append((column_start, column_stop, worksheet))
+
+    row_index = 0
+    block = 0
+    for _, aligned in file_columns:
+        for row in zip(*aligned):
+            while row_index >= row_blocks[block][0]:
+                block += 1
+            row = [_to_text(value) if isinstance(value, (list, dict)) else value for value in row]
+            for column_start, column_stop, worksheet in row_blocks[block][1]:
+                worksheet.append(row[column_start:column_stop])
+            row_index += 1
+
+    missing = schema.rows * len(paths) - sum(schema.non_null[path] for path in paths)
+    summary = workbook.create_sheet('Summary')
+    summary.append(['Metric', 'Value'])
+    for metric, value in [
+        ('Source Files', n_files),
+        ('Total Rows', schema.rows),
+        ('Total Columns', len(paths)),
+        ('Missing Values', missing),
+        ('Conversion Date', datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        ('Separator Used', schema.separator),
+        ('Max Level Used', str(max_level) if max_level else "All levels"),
+        ('Data Sheets', ', '.join(sheet_names)),
+    ]:
+        summary.append([metric, value])
+
+    details = workbook.create_sheet('Column_Details')
+    details.append(['Column_Name', 'Data_Type', 'Non_Null_Count', 'Null_Count', 'Sample_Value'])
+    for path in paths:
+        sample = schema.samples.get(path)
+        details.append([
+            schema.paths[path],
+            types[path],
+            schema.non_null[path],
+            schema.rows - schema.non_null[path],
+            str(sample) if sample is not None else 'N/A',
+        ])
+
+    workbook.save(output_file)
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Merge many JSON files into one CSV, Excel, Parquet or Feather table")
+    parser.add_argument("output_file", help="Path to output file (.csv, .xlsx, .parquet or .feather)")
+    parser.add_argument("inputs", nargs="+", help="Input JSON/NDJSON files or directories")
+    parser.add_argument("--source-column", default=None, metavar="NAME",
+                        help="Add a column with each row's source file name")
+    parser.add_argument("--separator", default="_", help="Separator for nested keys (default: _)")
+    parser.add_argument("--max-level", type=int, default=None, help="Maximum nesting level to flatten (default: all levels)")
+    parser.add_argument("--select", action="append", default=None, metavar="PATTERNS",
+                        help="Only convert these dotted paths or globs, comma-separated or repeated")
+    parser.add_argument("--where", default=None, metavar="EXPRESSION", help="Only convert records matching a filter")
+    parser.add_argument("--coerce", default=None, metavar="RULES",
+                        help="Convert columns by rule, e.g. 'created_at=datetime,*_ms=epoch_ms,amount=number,active=bool'")
+    parser.add_argument("--infer-types", action="store_true",
+                        help="Convert text columns whose values all look like dates, numbers or true/false")
+    args = parser.parse_args()
+
+    input_files = expand_inputs(args.inputs)
+    select = parse_path_patterns(",".join(args.select)) if args.select else None
+
+    try:
+        coerce = TypeCoercer(parse_coercion_rules(args.coerce), infer=args.infer_types)
+        print(f"Merging {len(input_files)} files into: {args.output_file}")
+        result = merge_json_files(input_files, args.output_file, separator=args.separator, max_level=args.max_level,
+                                  source_column=args.source_column, select=select, where=args.where, coerce=coerce)
+    except FileNotFoundError as e:
+        print(f"❌ Error: File not found: {e.filename}")
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        sys.exit(1)
+
+    print(f"✅ Successfully merged {result['files']} files")
+    print(f"📈 Data: {result['rows']} rows × {result['columns']} columns")
+    if coerce.coerced:
+        print(f"🔧 Converted columns: {', '.join(f'{name} ({kind})' for name, kind in coerce.coerced.items())}")
+    mixed = [name for name, kind in result['types'].items() if kind == 'str']
+    if mixed:
+        print(f"📊 Text columns (including reconciled mixed types): {len(mixed)}")
+
+
+if __name__ == "__main__":
+    main()
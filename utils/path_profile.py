@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Per-path structure statistics for JSON records
+Usage: PathProfile.from_file("data.ndjson").report(max_level=2)
+
+Records are walked once into a tree of key paths, the same paths the
+flattener turns into columns. Each path records how many records contain it,
+which JSON types its values had and how long its arrays were. Arrays are
+leaves, as in the flattened output.
+
+Files are scanned record by record (see json_stream.py), so memory grows with
+the number of distinct paths, not with the size of the input. The profile
+also predicts the columns a conversion will produce and roughly how much
+memory the flattened DataFrame will take, before any conversion starts.
+"""
+
+import os
+import sys
+
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import PathSelector, SELECTED
+from json_stream import iter_file_records
+
+# Approximate CPython object sizes used by the memory estimate
+STR_OBJECT_BYTES = 49
+NUMBER_OBJECT_BYTES = 32
+LIST_OBJECT_BYTES = 56
+DICT_OBJECT_BYTES = 232
+
+_NUMERIC_TYPES = {'integer', 'number', 'null'}
+
+
+def json_type(value):
+    """Return the JSON type name of a parsed value"""
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, int):
+        return 'integer'
+    if isinstance(value, float):
+        return 'number'
+    return 'null' if value is None else type(value).__name__
+
+
+def length_bucket(bucket):
+    """Return the label of an array length bucket (a length's bit_length), e.g. 3 → '4–7'"""
+    if bucket < 2:
+        return str(bucket)
+    low = 1 << (bucket - 1)
+    return f"{low}–{2 * low - 1}"
+
+
+def format_bytes(n_bytes):
+    """Return a byte count as a short human-readable size"""
+    for unit in ('B', 'KB', 'MB'):
+        if n_bytes < 1024:
+            return f"{n_bytes:.0f} {unit}" if unit == 'B' else f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} GB"
+
+
+class PathStats:
+    """Statistics of one key path and its child paths"""
+
+    __slots__ = ('path', 'count', 'types', 'chars', 'arrays', 'array_min', 'array_max', 'array_total',
+                 'array_lengths', 'children')
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.types = {}
+        # Total length of the string values, for the memory estimate
+        self.chars = 0
+        self.arrays = 0
+        self.array_min = None
+        self.array_max = 0
+        self.array_total = 0
+        # Array counts by length bucket: the length's bit_length, so 0, 1, 2-3, 4-7, ...
+        self.array_lengths = {}
+        # Child paths by key, in order of first appearance
+        self.children = {}
+
+    @property
+    def dotted(self):
+        """Dotted path as used by path selection patterns"""
+        return '.'.join(str(key) for key in self.path)
+
+    @property
+    def leaf_count(self):
+        """Number of values stored as cells: everything but nested objects"""
+        return self.count - self.types.get('object', 0)
+
+    def add(self, value):
+        """Count one occurrence of value at this path"""
+        self.count += 1
+        kind = json_type(value)
+        self.types[kind] = self.types.get(kind, 0) + 1
+        if kind == 'string':
+            self.chars += len(value)
+        elif kind == 'array':
+            length = len(value)
+            self.arrays += 1
+            self.array_total += length
+            self.array_max = max(self.array_max, length)
+            self.array_min = length if self.array_min is None else min(self.array_min, length)
+            bucket = length.bit_length()
+            self.array_lengths[bucket] = self.array_lengths.get(bucket, 0) + 1
+
+    def type_summary(self):
+        """Return the observed types with counts, most frequent first, e.g. 'string 90, null 10'"""
+        return ', '.join(f"{kind} {count:,}" for kind, count in sorted(self.types.items(), key=lambda item: -item[1]))
+
+    def array_summary(self):
+        """Return the array length range and mean, or '' if no arrays were seen"""
+        if not self.arrays:
+            return ''
+        return f"{self.array_min}–{self.array_max} (avg {self.array_total / self.arrays:.1f})"
+
+    def array_distribution(self):
+        """Return the array counts per length bucket, e.g. '0: 3, 2–3: 10'"""
+        return ', '.join(f"{length_bucket(bucket)}: {count:,}" for bucket, count in sorted(self.array_lengths.items()))
+
+    def value_bytes(self):
+        """Estimate the bytes of the Python objects held by a column of this path's values"""
+        if set(self.types) - {'object'} <= _NUMERIC_TYPES:
+            return 0  # Stored in a numeric array
+        return (self.types.get('string', 0) * STR_OBJECT_BYTES + self.chars
+                + (self.types.get('integer', 0) + self.types.get('number', 0)) * NUMBER_OBJECT_BYTES
+                + self.arrays * LIST_OBJECT_BYTES + self.array_total * 8)
+
+
+class PathProfile(PathStats):
+    """Root of a path statistics tree; count is the number of records"""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(())
+
+    @classmethod
+    def from_json(cls, json_data):
+        """
+        Profile parsed JSON data
+
+        Args:
+            json_data: A JSON object or an array of JSON objects
+        """
+        profile = cls()
+        profile.extend(json_data if isinstance(json_data, list) else [json_data])
+        return profile
+
+    @classmethod
+    def from_file(cls, file_path):
+        """
+        Profile a .json or .ndjson file, reading one record at a time
+
+        Raises:
+            json.JSONDecodeError: If the input is not valid JSON
+            ValueError: If a record is not a JSON object
+        """
+        profile = cls()
+        profile.extend(iter_file_records(file_path))
+        return profile
+
+    def extend(self, records):
+        """Add several records"""
+        for record in records:
+            self.add_record(record)
+
+    def add_record(self, record):
+        """Add one record; non-object records are counted by type only"""
+        self.add(record)
+        if isinstance(record, dict):
+            self._walk(record, self)
+
+    def _walk(self, obj, parent):
+        """Count the keys of obj under the parent path, recursing into objects"""
+        children = parent.children
+        for key, value in obj.items():
+            node = children.get(key)
+            if node is None:
+                node = children[key] = PathStats(parent.path + (key,))
+            node.add(value)
+            if value.__class__ is dict:
+                self._walk(value, node)
+
+    def paths(self):
+        """Yield the PathStats of every path, depth first in order of first appearance"""
+        stack = list(reversed(self.children.values()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children.values()))
+
+    def node(self, path):
+        """Return the PathStats of a key path"""
+        node = self
+        for key in path:
+            node = node.children[key]
+        return node
+
+    @property
+    def max_depth(self):
+        """Length of the deepest key path"""
+        return max((len(node.path) for node in self.paths()), default=0)
+
+    def columns(self, max_level=None, select=None):
+        """
+        Return the predicted output columns as {key path: [PathStats of the values stored in it]}
+
+        Args:
+            max_level (int): Nesting level to flatten; deeper paths fold into their ancestor (default: None - all levels)
+            select (list): Dotted path patterns to keep, as for FlatTable (default: None - all paths)
+        """
+        selector = PathSelector(select) if select else None
+        depth = None if max_level is None else max_level + 1
+        columns = {}
+        for node in self.paths():
+            if not node.leaf_count or (selector is not None and selector.decide(node.path) != SELECTED):
+                continue
+            columns.setdefault(node.path[:depth], []).append(node)
+        return columns
+
+    def estimated_memory(self, columns):
+        """Estimate the memory_usage(deep=True) in bytes of a dense DataFrame with these columns"""
+        total = 0
+        for path, nodes in columns.items():
+            total += self.count * 8
+            if len(nodes) == 1 and nodes[0].path == path:
+                total += nodes[0].value_bytes()
+            else:
+                # Folded into one dict per record holding the path; like memory_usage(deep=True), the
+                # dicts' contents are not counted
+                total += self.node(path).count * DICT_OBJECT_BYTES
+        return total
+
+    def report(self, max_level=None, select=None, limit=None):
+        """
+        Return the profile as printable lines
+
+        Args:
+            max_level (int): Nesting level used for the column estimate (default: None - all levels)
+            select (list): Path patterns used for the column estimate (default: None - all paths)
+            limit (int): Most paths to list (default: None - all)
+        """
+        columns = self.columns(max_level, select)
+        n_paths = sum(1 for _ in self.paths())
+        records = max(self.count, 1)
+        lines = [
+            f"📄 Records: {self.count:,}",
+            f"🔑 Distinct paths: {n_paths:,}",
+            f"📐 Max nesting depth: {self.max_depth}",
+            f"📊 Estimated columns: {len(columns):,}",
+            f"💾 Estimated DataFrame memory: {format_bytes(self.estimated_memory(columns))}",
+            "",
+            f"{'Path':<40} {'Records':>16}  Types",
+        ]
+        for index, node in enumerate(self.paths()):
+            if limit is not None and index >= limit:
+                lines.append(f"... and {n_paths - limit:,} more paths")
+                break
+            name = '  ' * (len(node.path) - 1) + str(node.path[-1])
+            share = f"{node.count:,} ({node.count / records:.0%})"
+            lines.append(f"{name:<40} {share:>16}  {node.type_summary()}")
+            if node.arrays:
+                lines.append(f"{'':<57}  array lengths {node.array_summary()}; {node.array_distribution()}")
+        return lines
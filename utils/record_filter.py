@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Row filter expressions evaluated against raw JSON records
+
+Expressions use Python-like syntax over dotted field paths, for example:
+
+    status == "active"
+    date >= 2026-01-01 and employee.department in ["Sales", "Support"]
+    not archived or score > 4.5
+
+Supported: == != < <= > >= in, not in, and, or, not, parentheses, string and
+number literals, lists, true/false/null. Unquoted ISO dates (2026-01-01,
+2026-01-01T09:30:00Z) are compared as strings, which orders ISO-8601 values
+correctly. A missing field is null; comparing values of incompatible types is
+false rather than an error.
+
+The expression is compiled once into nested closures, so evaluating a record
+does not go through eval().
+"""
+
+import ast
+import operator
+import re
+
+# Quoted strings (left untouched) or an unquoted ISO date/datetime
+_LITERAL_PATTERN = re.compile(
+    r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')'
+    r'|(?<![\w.])(\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:\d{2})?)?)(?![\w.])'
+)
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda left, right: left in right,
+    ast.NotIn: lambda left, right: left not in right,
+}
+
+_ORDERINGS = (operator.lt, operator.le, operator.gt, operator.ge)
+
+# Bare names that are literals rather than field paths
+CONSTANT_NAMES = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+
+_MISSING = object()
+
+
+def _quote_dates(expression):
+    """Wrap unquoted ISO dates in quotes so they parse as string literals"""
+    def replace(match):
+        if match.group(2):
+            return repr(match.group(2))
+        return match.group(1)
+    return _LITERAL_PATTERN.sub(replace, expression)
+
+
+def parse_expression(expression):
+    """
+    Parse a filter expression into an ast node
+
+    Raises:
+        ValueError: If the expression is empty or not valid syntax
+    """
+    if not expression or not expression.strip():
+        raise ValueError("Filter expression is empty")
+    try:
+        return ast.parse(_quote_dates(expression.strip()), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid filter expression: {e.msg}") from None
+
+
+def field_path(node):
+    """Return the key path for a Name/Attribute chain, or None"""
+    keys = []
+    while isinstance(node, ast.Attribute):
+        keys.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    keys.append(node.id)
+    return tuple(reversed(keys))
+
+
+class RecordFilter:
+    """Compiled row filter; call it with a record to test whether it is kept"""
+
+    def __init__(self, expression):
+        """
+        Args:
+            expression (str): Filter expression, e.g. 'status == "active"'
+
+        Raises:
+            ValueError: If the expression is empty or not supported
+        """
+        tree = parse_expression(expression)
+        self.expression = expression.strip()
+        self._test = self._compile(tree)
+
+    def __call__(self, record):
+        """Return True if the record passes the filter"""
+        try:
+            return bool(self._test(record))
+        except TypeError:
+            return False
+
+    def _compile(self, node):
+        """Return a function of a record that evaluates node"""
+        if isinstance(node, ast.BoolOp):
+            parts = [self._compile(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                return lambda record: all(part(record) for part in parts)
+            return lambda record: any(part(record) for part in parts)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self._compile(node.operand)
+            return lambda record: not operand(record)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = self._compile(node.operand)
+            return lambda record: -operand(record)
+
+        if isinstance(node, ast.Compare):
+            return self._compile_compare(node)
+
+        if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float, bool, type(None))):
+            value = node.value
+            return lambda record: value
+
+        if isinstance(node, (ast.List, ast.Tuple)):
+            items = [self._compile(item) for item in node.elts]
+            return lambda record: [item(record) for item in items]
+
+        path = field_path(node)
+        if path is not None:
+            if len(path) == 1 and path[0] in CONSTANT_NAMES:
+                value = CONSTANT_NAMES[path[0]]
+                return lambda record: value
+            return lambda record: self._lookup(record, path)
+
+        raise ValueError(f"Unsupported filter syntax: {ast.unparse(node)}")
+
+    def _compile_compare(self, node):
+        """Compile a (possibly chained) comparison"""
+        operands = [self._compile(node.left)] + [self._compile(value) for value in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARISONS:
+                raise ValueError(f"Unsupported comparison in filter: {ast.unparse(node)}")
+            ops.append(_COMPARISONS[type(op)])
+
+        def compare(record):
+            left = operands[0](record)
+            for op, operand in zip(ops, operands[1:]):
+                right = operand(record)
+                if not _compare(op, left, right):
+                    return False
+                left = right
+            return True
+        return compare
+
+    @staticmethod
+    def _lookup(record, path):
+        """Return the value at path in record, or None if any key is missing"""
+        value = record
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return None
+        return value
+
+
+def _compare(op, left, right):
+    """Apply a comparison, treating incompatible types and ordered nulls as not matching"""
+    if op in _ORDERINGS and (left is None or right is None):
+        return False
+    try:
+        return op(left, right)
+    except TypeError:
+        return False
+
+
+def compile_filter(expression):
+    """Return a RecordFilter for expression, or None when it is empty"""
+    if not expression or not expression.strip():
+        return None
+    return RecordFilter(expression)
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+SQLite output for flattened JSON records
+Usage: write_sqlite(iter_file_records("data.ndjson"), "data.db", index_columns=["customer_id"])
+
+Records are flattened a chunk at a time (see flattener.FlatTable) and
+inserted with executemany() inside one transaction per chunk, so no
+DataFrame of the whole input is ever built. Columns are typed from the
+values they hold (INTEGER, REAL or TEXT; nested objects folded by max_level
+are stored as JSON text), and columns first seen in a later chunk are added
+with ALTER TABLE.
+
+Arrays become child tables instead of text cells: every element of the
+orders array of a records row is a row of records_orders, with a foreign key
+_parent_id to the row's _row_id and its _position in the array. Object
+elements are flattened into columns, plain values are stored in a value
+column, and arrays inside elements become further child tables.
+
+The database is written with WAL journaling and synchronous=OFF while
+loading; indexes on the foreign keys and on any requested columns are
+built once all rows are in. In append mode an existing database is extended
+instead (see incremental.py): row ids continue after the existing ones, and
+rows of the records table can be replaced together with their child rows.
+Data columns renamed to avoid the key columns (a _row_id field is stored as
+_row_id_) are listed in the _flattened_columns table, so appends still find
+them under their flattened name.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from itertools import islice
+
+# Add this directory to path to import the shared flattening engine
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import FlatTable
+from merge_files import reconcile_kind
+
+# File extensions written as SQLite databases
+SQLITE_EXTENSIONS = ('.sqlite', '.sqlite3', '.db')
+
+# Records flattened and inserted per transaction
+CHUNK_RECORDS = 20000
+
+# Row ids or values bound per IN (...) query, below SQLite's parameter limit
+QUERY_BATCH = 500
+
+# Columns added to every table; data columns with these names get a trailing underscore
+ROW_ID = '_row_id'
+PARENT_ID = '_parent_id'
+POSITION = '_position'
+
+# Column holding array elements that are not objects
+ELEMENT_VALUE = 'value'
+
+# Table recording the flattened column name behind every SQL column name, so appends
+# find renamed columns (e.g. a _row_id data column stored as _row_id_) under their own name
+COLUMNS_TABLE = '_flattened_columns'
+
+_AFFINITIES = {'bool': 'INTEGER', 'int': 'INTEGER', 'float': 'REAL', 'str': 'TEXT'}
+_KINDS = {bool: 'bool', int: 'int', float: 'float', str: 'str'}
+_NESTED = (dict, list)
+# Values sqlite3 cannot bind as they are (dates come from type coercion)
+_CONVERTED = (dict, list, datetime)
+
+# Settings for a bulk load; a new database only needs to be durable once it is complete,
+# so synchronous=OFF is added when creating one
+_BULK_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def is_sqlite_file(file_path):
+    """Return True if a path names a SQLite database output"""
+    return os.path.splitext(file_path)[1].lower() in SQLITE_EXTENSIONS
+
+
+def quote_name(name):
+    """Quote a table or column name for SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def column_affinity(values):
+    """Return the SQLite column type for the values first seen in a column ('' if all are null)"""
+    kinds = {_KINDS.get(type(value), 'nested') for value in values if value is not None}
+    return _AFFINITIES[reconcile_kind(kinds)] if kinds else ''
+
+
+def _sql_value(value):
+    """Convert a flattened value to one SQLite can store"""
+    if isinstance(value, _NESTED):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if isinstance(value, datetime):
+        return str(value)  # As DataFrame.to_csv writes it, e.g. 2026-03-01 10:00:00
+    return value
+
+
+class SQLiteWriter:
+    """Flattened tables being written to a SQLite database"""
+
+    def __init__(self, output_file, table='records', separator="_", max_level=None, select=None, where=None,
+                 child_tables=True, append=False, remove_nulls=False, coerce=None):
+        """
+        Args:
+            output_file (str): Path to the database; an existing file is replaced unless append is set
+            table (str): Name of the table holding the records (default: 'records')
+            separator (str): Separator for nested keys in column and child table names (default: "_")
+            max_level (int): Maximum nesting level to flatten (default: None - all levels)
+            select (list): Dotted path patterns to keep (default: None - all paths)
+            where (str): Row filter expression (default: None - all rows)
+            child_tables (bool): Write arrays to child tables instead of JSON text (default: True)
+            append (bool): Add to the tables of an existing database (default: False)
+            remove_nulls (bool): Store empty strings as NULL and leave out columns that only
+                ever hold null/empty values (default: False)
+            coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+        """
+        self.table = table
+        self.separator = separator
+        self.max_level = max_level
+        self.select = select
+        self.where = where
+        self.child_tables = child_tables
+        self.remove_nulls = remove_nulls
+        self.coerce = coerce
+
+        if not append:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(output_file + suffix):
+                    os.remove(output_file + suffix)
+        self.connection = sqlite3.connect(output_file)
+        for pragma in _BULK_PRAGMAS if append else _BULK_PRAGMAS + ("PRAGMA synchronous=OFF",):
+            self.connection.execute(pragma)
+        with self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {quote_name(COLUMNS_TABLE)} "
+                f"(table_name TEXT NOT NULL, column_name TEXT NOT NULL, sql_name TEXT NOT NULL, "
+                f"PRIMARY KEY (table_name, sql_name))"
+            )
+
+        # Per table: parent table name (None for the records table), {column: SQL name},
+        # highest row id and rows written by this writer
+        self.parents = {}
+        self.columns = {}
+        self.last_ids = {}
+        self.rows = {}
+        if append:
+            self._load_schema()
+
+    def _load_schema(self):
+        """Pick up the tables, columns and row ids of an existing database"""
+        names = [name for (name,) in self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        # Databases written before the columns table was added map every column to itself
+        original_names = {}
+        for name, column_name, sql_name in self.connection.execute(
+            f"SELECT table_name, column_name, sql_name FROM {quote_name(COLUMNS_TABLE)}"
+        ):
+            original_names[name, sql_name] = column_name
+        for name in names:
+            columns = [row[1] for row in self.connection.execute(f"PRAGMA table_info({quote_name(name)})")]
+            if ROW_ID not in columns:
+                continue  # Not written by this module
+            references = [row[2] for row in self.connection.execute(f"PRAGMA foreign_key_list({quote_name(name)})")]
+            self.parents[name] = references[0] if references else None
+            self.columns[name] = {original_names.get((name, column), column): column
+                                  for column in columns if column not in (ROW_ID, PARENT_ID, POSITION)}
+            self.last_ids[name] = self.connection.execute(
+                f"SELECT MAX({quote_name(ROW_ID)}) FROM {quote_name(name)}"
+            ).fetchone()[0] or 0
+
+    def write(self, records, replace_rows=()):
+        """
+        Flatten and insert a chunk of records in one transaction
+
+        Args:
+            records (list): JSON objects
+            replace_rows (list): Row ids of the records table to delete in the same transaction (default: none)
+        """
+        table = FlatTable(select=self.select, where=self.where)
+        table.extend(records)
+        with self.connection:
+            if replace_rows:
+                self.delete_rows(self.table, replace_rows)
+            self._insert(self.table, None, table, None)
+
+    def find_rows(self, column_name, values):
+        """
+        Return (row id, value) pairs of the records table rows whose column holds one of values
+
+        The column is indexed first if it is not already, so lookups stay fast
+        as the table grows.
+        """
+        sql_name = self.columns.get(self.table, {}).get(column_name)
+        if sql_name is None:
+            return []
+        with self.connection:
+            self._create_index(self.table, sql_name)
+        found = []
+        values = list(values)
+        for start in range(0, len(values), QUERY_BATCH):
+            batch = values[start:start + QUERY_BATCH]
+            found.extend(self.connection.execute(
+                f"SELECT {quote_name(ROW_ID)}, {quote_name(sql_name)} FROM {quote_name(self.table)} "
+                f"WHERE {quote_name(sql_name)} IN ({', '.join('?' * len(batch))})", batch
+            ))
+        return found
+
+    def delete_rows(self, name, row_ids):
+        """Delete rows of a table and, recursively, their rows in its child tables"""
+        row_ids = list(row_ids)
+        for start in range(0, len(row_ids), QUERY_BATCH):
+            batch = row_ids[start:start + QUERY_BATCH]
+            placeholders = ', '.join('?' * len(batch))
+            for child, parent in self.parents.items():
+                if parent == name:
+                    self.delete_rows(child, [row_id for (row_id,) in self.connection.execute(
+                        f"SELECT {quote_name(ROW_ID)} FROM {quote_name(child)} "
+                        f"WHERE {quote_name(PARENT_ID)} IN ({placeholders})", batch
+                    )])
+            self.connection.execute(
+                f"DELETE FROM {quote_name(name)} WHERE {quote_name(ROW_ID)} IN ({placeholders})", batch
+            )
+
+    def _insert(self, name, parent, table, keys):
+        """
+        Insert a flattened table's rows into a database table, then its arrays into child tables
+
+        Args:
+            name (str): Database table name
+            parent (str): Parent table name, or None for the records table
+            table (FlatTable): Rows to insert
+            keys (list): (parent row id, position) per row, or None for the records table
+        """
+        first_id = self.last_ids.get(name, 0) + 1
+        row_ids = range(first_id, first_id + table.n_rows)
+        self.last_ids[name] = first_id - 1 + table.n_rows
+        self.rows[name] = self.rows.get(name, 0) + table.n_rows
+        known = self.columns.setdefault(name, {})
+
+        columns = []
+        arrays = []
+        for path, column in table.level_columns(self.max_level):
+            column_name = self.separator.join(str(key) for key in path)
+            values = column.dense(table.n_rows)
+            if self.child_tables and any(value.__class__ is list for value in values):
+                elements = []
+                for row_id, value in zip(row_ids, values):
+                    if value.__class__ is list:
+                        elements.extend((row_id, position, element) for position, element in enumerate(value))
+                arrays.append((column_name, elements))
+                # Rows holding something other than an array keep it in the parent column
+                values = [None if value.__class__ is list else value for value in values]
+                if column_name not in known and all(value is None for value in values):
+                    continue
+            if self.remove_nulls:
+                values = [None if value == '' else value for value in values]
+                if column_name not in known and all(value is None or value != value for value in values):
+                    continue  # Added by the first chunk that has a value for it
+            if self.coerce:
+                # Child table columns are planned under their full name, e.g. records_orders_price
+                values = self.coerce.coerce_values(
+                    column_name if parent is None else f"{name}{self.separator}{column_name}", values
+                )
+            columns.append((column_name, values))
+
+        self._create_or_extend(name, parent, columns)
+        names = [known[column_name] for column_name, _ in columns]
+        key_names = [ROW_ID] if keys is None else [ROW_ID, PARENT_ID, POSITION]
+        placeholders = ', '.join('?' * (len(key_names) + len(names)))
+        statement = (f"INSERT INTO {quote_name(name)} ({', '.join(quote_name(n) for n in key_names + names)}) "
+                     f"VALUES ({placeholders})")
+        cells = [[_sql_value(value) for value in values] if any(isinstance(value, _CONVERTED) for value in values)
+                 else values for _, values in columns]
+        if keys is None:
+            self.connection.executemany(statement, zip(row_ids, *cells))
+        else:
+            self.connection.executemany(statement, zip(row_ids, *zip(*keys), *cells) if keys else ())
+
+        for column_name, elements in arrays:
+            child = FlatTable()
+            child.extend(element if isinstance(element, dict) else {ELEMENT_VALUE: element}
+                         for _, _, element in elements)
+            self._insert(f"{name}{self.separator}{column_name}", name, child,
+                         [(row_id, position) for row_id, position, _ in elements])
+
+    def _create_or_extend(self, name, parent, columns):
+        """Create a table for its first rows, or add the columns it has not seen yet"""
+        known = self.columns[name]
+        new = [(column_name, values) for column_name, values in columns if column_name not in known]
+        for column_name, _ in new:
+            sql_name = column_name
+            while sql_name in (ROW_ID, PARENT_ID, POSITION) or sql_name in known.values():
+                sql_name += '_'
+            known[column_name] = sql_name
+        self.connection.executemany(
+            f"INSERT INTO {quote_name(COLUMNS_TABLE)} (table_name, column_name, sql_name) VALUES (?, ?, ?)",
+            [(name, column_name, known[column_name]) for column_name, _ in new]
+        )
+
+        definitions = [f"{quote_name(known[column_name])} {column_affinity(values)}".rstrip()
+                       for column_name, values in new]
+        if name not in self.parents:
+            self.parents[name] = parent
+            keys = [f"{quote_name(ROW_ID)} INTEGER PRIMARY KEY"]
+            if parent is not None:
+                keys += [f"{quote_name(PARENT_ID)} INTEGER NOT NULL "
+                         f"REFERENCES {quote_name(parent)} ({quote_name(ROW_ID)})",
+                         f"{quote_name(POSITION)} INTEGER NOT NULL"]
+            self.connection.execute(f"CREATE TABLE {quote_name(name)} ({', '.join(keys + definitions)})")
+        else:
+            for definition in definitions:
+                self.connection.execute(f"ALTER TABLE {quote_name(name)} ADD COLUMN {definition}")
+
+    def create_indexes(self, index_columns=None):
+        """
+        Index every child table's foreign key, and the given columns of the records table
+
+        Args:
+            index_columns (list): Flattened column names of the records table to index (default: None)
+
+        Raises:
+            ValueError: If a column to index was never written
+        """
+        with self.connection:
+            for name, parent in self.parents.items():
+                if parent is not None:
+                    self._create_index(name, PARENT_ID)
+            for column_name in index_columns or ():
+                sql_name = self.columns.get(self.table, {}).get(column_name)
+                if sql_name is None:
+                    raise ValueError(f"Cannot index unknown column: {column_name}")
+                self._create_index(self.table, sql_name)
+
+    def _create_index(self, name, sql_name):
+        """Index a column of a table unless it already is"""
+        self.connection.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote_name(f'idx_{name}_{sql_name}')} "
+            f"ON {quote_name(name)} ({quote_name(sql_name)})"
+        )
+
+    def close(self):
+        """Make the database durable and close it"""
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA optimize")
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.close()
+
+
+def write_sqlite(records, output_file, table='records', separator="_", max_level=None, select=None, where=None,
+                 child_tables=True, index_columns=None, chunk_records=CHUNK_RECORDS, remove_nulls=False, coerce=None):
+    """
+    Write JSON records to a SQLite database, a chunk at a time
+
+    Args:
+        records (iterable): JSON objects, e.g. from json_stream.iter_file_records()
+        output_file (str): Path to the database; an existing file is replaced
+        table (str): Name of the table holding the records (default: 'records')
+        separator (str): Separator for nested keys (default: "_")
+        max_level (int): Maximum nesting level to flatten (default: None - all levels)
+        select (list): Dotted path patterns to keep (default: None - all paths)
+        where (str): Row filter expression (default: None - all rows)
+        child_tables (bool): Write arrays to child tables instead of JSON text (default: True)
+        index_columns (list): Columns of the records table to index after loading (default: None)
+        chunk_records (int): Records flattened and inserted per transaction (default: CHUNK_RECORDS)
+        remove_nulls (bool): Store empty strings as NULL and leave out all-null columns (default: False)
+        coerce (TypeCoercer): Converts text columns to dates, numbers or booleans (default: None)
+
+    Returns:
+        dict: rows and columns of the records table, and the row count of every table
+    """
+    writer = SQLiteWriter(output_file, table, separator, max_level, select, where, child_tables,
+                          remove_nulls=remove_nulls, coerce=coerce)
+    try:
+        records = iter(records)
+        for chunk in iter(lambda: list(islice(records, chunk_records)), []):
+            writer.write(chunk)
+        if table not in writer.parents:
+            writer.write([])  # No records: still create the table
+        writer.create_indexes(index_columns)
+    finally:
+        writer.close()
+
+    return {
+        'rows': writer.rows.get(table, 0),
+        'columns': len(writer.columns.get(table, {})),
+        'tables': dict(writer.rows),
+    }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Save and reopen flattened tables without re-parsing the JSON (requires pyarrow)
+Usage: save_table(df, "data.feather", table_metadata(df, "data.json", options)); df, meta = load_table("data.feather")
+
+Tables are stored as uncompressed Arrow IPC files (Feather v2), so they can
+be memory-mapped and opened almost instantly. The conversion options,
+source file and summary statistics are embedded in the schema metadata and
+can be read without loading any data. Nested values are stored as text and
+sparse columns are stored dense, as in Parquet exports; columns mixing
+incompatible types are stored as text.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add this directory to path to import the exporters
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from exporters import stringify_nested
+from frame_stats import memory_usage, missing_values, sparse_column_count, to_dense
+
+# File extensions recognized as saved tables
+TABLE_EXTENSIONS = ('.feather', '.arrow')
+
+# Schema metadata key holding the table metadata, and its layout version
+METADATA_KEY = b'json_to_tabular'
+TABLE_FORMAT_VERSION = 1
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("Table files require 'pyarrow' package.\nPlease install it using: pip install pyarrow")
+    return pyarrow
+
+
+def is_table_file(file_path):
+    """Return True if a path names a saved table rather than a JSON file"""
+    return os.path.splitext(file_path)[1].lower() in TABLE_EXTENSIONS
+
+
+def table_metadata(df, source_name=None, options=None, stats=None):
+    """
+    Return the metadata stored with a table
+
+    Args:
+        df (DataFrame): Flattened data, or None if stats is given
+        source_name (str): Name of the JSON file it came from (default: None)
+        options (dict): Conversion options, see flattener.conversion_options() (default: None)
+        stats (dict): Statistics of a table written without a DataFrame (default: None - computed from df)
+    """
+    if stats is None:
+        stats = {
+            'rows': len(df),
+            'columns': len(df.columns),
+            'missing_values': missing_values(df),
+            'memory_bytes': memory_usage(df),
+            'sparse_columns': sparse_column_count(df),
+        }
+    return {
+        'format_version': TABLE_FORMAT_VERSION,
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'source': source_name,
+        'options': options or {},
+        'stats': stats,
+    }
+
+
+def _arrow_array(pa, series):
+    """Convert a column to an Arrow array, falling back to text for mixed types"""
+    try:
+        return pa.Array.from_pandas(series)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.Array.from_pandas(series.map(lambda value: value if value is None or value != value else str(value)))
+
+
+def save_table(df, output_file, metadata=None):
+    """
+    Write a flattened DataFrame as a memory-mappable Arrow IPC file
+
+    Args:
+        df (DataFrame): Flattened data
+        output_file (str): Path to the table file
+        metadata (dict): JSON-serializable metadata, e.g. from table_metadata() (default: None - computed from df)
+    """
+    pa = _pyarrow()
+    if metadata is None:
+        metadata = table_metadata(df)
+
+    frame = stringify_nested(to_dense(df).copy())
+    table = pa.Table.from_arrays(
+        [_arrow_array(pa, series) for _, series in frame.items()],
+        names=[str(column) for column in frame.columns]
+    )
+    table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata, default=str).encode('utf-8')})
+
+    # Uncompressed, so readers can memory-map the columns instead of decoding them
+    with pa.OSFile(output_file, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def read_table_metadata(input_file):
+    """Return the metadata of a table file without reading its data"""
+    pa = _pyarrow()
+    with pa.memory_map(input_file, 'r') as source:
+        schema = pa.ipc.open_file(source).schema
+    return json.loads((schema.metadata or {}).get(METADATA_KEY, b'{}'))
+
+
+def load_table(input_file, memory_map=True):
+    """
+    Open a table file
+
+    Args:
+        input_file (str): Path to the table file
+        memory_map (bool): Map the file instead of reading it into memory (default: True)
+
+    Returns:
+        tuple: (DataFrame, metadata dict)
+    """
+    pa = _pyarrow()
+    source = pa.memory_map(input_file, 'r') if memory_map else pa.OSFile(input_file, 'rb')
+    with source:
+        table = pa.ipc.open_file(source).read_all()
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+    return table.to_pandas(), metadata
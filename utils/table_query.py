@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Indexed filter, search and sort over a flattened DataFrame
+Usage: TableQuery(df).view('employee_department == "Sales" and age >= 30', sort_column="age")
+
+Filters use the record filter syntax (see record_filter.py) with flattened
+column names as fields. Results are arrays of row positions, so a viewer can
+show a page of matching rows with df.iloc[positions[:100]] without copying
+the frame.
+
+Each column is indexed on first use and the index is kept for later queries:
+values are dictionary-encoded (pd.factorize) into a hash map of value → rows
+for equality, membership and text search, and rows are sorted by value per
+kind (numbers, dates, strings) for range comparisons and sorting. After
+that, lookups cost a hash probe or a binary search plus the size of the
+result. In columns holding dates (e.g. converted by type_coercion.py), ISO-8601
+string literals such as "2026-01-01" are compared as dates.
+"""
+
+import ast
+import bisect
+from datetime import datetime
+
+from record_filter import CONSTANT_NAMES, field_path, parse_expression
+from type_coercion import datetime_format
+
+_FLIPPED = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE, ast.Eq: ast.Eq, ast.NotEq: ast.NotEq}
+
+_NOT_CONSTANT = object()
+
+
+def _mask(n_rows, rows):
+    """Return a boolean mask of n_rows rows with rows set"""
+    import numpy as np
+
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[rows] = True
+    return mask
+
+
+def _kind(value):
+    """Return which sort order a value belongs to: 'number', 'datetime', 'str' or None"""
+    if isinstance(value, str):
+        return 'str'
+    if isinstance(value, datetime):
+        return 'datetime'
+    if isinstance(value, (bool, int, float)) or type(value).__module__ == 'numpy':
+        return 'number'
+    return None
+
+
+class ValueIndex:
+    """Hash and sorted indexes over one column's values"""
+
+    def __init__(self, series):
+        """
+        Args:
+            series (Series): Column to index; list/dict values are indexed by their text
+        """
+        import numpy as np
+        import pandas as pd
+
+        if isinstance(series.dtype, pd.SparseDtype):
+            series = series.sparse.to_dense()
+        if series.dtype == object:
+            series = series.map(lambda value: str(value) if isinstance(value, (list, dict)) else value)
+
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        self.n_rows = len(series)
+        self.codes = codes
+        self.values = pd.Index(uniques).tolist()
+        self.lookup = {value: code for code, value in enumerate(self.values)}
+        self.has_dates = (pd.api.types.is_datetime64_any_dtype(series.dtype)
+                          or (series.dtype == object and any(isinstance(value, datetime) for value in self.values)))
+
+        # Rows grouped by code (missing rows, code -1, first); rows stay in table order within a group
+        self.by_code = np.argsort(codes, kind='stable')
+        self.bounds = np.searchsorted(codes[self.by_code], np.arange(-1, len(self.values) + 1))
+
+        self._sorted = {}
+        self._order = None
+        self._text = None
+
+    def rows(self, code):
+        """Return the rows holding the value with this code (-1: missing), in table order"""
+        return self.by_code[self.bounds[code + 1]:self.bounds[code + 2]]
+
+    def missing(self):
+        """Return the rows without a value"""
+        return self.rows(-1)
+
+    def literal(self, value):
+        """Return value as a Timestamp if it is an ISO-8601 string and the column holds dates, else unchanged"""
+        if not self.has_dates or not isinstance(value, str) or datetime_format(value) is None:
+            return value
+        import pandas as pd
+
+        try:
+            stamp = pd.Timestamp(value.strip())
+        except ValueError:
+            return value
+        # Converted dates are stored in UTC without an offset
+        return stamp.tz_convert(None) if stamp.tzinfo is not None else stamp
+
+    def equal(self, value):
+        """Return the rows equal to value"""
+        import numpy as np
+
+        if value is None:
+            return self.missing()
+        value = self.literal(value)
+        try:
+            code = self.lookup.get(value)
+        except TypeError:
+            code = None
+        return self.rows(code) if code is not None else np.empty(0, dtype=np.intp)
+
+    def isin(self, values):
+        """Return the rows equal to any of values"""
+        import numpy as np
+
+        parts = [self.equal(value) for value in values]
+        return np.flatnonzero(_mask(self.n_rows, np.concatenate(parts))) if parts else np.empty(0, dtype=np.intp)
+
+    def truthy(self):
+        """Return the rows whose value is truthy"""
+        return self.isin([value for value in self.values if value])
+
+    def _sorted_kind(self, kind):
+        """Return (sorted distinct values, rows sorted by value, each row's value rank) for one kind"""
+        import numpy as np
+
+        if kind not in self._sorted:
+            codes_of_kind = [code for code, value in enumerate(self.values) if _kind(value) == kind]
+            distinct = np.array([self.values[code] for code in codes_of_kind],
+                                dtype=float if kind == 'number' else object)
+            order = np.argsort(distinct, kind='stable')
+            rank_of_code = np.full(len(self.values) + 1, -1, dtype=np.int64)
+            rank_of_code[np.asarray(codes_of_kind, dtype=np.int64)[order]] = np.arange(len(order))
+            row_rank = rank_of_code[self.codes]  # code -1 picks the trailing -1
+            rows = np.flatnonzero(row_rank >= 0)
+            rows = rows[np.argsort(row_rank[rows], kind='stable')]
+            self._sorted[kind] = (distinct[order].tolist(), rows, row_rank[rows])
+        return self._sorted[kind]
+
+    def compare(self, op, value):
+        """Return the rows whose value compares to value with an ordering operator (ast.Lt, ...)"""
+        import numpy as np
+
+        value = self.literal(value)
+        kind = _kind(value)
+        if value is None or kind is None:
+            return np.empty(0, dtype=np.intp)
+        distinct, rows, ranks = self._sorted_kind(kind)
+        if op is ast.Lt:
+            low, high = 0, bisect.bisect_left(distinct, value)
+        elif op is ast.LtE:
+            low, high = 0, bisect.bisect_right(distinct, value)
+        elif op is ast.Gt:
+            low, high = bisect.bisect_right(distinct, value), len(distinct)
+        else:
+            low, high = bisect.bisect_left(distinct, value), len(distinct)
+        start, stop = np.searchsorted(ranks, [low, high])
+        return np.sort(rows[start:stop])
+
+    def order(self, descending=False):
+        """Return all rows sorted by value: numbers, dates, strings, then other values, missing rows last"""
+        import numpy as np
+
+        if self._order is None:
+            sorted_rows = [self._sorted_kind(kind)[1] for kind in ('number', 'datetime', 'str')]
+            other = np.flatnonzero((self.codes >= 0) & ~_mask(self.n_rows, np.concatenate(sorted_rows)))
+            self._order = (np.concatenate(sorted_rows + [other]), self.missing())
+        present, missing = self._order
+        return np.concatenate([present[::-1] if descending else present, missing])
+
+    def contains_text(self, text):
+        """Return a boolean row mask of values whose text contains text, ignoring case"""
+        import numpy as np
+        import pandas as pd
+
+        if self._text is None:
+            self._text = pd.Series([str(value) for value in self.values], dtype=object)
+        hits = np.zeros(len(self.values) + 1, dtype=bool)
+        hits[:-1] = self._text.str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+        return hits[self.codes]  # code -1 picks the trailing False
+
+
+class TableQuery:
+    """Filter, search and sort a flattened DataFrame through cached per-column indexes"""
+
+    def __init__(self, df, separator="_"):
+        """
+        Args:
+            df (DataFrame): Flattened data (not copied)
+            separator (str): Separator used in the column names, so employee.name finds employee_name
+        """
+        self.df = df
+        self.separator = separator
+        self.columns = {str(column): position for position, column in enumerate(df.columns)}
+        self._indexes = {}
+
+    def index(self, column):
+        """Return the ValueIndex of a column, building it on first use"""
+        if column not in self._indexes:
+            self._indexes[column] = ValueIndex(self.df.iloc[:, self.columns[column]])
+        return self._indexes[column]
+
+    def all_rows(self):
+        import numpy as np
+
+        return np.arange(len(self.df))
+
+    def filter(self, expression):
+        """
+        Return the sorted positions of rows matching a filter expression
+
+        Raises:
+            ValueError: If the expression is invalid or names an unknown column
+        """
+        if not expression or not expression.strip():
+            return self.all_rows()
+        return self._positions(parse_expression(expression))
+
+    def search(self, text, positions=None):
+        """Return the positions (among positions, default all) of rows with text in any column"""
+        import numpy as np
+
+        if not text.strip():
+            return self.all_rows() if positions is None else positions
+        mask = np.zeros(len(self.df), dtype=bool)
+        for column in self.columns:
+            mask |= self.index(column).contains_text(text.strip())
+        return np.flatnonzero(mask) if positions is None else positions[mask[positions]]
+
+    def sort(self, positions, column, descending=False):
+        """Return positions ordered by a column's values"""
+        order = self.index(column).order(descending)
+        if len(positions) == len(self.df):
+            return order
+        return order[_mask(len(self.df), positions)[order]]
+
+    def view(self, expression="", text="", sort_column=None, descending=False):
+        """Return the row positions matching a filter and a text search, optionally sorted"""
+        positions = self.search(text, self.filter(expression))
+        if sort_column:
+            positions = self.sort(positions, sort_column, descending)
+        return positions
+
+    def _column(self, node):
+        """Return the column a field node names, or None if node is not a field"""
+        path = field_path(node)
+        if path is None or (len(path) == 1 and path[0] in CONSTANT_NAMES):
+            return None
+        for name in (self.separator.join(path), '.'.join(path), '_'.join(path)):
+            if name in self.columns:
+                return name
+        raise ValueError(f"Unknown column: {self.separator.join(path)}")
+
+    def _constant(self, node):
+        """Return the literal value of node, or _NOT_CONSTANT"""
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = self._constant(node.operand)
+            return -value if isinstance(value, (int, float)) else _NOT_CONSTANT
+        if isinstance(node, (ast.List, ast.Tuple)):
+            items = [self._constant(item) for item in node.elts]
+            return _NOT_CONSTANT if _NOT_CONSTANT in items else items
+        if isinstance(node, ast.Name) and node.id in CONSTANT_NAMES:
+            return CONSTANT_NAMES[node.id]
+        return _NOT_CONSTANT
+
+    def _positions(self, node):
+        """Return the sorted row positions where node is true"""
+        import numpy as np
+
+        if isinstance(node, ast.BoolOp):
+            masks = [_mask(len(self.df), self._positions(value)) for value in node.values]
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return np.flatnonzero(combine.reduce(masks))
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return np.flatnonzero(~_mask(len(self.df), self._positions(node.operand)))
+
+        if isinstance(node, ast.Compare):
+            result = None
+            left = node.left
+            for op, right in zip(node.ops, node.comparators):
+                part = self._comparison(left, op, right)
+                result = part if result is None else result[_mask(len(self.df), part)[result]]
+                left = right
+            return result
+
+        column = self._column(node)
+        if column is not None:
+            return self.index(column).truthy()
+
+        value = self._constant(node)
+        if value is not _NOT_CONSTANT:
+            return self.all_rows() if value else np.empty(0, dtype=np.intp)
+
+        raise ValueError(f"Unsupported filter syntax: {ast.unparse(node)}")
+
+    def _comparison(self, left, op, right):
+        """Return the rows where one column compared with a literal is true"""
+        import numpy as np
+
+        op_type = type(op)
+        column, value = self._column(left), self._constant(right)
+        if column is None or value is _NOT_CONSTANT:
+            if op_type not in _FLIPPED:
+                raise ValueError(f"Unsupported comparison in filter: {ast.unparse(left)} ... {ast.unparse(right)}")
+            column, value, op_type = self._column(right), self._constant(left), _FLIPPED[op_type]
+        if column is None or value is _NOT_CONSTANT:
+            raise ValueError("Comparisons must be between a column and a value")
+
+        index = self.index(column)
+        if op_type in (ast.Eq, ast.NotEq):
+            rows = index.equal(value)
+        elif op_type in (ast.In, ast.NotIn):
+            if not isinstance(value, list):
+                raise ValueError("'in' needs a list of values, e.g. status in [\"a\", \"b\"]")
+            rows = index.isin(value)
+        else:
+            return index.compare(op_type, value)
+
+        if op_type in (ast.NotEq, ast.NotIn):
+            return np.flatnonzero(~_mask(len(self.df), rows))
+        return rows
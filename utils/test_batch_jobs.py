@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for resumable batch conversion jobs
+"""
+
+import builtins
+import os
+import sys
+import json
+
+import pandas as pd
+
+# Add parent directory to path to import batch_jobs
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from batch_jobs import BatchJob, FAILURE_REPORT_NAME, MANIFEST_NAME
+
+
+def write_inputs(directory):
+    paths = []
+    for name in ("a", "b"):
+        path = directory / f"{name}.json"
+        path.write_text(json.dumps([{'id': 1, 'info': {'name': name}}]), encoding='utf-8')
+        paths.append(str(path))
+    broken = directory / "broken.json"
+    broken.write_text("{not json", encoding='utf-8')
+    return paths + [str(broken)]
+
+
+def test_batch_records_manifest_and_resumes(tmp_path):
+    inputs = write_inputs(tmp_path)
+    out = tmp_path / "out"
+
+    job = BatchJob(str(out), backoff=0)
+    assert job.run(inputs) == {'converted': 2, 'skipped': 0, 'failed': 1}
+    assert pd.read_excel(out / "a_converted.xlsx", sheet_name='Data')['info_name'].tolist() == ['a']
+
+    with open(out / MANIFEST_NAME, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    record = manifest[os.path.abspath(inputs[0])]
+    assert record['status'] == 'done' and len(record['input_hash']) == 64 and record['seconds'] >= 0
+
+    # Invalid JSON is not retried and is listed in the failure report
+    with open(out / FAILURE_REPORT_NAME, 'r', encoding='utf-8') as file:
+        report = json.load(file)
+    assert report['failed'] == 1
+    assert report['files'][0]['attempts'] == 1
+    assert report['files'][0]['error_type'] == 'JSONDecodeError'
+
+    # A new job picks up the manifest: unchanged files are skipped, changed ones redone
+    (tmp_path / "b.json").write_text(json.dumps([{'id': 2}]), encoding='utf-8')
+    (tmp_path / "broken.json").write_text(json.dumps({'id': 3}), encoding='utf-8')
+    resumed = BatchJob(str(out), backoff=0)
+    assert resumed.completed(inputs) == [inputs[0]]
+    assert resumed.run(inputs) == {'converted': 2, 'skipped': 1, 'failed': 0}
+    assert not os.path.exists(out / FAILURE_REPORT_NAME)
+
+
+def test_transient_failures_are_retried(tmp_path):
+    inputs = write_inputs(tmp_path)[:1]
+    calls = []
+
+    def flaky(input_path, output_path):
+        calls.append(input_path)
+        if len(calls) < 3:
+            raise OSError("disk busy")
+        with open(output_path, 'w', encoding='utf-8') as file:
+            file.write("ok")
+
+    job = BatchJob(str(tmp_path / "out"), max_retries=2, backoff=0)
+    assert job.run(inputs, flaky) == {'converted': 1, 'skipped': 0, 'failed': 0}
+    assert job.manifest[os.path.abspath(inputs[0])]['attempts'] == 3
+
+    calls.clear()
+    job = BatchJob(str(tmp_path / "out2"), max_retries=1, backoff=0)
+    assert job.run(inputs, flaky)['failed'] == 1
+    assert job.failures()[0]['error'] == "disk busy"
+    assert not [name for name in os.listdir(tmp_path / "out2") if name.startswith('.tmp')]
+
+
+def test_pipelined_run_matches_sequential_run(tmp_path):
+    inputs = write_inputs(tmp_path) + [str(tmp_path / "missing.json")]
+    out = tmp_path / "out"
+    seen = []
+
+    job = BatchJob(str(out), backoff=0)
+    counts = job.run_pipelined(inputs, separator=".", workers=2, queue_size=1,
+                               progress=lambda index, total, path, status: seen.append((index, total, status)))
+    assert counts == {'converted': 2, 'skipped': 0, 'failed': 2}
+    assert [index for index, _, _ in seen] == [1, 2, 3, 4]
+    assert pd.read_excel(out / "b_converted.xlsx", sheet_name='Data')['info.name'].tolist() == ['b']
+    assert sorted(record['error_type'] for record in job.failures()) == ['FileNotFoundError', 'JSONDecodeError']
+
+    assert BatchJob(str(out)).run_pipelined(inputs, workers=1)['skipped'] == 2
+
+
+def test_pipelined_run_reads_each_input_once(tmp_path, monkeypatch):
+    inputs = write_inputs(tmp_path)[:2]
+    log_path = str(tmp_path / "opens.log")
+    real_open = builtins.open
+
+    def logging_open(file, *args, **kwargs):
+        if file in inputs:
+            # Appended with os calls so opens in the forked workers are logged too
+            fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+            os.write(fd, f"{file}\n".encode('utf-8'))
+            os.close(fd)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', logging_open)
+    job = BatchJob(str(tmp_path / "out"), backoff=0)
+    assert job.run_pipelined(inputs, workers=1)['converted'] == 2
+    monkeypatch.undo()
+
+    with open(log_path, 'r', encoding='utf-8') as file:
+        opened = file.read().splitlines()
+    assert sorted(opened) == sorted(inputs)
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for the column name index used by the GUI's column browser
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import column_index
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from column_index import ColumnIndex
+
+
+def test_pages_and_positions():
+    index = ColumnIndex([f"col_{i}" for i in range(25)], page_size=10)
+    assert index.page_count == 3
+    assert list(index.page(2)) == [20, 21, 22, 23, 24]
+    assert list(index.page(7)) == list(index.page(2))
+    assert index.position("col_13") == 13
+    assert index.page_of(13) == 1
+    assert index.position("missing") is None
+    assert ColumnIndex([]).page_count == 1
+
+
+def test_search_matches_all_words_case_insensitively():
+    index = ColumnIndex(["id", "employee_address_city", "employee_name", "City", "address"])
+    assert index.search("ADDR city") == [1]
+    assert index.search("city") == [1, 3]
+    assert index.search("address") == [4, 1]
+    assert index.search("", limit=2) == [0, 1]
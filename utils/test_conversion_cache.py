@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk conversion cache
+"""
+
+import os
+import sys
+import json
+import time
+import pandas as pd
+
+# Add parent directory to path to import conversion_cache
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import conversion_cache
+from conversion_cache import ConversionCache
+from flattener import FlatTable, flatten_file, conversion_options
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+
+
+def test_repeat_conversion_is_served_from_cache(tmp_path):
+    """A second conversion of an unchanged file does not parse it again"""
+    cache = ConversionCache(str(tmp_path / "cache"))
+    source = str(tmp_path / "data.json")
+    write_json(source, [{'id': 1, 'info': {'name': 'a'}}, {'id': 2, 'info': {'name': 'b'}}])
+
+    first = flatten_file(source, cache=cache)
+    assert list(first.columns) == ['id', 'info_name']
+
+    # Corrupt the file without changing size or mtime: the cached table is used
+    stat = os.stat(source)
+    with open(source, 'r+', encoding='utf-8') as file:
+        file.write('X')
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    second = flatten_file(source, cache=cache)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_options_are_part_of_the_key(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    source = str(tmp_path / "data.json")
+    write_json(source, {'a': {'b': 1}})
+
+    assert list(flatten_file(source, separator="_", cache=cache).columns) == ['a_b']
+    assert list(flatten_file(source, separator=".", cache=cache).columns) == ['a.b']
+
+
+def test_changed_file_is_reconverted(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    source = str(tmp_path / "data.json")
+    write_json(source, {'a': 1})
+    flatten_file(source, cache=cache)
+
+    write_json(source, {'a': 1, 'b': 2})
+    os.utime(source, (time.time() + 10, time.time() + 10))
+    assert list(flatten_file(source, cache=cache).columns) == ['a', 'b']
+
+
+def test_entries_round_trip_every_column_kind(tmp_path):
+    """Entries are columnar files, not pickles, and give back the exact frame"""
+    cache = ConversionCache(str(tmp_path / "cache"))
+    records = [{'id': i, 'name': f"n{i % 3}", 'score': i / 3 if i % 4 else None, 'ok': i % 2 == 0,
+                'tags': ['a', {'b': i}] if i % 5 == 0 else None, 'mixed': [1, 'x', None, 2.5, True][i % 5],
+                'info': {'rare': 'x'} if i == 7 else {}} for i in range(40)]
+    table = FlatTable.from_json(records)
+
+    for settings in ({}, {'sparse_threshold': 0.25}, {'categorical': True}):
+        df = table.to_dataframe(**settings)
+        options = conversion_options(**settings)
+        cache.put('digest', options, df)
+        with open(cache._entry_path('digest', options), 'rb') as file:
+            assert file.read(len(conversion_cache.ENTRY_MAGIC)) == conversion_cache.ENTRY_MAGIC
+        cached = cache.get('digest', options)
+        pd.testing.assert_frame_equal(df, cached, check_exact=True)
+        assert cached['tags'].tolist()[5] == ['a', {'b': 5}]
+
+
+def test_entries_from_other_builds_are_ignored(tmp_path, monkeypatch):
+    cache = ConversionCache(str(tmp_path / "cache"))
+    options = conversion_options()
+    cache.put('digest', options, pd.DataFrame({'value': [1]}))
+    assert cache.get('digest', options) is not None
+
+    # Another version of the flattening code writes and reads other entries
+    monkeypatch.setattr(conversion_cache, '_fingerprint', 'other build')
+    assert cache.get('digest', options) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ConversionCache(str(tmp_path / "cache"), max_bytes=10 ** 9)
+    options = conversion_options()
+    frames = {name: pd.DataFrame({'value': range(1000)}) for name in ('old', 'used', 'new')}
+
+    for age, name in enumerate(('old', 'used', 'new')):
+        cache.put(name, options, frames[name])
+        entry = cache._entry_path(name, options)
+        os.utime(entry, (1000 + age, 1000 + age))
+
+    # Reading 'used' makes it the most recently used entry
+    assert cache.get('used', options) is not None
+
+    # A file a concurrent put() is still writing is neither counted nor removed
+    pending = tmp_path / "cache" / "tables" / "pending.tmp"
+    pending.write_bytes(b'x' * 10 ** 6)
+    os.utime(pending, (1, 1))
+
+    entry_size = os.path.getsize(cache._entry_path('new', options))
+    cache.max_bytes = entry_size * 2
+    cache.evict()
+    assert pending.exists()
+
+    assert cache.get('old', options) is None
+    assert cache.get('new', options) is not None
+    assert cache.get('used', options) is not None
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP conversion service and streaming JSON reader
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import threading
+import http.client
+
+# Add parent directory to path to import conversion_server
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import conversion_server
+from conversion_server import ConversionServer
+from json_stream import iter_records
+
+
+def test_iter_records_reads_arrays_objects_and_ndjson():
+    records = [{'id': i, 'info': {'name': 'x' * i}} for i in range(50)]
+    array = json.dumps(records).encode('utf-8')
+    ndjson = "\n".join(json.dumps(record) for record in records).encode('utf-8')
+
+    assert list(iter_records(io.BytesIO(array), read_size=5)) == records
+    assert list(iter_records(io.BytesIO(ndjson), read_size=5)) == records
+    assert list(iter_records(io.StringIO('{"a": 1}'))) == [{'a': 1}]
+
+    for bad in (b'[{"a": 1},]', b'[{"a": 1}', b'[1, 2]'):
+        try:
+            list(iter_records(io.BytesIO(bad)))
+        except ValueError:
+            pass
+        else:
+            assert False, bad
+
+
+_real_convert = conversion_server._convert
+
+
+def slow_convert(input_path, *args):
+    """Conversion that waits until a .go file appears next to its input (worker side)"""
+    while not os.path.exists(input_path + '.go'):
+        time.sleep(0.01)
+    return _real_convert(input_path, *args)
+
+
+def request(server, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response, data
+
+
+def test_server_converts_uploads_and_local_paths(tmp_path):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps([{'id': 1, 'info': {'name': 'a'}}]), encoding='utf-8')
+
+    server = ConversionServer(('127.0.0.1', 0), workers=1, max_pending=1, allow_path_root=str(tmp_path))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        ndjson = b'{"id": 1, "info": {"name": "a"}}\n{"id": 2, "info": {"name": "b"}}\n'
+        response, data = request(server, 'POST', '/convert?format=csv&separator=.', ndjson)
+        assert response.status == 200
+        assert data.decode('utf-8').splitlines() == ['id,info.name', '1,a', '2,b']
+
+        response, data = request(server, 'POST', f'/convert?format=xlsx&path={source}')
+        assert response.status == 200
+        assert data[:2] == b'PK'
+
+        response, _ = request(server, 'POST', '/convert?path=/etc/passwd')
+        assert response.status == 403
+
+        response, _ = request(server, 'POST', '/convert', b'[1, 2]')
+        assert response.status == 400
+
+        # With the only slot taken, further requests are turned away
+        server.slots.acquire()
+        response, _ = request(server, 'POST', '/convert', b'{"a": 1}')
+        assert response.status == 503
+        assert response.getheader('Retry-After') == '1'
+        server.slots.release()
+
+        response, data = request(server, 'GET', '/health')
+        health = json.loads(data)
+        assert health['completed'] == 2
+        assert health['rejected'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_malformed_body_framing_is_a_bad_request():
+    server = ConversionServer(('127.0.0.1', 0), workers=1, max_pending=1)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        response, data = request(server, 'POST', '/convert', b'zz\r\n{"a": 1}\r\n0\r\n\r\n',
+                                 {'Transfer-Encoding': 'chunked'})
+        assert response.status == 400
+        assert 'chunk size' in json.loads(data)['error']
+
+        connection = http.client.HTTPConnection(*server.server_address, timeout=30)
+        connection.putrequest('POST', '/convert')
+        connection.putheader('Content-Length', 'ten')
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        connection.close()
+
+        # The slot of the rejected request was given back
+        response, data = request(server, 'POST', '/convert', b'{"a": 1}')
+        assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+def test_timed_out_conversion_keeps_its_slot_until_it_ends(tmp_path, monkeypatch):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps([{'id': 1}]), encoding='utf-8')
+
+    # Workers are forked when the server starts, so they see the patched conversion
+    monkeypatch.setattr(conversion_server, '_convert', slow_convert)
+    server = ConversionServer(('127.0.0.1', 0), workers=1, max_pending=1, allow_path_root=str(tmp_path),
+                              request_timeout=0.2)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        response, _ = request(server, 'POST', f'/convert?path={source}')
+        assert response.status == 504
+        # The abandoned conversion still runs, so it still takes up the only slot
+        response, _ = request(server, 'POST', f'/convert?path={source}')
+        assert response.status == 503
+
+        (tmp_path / "data.json.go").touch()
+        deadline = time.time() + 10
+        while server.health()['active'] and time.time() < deadline:
+            time.sleep(0.01)
+        response, data = request(server, 'POST', f'/convert?path={source}')
+        assert response.status == 200
+        assert data.decode('utf-8').splitlines() == ['id', '1']
+    finally:
+        (tmp_path / "data.json.go").touch()
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for writing flattened tables to Excel
+"""
+
+import os
+import sys
+import json
+
+import pandas as pd
+
+# Add parent directory to path to import exporters
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import exporters
+from exporters import analysis_sidecar_path, excel_sheet_name, excel_sheet_ranges, write_excel
+from flattener import FlatTable
+
+
+def test_excel_sheet_ranges_split_at_limits(monkeypatch):
+    assert excel_sheet_ranges(10, 3) == [(0, 10, 0, 3)]
+    monkeypatch.setattr(exporters, 'EXCEL_MAX_ROWS', 5)
+    monkeypatch.setattr(exporters, 'EXCEL_MAX_COLUMNS', 2)
+    assert excel_sheet_ranges(10, 3) == [
+        (0, 4, 0, 2), (0, 4, 2, 3), (4, 8, 0, 2), (4, 8, 2, 3), (8, 10, 0, 2), (8, 10, 2, 3),
+    ]
+    assert excel_sheet_ranges(0, 0) == [(0, 0, 0, 0)]
+    assert excel_sheet_name('Data', 2) == 'Data_3'
+    assert len(excel_sheet_name('x' * 40, 11)) == 31
+
+
+def test_excel_export_rolls_over_to_new_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporters, 'EXCEL_MAX_ROWS', 4)
+    df = FlatTable.from_json([{'id': i, 'name': f"n{i}"} for i in range(7)]).to_dataframe()
+
+    assert write_excel(df, str(tmp_path / "out.xlsx"), "test.json") == ['Data', 'Data_2', 'Data_3']
+    sheets = pd.read_excel(tmp_path / "out.xlsx", sheet_name=None)
+    assert [sheets[name]['id'].tolist() for name in ['Data', 'Data_2', 'Data_3']] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert sheets['Summary'].set_index('Metric').loc['Total Rows', 'Value'] == 7
+
+
+def test_excel_profiles_and_analysis_sidecar(tmp_path):
+    df = FlatTable.from_json([{'id': i, 'name': None if i % 2 else 'x'} for i in range(4)]).to_dataframe()
+
+    write_excel(df, str(tmp_path / "minimal.xlsx"), "test.json", profile='minimal')
+    assert list(pd.read_excel(tmp_path / "minimal.xlsx", sheet_name=None)) == ['Data']
+
+    write_excel(df, str(tmp_path / "standard.xlsx"), "test.json", profile='standard', engine='native')
+    summary = pd.read_excel(tmp_path / "standard.xlsx", sheet_name='Summary').set_index('Metric')
+    assert summary.loc['Total Rows', 'Value'] == 4
+    assert 'Missing Values' not in summary.index
+
+    output = str(tmp_path / "full.xlsx")
+    write_excel(df, output, "test.json", analysis_file=analysis_sidecar_path(output))
+    assert list(pd.read_excel(output, sheet_name=None)) == ['Data']
+    with open(tmp_path / "full.analysis.json", 'r', encoding='utf-8') as file:
+        analysis = json.load(file)
+    assert analysis['data_file'] == "full.xlsx"
+    assert analysis['summary']['Missing Values'] == 2
+    assert analysis['column_details'][1]['Null_Count'] == 2
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared flattening engine
+"""
+
+import os
+import sys
+import json
+import pandas as pd
+from pandas import json_normalize
+
+# Add parent directory to path to import flattener
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import Column, DICTIONARY_MIN_SIZE, FlatTable, PathSelector, parse_path_patterns
+from frame_stats import is_sparse, memory_usage, missing_values, to_dense
+import exporters
+from exporters import write_excel
+import json_to_excel
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples', 'sample_data')
+
+
+def load_sample(name):
+    with open(os.path.join(SAMPLE_DIR, name), 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def normalize(json_data, **kwargs):
+    records = json_data if isinstance(json_data, list) else [json_data]
+    return json_normalize(records, **kwargs)
+
+
+def test_matches_json_normalize_for_samples():
+    """Column names and shape match json_normalize for every sample file"""
+    for name in sorted(os.listdir(SAMPLE_DIR)):
+        if not name.endswith('.json'):
+            continue
+        json_data = load_sample(name)
+        table = FlatTable.from_json(json_data)
+
+        for sep in ("_", "."):
+            expected = normalize(json_data, sep=sep)
+            df = table.to_dataframe(separator=sep)
+            assert list(df.columns) == list(expected.columns), name
+            assert df.shape == expected.shape, name
+
+
+def test_max_level_reuses_full_flattening():
+    """Shallower nesting levels are rebuilt from the full flattening"""
+    json_data = load_sample('employee_records.json')
+    table = FlatTable.from_json(json_data)
+    table.to_dataframe()
+
+    for max_level in (0, 1, 2):
+        expected = normalize(json_data, sep="_", max_level=max_level)
+        df = table.to_dataframe(max_level=max_level)
+        assert list(df.columns) == list(expected.columns)
+        for col in expected.columns:
+            assert df[col].tolist() == expected[col].tolist(), col
+
+
+
+def cells(series):
+    """Return column values with None and NaN both as None, dicts as text to compare their key order"""
+    return [None if value is None or value != value else str(value) if isinstance(value, dict) else value
+            for value in series.tolist()]
+
+
+def test_max_level_keeps_nulls_and_empty_objects_like_json_normalize():
+    """Folded objects keep explicit nulls, empty objects and key order at every nesting level"""
+    samples = [load_sample(name) for name in sorted(os.listdir(SAMPLE_DIR)) if name.endswith('.json')]
+    samples.append([
+        {'id': 1, 'a': {'b': {'c': None, 'd': {}}, 'e': 1, 'f': {}}, 'g': {}},
+        {'id': 2, 'a': {'e': None, 'b': None}},
+        {'id': 3, 'a': {}},
+    ])
+    for json_data in samples:
+        table = FlatTable.from_json(json_data)
+        for max_level in (0, 1, 2, 3):
+            expected = normalize(json_data, sep="_", max_level=max_level)
+            df = table.to_dataframe(max_level=max_level)
+            assert list(df.columns) == list(expected.columns), max_level
+            for col in expected.columns:
+                assert cells(df[col]) == cells(expected[col]), (max_level, col)
+
+def test_separator_change_is_a_rename():
+    """Changing the separator only renames columns of the cached frame"""
+    table = FlatTable.from_json({'a': {'b': 1, 'c': {'d': 'x'}}})
+    underscore = table.to_dataframe(separator="_")
+    dotted = table.to_dataframe(separator=".")
+
+    assert list(underscore.columns) == ['a_b', 'a_c_d']
+    assert list(dotted.columns) == ['a.b', 'a.c.d']
+    assert len(table._frames) == 1
+
+
+def test_remove_nulls_drops_empty_columns():
+    """Columns holding only nulls or empty strings are removed"""
+    table = FlatTable.from_json([
+        {'id': 1, 'note': '', 'extra': None},
+        {'id': 2, 'note': '', 'extra': None, 'tag': 'x'},
+    ])
+    df = table.to_dataframe(remove_nulls=True)
+    assert list(df.columns) == ['id', 'tag']
+    assert df['tag'].isnull().tolist() == [True, False]
+
+    # The unfiltered view is still available afterwards
+    assert list(table.to_dataframe().columns) == ['id', 'note', 'extra', 'tag']
+
+
+def test_rejects_scalar_json():
+    try:
+        FlatTable.from_json(42)
+    except ValueError:
+        pass
+    else:
+        assert False, "Expected ValueError"
+
+
+def test_select_keeps_only_matching_paths():
+    """Unselected subtrees are pruned while walking"""
+    records = [
+        {'id': 1, 'employee': {'name': 'A', 'address': {'city': 'X', 'geo': {'lat': 1}}}, 'notes': 'n'},
+        {'id': 2, 'employee': {'name': 'B', 'address': {'city': 'Y'}}},
+    ]
+    table = FlatTable.from_json(records, select=['id', 'employee.address.*'])
+    assert list(table.to_dataframe().columns) == ['id', 'employee_address_city', 'employee_address_geo_lat']
+    assert ('notes',) not in table.columns
+    assert ('employee', 'name') not in table.columns
+
+    # Folding at a lower level only rebuilds the selected fields
+    folded = table.to_dataframe(max_level=1)
+    assert folded['employee_address'].tolist()[1] == {'city': 'Y'}
+
+
+def test_select_globs_match_single_keys():
+    table = FlatTable.from_json({'a': {'id': 1, 'x': 2}, 'b': {'id': 3}}, select=parse_path_patterns('*.id'))
+    assert list(table.to_dataframe().columns) == ['a_id', 'b_id']
+
+
+def test_select_exclusions_prune_subtrees():
+    records = [{'id': 1, 'employee': {'name': 'A', 'address': {'city': 'X'}}, 'notes': 'n'}]
+    table = FlatTable.from_json(records, select=parse_path_patterns('!employee.address, !notes'))
+    assert list(table.to_dataframe().columns) == ['id', 'employee_name']
+    table = FlatTable.from_json(records, select=['employee', '!*.name'])
+    assert list(table.to_dataframe().columns) == ['employee_address_city']
+    assert PathSelector(['!employee.address']).excludes_below(('employee',))
+
+
+def test_sparse_columns_below_threshold():
+    """Rarely present keys become sparse columns with the same values"""
+    records = [{'id': i, 'status': 'active'} for i in range(20)]
+    records[3]['rare'] = 'x'
+    records[7]['nested'] = {'flag': True}
+    table = FlatTable.from_json(records)
+
+    dense = table.to_dataframe()
+    sparse = table.to_dataframe(sparse_threshold=0.25)
+    assert list(sparse.columns) == list(dense.columns)
+    assert [is_sparse(sparse[col]) for col in sparse.columns] == [False, False, True, True]
+    assert sparse['rare'].sparse.density == 0.05
+    assert to_dense(sparse)['rare'].tolist()[3] == 'x'
+    assert missing_values(sparse) == missing_values(dense) == 38
+    assert memory_usage(sparse) < memory_usage(dense)
+
+
+def test_sparse_frame_exports(tmp_path):
+    records = [{'id': i} for i in range(10)]
+    records[2]['tags'] = ['a', 'b']
+    df = FlatTable.from_json(records).to_dataframe(sparse_threshold=0.5, remove_nulls=True)
+
+    write_excel(df, str(tmp_path / "out.xlsx"), "test.json")
+    summary = pd.read_excel(tmp_path / "out.xlsx", sheet_name='Summary')
+    assert summary.set_index('Metric').loc['Missing Values', 'Value'] == 9
+    data = pd.read_excel(tmp_path / "out.xlsx", sheet_name='Data')
+    assert data['tags'].tolist()[2] == "['a', 'b']"
+
+
+def test_fast_csv_path_matches_pandas_path(tmp_path, monkeypatch):
+    """Small inputs take the pure Python CSV path; its bytes must not change when a file grows past it"""
+    records = [
+        {'id': 1, 'age': 30, 'score': 1.5, 'flag': True, 'name': 'a', 'big': 2 ** 70, 'info': {'x': [1, 2]}},
+        {'id': 2, 'score': 2, 'flag': None, 'name': None, 'big': None, 'mixed': 'b', 'only': None},
+        {'id': 3, 'age': 2, 'score': 1e-07, 'name': '', 'mixed': 4, 'info': {'x': None}},
+    ]
+    source = tmp_path / "records.json"
+    source.write_text(json.dumps(records), encoding='utf-8')
+
+    assert json_to_excel.convert_json_file(str(source), str(tmp_path / "fast.csv"), 'csv')
+    monkeypatch.setattr(json_to_excel, 'FAST_PATH_MAX_BYTES', 0)
+    assert json_to_excel.convert_json_file(str(source), str(tmp_path / "pandas.csv"), 'csv')
+
+    fast = (tmp_path / "fast.csv").read_bytes()
+    assert fast == (tmp_path / "pandas.csv").read_bytes()
+    assert b'1,30.0,1.5,True' in fast
+
+    for sample in sorted(os.listdir(SAMPLE_DIR)):
+        if sample.endswith('.json'):
+            table = FlatTable.from_json(load_sample(sample))
+            table.write_csv(str(tmp_path / "fast.csv"), remove_nulls=True)
+            exporters.write_csv(table.to_dataframe(remove_nulls=True), str(tmp_path / "pandas.csv"))
+            assert (tmp_path / "fast.csv").read_bytes() == (tmp_path / "pandas.csv").read_bytes(), sample
+
+
+def test_repeated_strings_are_dictionary_encoded():
+    records = [{'status': ['active', 'inactive'][i % 2], 'id': i, 'mixed': 'x' if i else 1} for i in range(6)]
+    table = FlatTable.from_json(records)
+
+    status = table.columns[('status',)]
+    assert status.encoded and status.categories == ['active', 'inactive']
+    assert list(status.codes) == [0, 1, 0, 1, 0, 1]
+    # Non-string values fall back to plain storage
+    assert not table.columns[('id',)].encoded
+    assert not table.columns[('mixed',)].encoded
+
+    df = table.to_dataframe(categorical=True)
+    assert str(df['status'].dtype) == 'category'
+    assert df['status'].tolist() == table.to_dataframe()['status'].tolist()
+
+
+def test_mostly_unique_strings_switch_to_plain_values():
+    column = Column()
+    for row in range(DICTIONARY_MIN_SIZE + 1):
+        column.append(row, f"value{row}")
+    assert not column.encoded
+    assert column.decoded()[-1] == f"value{DICTIONARY_MIN_SIZE}"
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for appending records to existing CSV and SQLite outputs
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add parent directory to path to import incremental
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from incremental import KEY_INDEX_SUFFIX, append_records
+from sqlite_writer import SQLiteWriter
+from type_coercion import TypeCoercer
+
+DAY_ONE = [
+    {'id': 1, 'info': {'name': 'a'}, 'tags': ['x']},
+    {'id': 2, 'info': {'name': 'b'}},
+]
+DAY_TWO = [
+    {'id': 2, 'info': {'name': 'B'}, 'tags': ['y', 'z']},
+    {'id': 3, 'info': {'name': 'c', 'vip': True}},
+    {'id': 3, 'info': {'name': 'c2'}},
+]
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return list(csv.reader(file))
+
+
+def test_csv_append_skips_known_keys_and_widens_header(tmp_path):
+    path = str(tmp_path / "history.csv")
+    assert append_records(DAY_ONE, path, key='id') == {'appended': 2, 'skipped': 0, 'replaced': 0, 'columns': 3}
+    result = append_records(DAY_TWO, path, key='id', chunk_records=1)
+    assert result == {'appended': 1, 'skipped': 2, 'replaced': 0, 'columns': 4}
+
+    assert read_csv(path) == [
+        ['id', 'tags', 'info_name', 'info_vip'],
+        ['1', "['x']", 'a', ''],
+        ['2', '', 'b', ''],
+        ['3', '', 'c', 'True'],
+    ]
+    assert os.path.exists(path + KEY_INDEX_SUFFIX)
+
+    # An output rewritten without the index: its keys are read again instead of trusted
+    os.remove(path)
+    assert append_records(DAY_TWO, path, key='id')['appended'] == 2
+    assert [row[0] for row in read_csv(path)] == ['id', '2', '3']
+
+    with pytest.raises(ValueError):
+        append_records(DAY_TWO, path, key='id', on_duplicate='replace')
+
+
+def test_csv_append_removes_nulls_and_converts_types(tmp_path):
+    path = str(tmp_path / "history.csv")
+    records = [{'id': 1, 'gone': None, 'note': '', 'active': 'true'},
+               {'id': 2, 'gone': '', 'note': 'b', 'active': 'false'}]
+    append_records(records, path, remove_nulls=True, coerce=TypeCoercer(infer=True))
+    assert read_csv(path) == [['id', 'note', 'active'], ['1', '', 'True'], ['2', 'b', 'False']]
+
+
+def test_sqlite_append_and_replace_with_child_rows(tmp_path):
+    path = str(tmp_path / "history.db")
+    append_records(DAY_ONE, path, key='id')
+    assert append_records(DAY_TWO, path, key='id')['skipped'] == 2
+
+    result = append_records(DAY_TWO, path, key='id', on_duplicate='replace')
+    assert result == {'appended': 0, 'skipped': 1, 'replaced': 2, 'columns': 3}
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT id, info_name FROM records ORDER BY id").fetchall() == [
+        (1, 'a'), (2, 'B'), (3, 'c2')
+    ]
+    # The replaced row's old child rows are gone, the new ones point at the new row
+    assert connection.execute(
+        "SELECT r.id, t.value FROM records r JOIN records_tags t ON t._parent_id = r._row_id ORDER BY t._row_id"
+    ).fetchall() == [(1, 'x'), (2, 'y'), (2, 'z')]
+    connection.close()
+
+
+def test_sqlite_append_keeps_renamed_columns(tmp_path):
+    path = str(tmp_path / "history.db")
+    # A data column named like the row id column is stored as _row_id_
+    append_records([{'_row_id': 'a', 'n': 1}], path, key='_row_id')
+    records = [{'_row_id': 'a', 'n': 2}, {'_row_id': 'b', 'n': 3}]
+    assert append_records(records, path, key='_row_id')['skipped'] == 1
+    assert append_records(records, path, key='_row_id')['skipped'] == 2
+
+    connection = sqlite3.connect(path)
+    assert [row[1] for row in connection.execute("PRAGMA table_info(records)")] == ['_row_id', '_row_id_', 'n']
+    assert connection.execute("SELECT _row_id_, n FROM records ORDER BY _row_id").fetchall() == [('a', 1), ('b', 3)]
+    connection.close()
+
+    writer = SQLiteWriter(path, append=True)
+    try:
+        writer.create_indexes(['_row_id'])
+    finally:
+        writer.close()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the json_to_excel command line
+"""
+
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# Add parent directory to path to import json_to_excel
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import json_to_excel
+
+RECORDS = [
+    {'id': 1, 'created': '2026-03-01T10:00:00Z', 'amount': '12.50', 'active': 'true'},
+    {'id': 2, 'created': '2026-03-02 08:15', 'amount': '7', 'active': 'false'},
+]
+
+
+def run_main(monkeypatch, *argv):
+    monkeypatch.setattr(sys, 'argv', ['json_to_excel.py', *argv])
+    with pytest.raises(SystemExit) as exit_info:
+        json_to_excel.main()
+    assert not exit_info.value.code
+
+
+def test_sqlite_output_and_append_convert_types(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "data.json"
+    source.write_text(json.dumps(RECORDS), encoding='utf-8')
+    output = str(tmp_path / "out.db")
+
+    run_main(monkeypatch, str(source), output, '--infer-types', '--categorical')
+    printed = capsys.readouterr().out
+    assert 'Converted columns: created (datetime), amount (number), active (bool)' in printed
+    assert 'ignoring them' in printed
+
+    run_main(monkeypatch, str(source), output, '--append', '--coerce', 'amount=number')
+    connection = sqlite3.connect(output)
+    columns = {row[1]: row[2] for row in connection.execute("PRAGMA table_info(records)")}
+    assert columns == {'_row_id': 'INTEGER', 'id': 'INTEGER', 'created': 'TEXT', 'amount': 'REAL',
+                       'active': 'INTEGER'}
+    assert connection.execute("SELECT created, amount, active FROM records ORDER BY _row_id").fetchall() == [
+        ('2026-03-01 10:00:00', 12.5, 1), ('2026-03-02 08:15:00', 7.0, 0),
+        ('2026-03-01T10:00:00Z', 12.5, 'true'), ('2026-03-02 08:15', 7.0, 'false'),
+    ]
+    connection.close()
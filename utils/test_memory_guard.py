@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory budget check used before loading a file
+"""
+
+import json
+import os
+import sys
+
+# Add parent directory to path to import memory_guard
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import memory_guard
+from memory_guard import check_memory_budget, estimate_memory, memory_budget
+
+
+def test_budget_comes_from_argument_or_environment(monkeypatch):
+    monkeypatch.setenv("JSON_TABULAR_MEMORY_BUDGET_MB", "64")
+    assert memory_budget() == 64 * 1024 * 1024
+    assert memory_budget(1.5) == 1536 * 1024
+    monkeypatch.delenv("JSON_TABULAR_MEMORY_BUDGET_MB")
+    assert memory_budget() is None or memory_budget() > 0
+
+
+def test_estimate_extrapolates_from_a_sample(tmp_path):
+    records = [{'id': i, 'name': f"record {i}", 'info': {'score': i / 7, 'tags': ['a', 'b']}} for i in range(5000)]
+    compact = tmp_path / "compact.json"
+    compact.write_text(json.dumps(records), encoding='utf-8')
+    indented = tmp_path / "indented.json"
+    indented.write_text(json.dumps(records, indent=4), encoding='utf-8')
+
+    exact = estimate_memory(str(compact), sample_records=len(records))
+    assert exact['records'] == 5000
+    for path in (compact, indented):
+        sampled = estimate_memory(str(path), sample_records=200)
+        assert 4500 <= sampled['records'] <= 5500
+
+    check = check_memory_budget(str(compact), budget_mb=exact['estimated_bytes'] / 1024 / 1024 / 2)
+    assert not check['fits']
+    assert check_memory_budget(str(compact), budget_mb=1024)['fits']
+
+
+def test_sample_is_capped_by_bytes_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_guard, 'HEAD_BYTES', 1000)
+    parsed = []
+    monkeypatch.setattr(memory_guard, 'deep_size', lambda value: parsed.append(value) or 100)
+
+    # One top-level object larger than the cap is never decoded
+    single = tmp_path / "single.json"
+    single.write_text(json.dumps({'items': list(range(20000))}), encoding='utf-8')
+    estimate = estimate_memory(str(single))
+    assert parsed == []
+    assert estimate['records'] is None
+    assert estimate['estimated_bytes'] > 2 * estimate['file_bytes']
+
+    # Records before the cap are sampled; the one it cuts through is not
+    records = [{'id': 1}, {'id': 2, 'values': list(range(20000))}]
+    array = tmp_path / "array.json"
+    array.write_text(json.dumps(records), encoding='utf-8')
+    assert estimate_memory(str(array))['records'] >= 1
+    assert parsed == [{'id': 1}]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for merging many JSON files into one table
+"""
+
+import csv
+import json
+import os
+import sys
+
+import pandas as pd
+
+# Add parent directory to path to import merge_files
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import exporters
+from merge_files import convert_in_chunks, expand_inputs, merge_json_files, reconcile_kind
+
+
+def write_shards(directory):
+    (directory / "day1.json").write_text(json.dumps([{'id': 1, 'info': {'name': 'a'}, 'code': 5}]), encoding='utf-8')
+    (directory / "day2.ndjson").write_text(
+        '{"id": 2, "code": "X7", "info": {"name": "b", "age": 3}}\n{"id": 3, "score": 1.5}\n', encoding='utf-8'
+    )
+    (directory / "day3.json").write_text(json.dumps({'id': 4, 'score': 2}), encoding='utf-8')
+    (directory / "notes.txt").write_text("ignored", encoding='utf-8')
+
+
+def test_reconcile_kind():
+    assert reconcile_kind({'int'}) == 'int'
+    assert reconcile_kind({'int', 'float'}) == 'float'
+    assert reconcile_kind({'int', 'str'}) == 'str'
+    assert reconcile_kind({'nested'}) == 'str'
+    assert reconcile_kind(set()) == 'float'
+
+
+def test_merge_unions_schemas_in_first_seen_order(tmp_path):
+    write_shards(tmp_path)
+    inputs = expand_inputs([str(tmp_path)])
+    assert [os.path.basename(path) for path in inputs] == ['day1.json', 'day2.ndjson', 'day3.json']
+
+    output = str(tmp_path / "merged.csv")
+    result = merge_json_files(inputs, output, source_column="source_file")
+    assert (result['rows'], result['columns'], result['files']) == (4, 6, 3)
+    assert result['types']['code'] == 'str'
+    assert result['types']['score'] == 'float'
+
+    with open(output, newline='', encoding='utf-8') as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ['source_file', 'id', 'code', 'info_name', 'info_age', 'score']
+    assert rows[1] == ['day1.json', '1', '5', 'a', '', '']
+    # score holds a float in another file, so its integers are written as floats, as pandas would
+    assert rows[4] == ['day3.json', '4', '', '', '', '2.0']
+
+
+def test_merged_csv_matches_converting_the_concatenated_input(tmp_path):
+    ints = [{'id': 1, 'amount': 5, 'count': 2}, {'id': 2, 'amount': 7, 'big': 2 ** 70}]
+    floats = [{'id': 3, 'amount': 2.5, 'count': 4}, {'id': 4, 'amount': None, 'count': 1}]
+    (tmp_path / "ints.json").write_text(json.dumps(ints), encoding='utf-8')
+    (tmp_path / "floats.json").write_text(json.dumps(floats), encoding='utf-8')
+
+    merged = str(tmp_path / "merged.csv")
+    merge_json_files([str(tmp_path / "ints.json"), str(tmp_path / "floats.json")], merged)
+    expected = str(tmp_path / "expected.csv")
+    exporters.write_csv(pd.json_normalize(ints + floats, sep='_'), expected)
+
+    assert (tmp_path / "merged.csv").read_bytes() == (tmp_path / "expected.csv").read_bytes()
+    with open(merged, newline='', encoding='utf-8') as file:
+        assert list(csv.reader(file))[1] == ['1', '5.0', '2.0', '']
+
+
+def test_merge_to_excel(tmp_path):
+    write_shards(tmp_path)
+    output = str(tmp_path / "merged.xlsx")
+    merge_json_files(expand_inputs([str(tmp_path)]), output, where='id > 1')
+
+    data = pd.read_excel(output, sheet_name='Data')
+    assert data['id'].tolist() == [2, 3, 4]
+    details = pd.read_excel(output, sheet_name='Column_Details').set_index('Column_Name')
+    assert details.loc['code', 'Non_Null_Count'] == 1
+
+
+def test_merge_to_excel_rolls_over_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporters, 'EXCEL_MAX_ROWS', 3)
+    monkeypatch.setattr(exporters, 'EXCEL_MAX_COLUMNS', 4)
+    write_shards(tmp_path)
+    output = str(tmp_path / "merged.xlsx")
+    merge_json_files(expand_inputs([str(tmp_path)]), output, source_column="source_file")
+
+    sheets = pd.read_excel(output, sheet_name=None)
+    assert list(sheets) == ['Data', 'Data_2', 'Data_3', 'Data_4', 'Summary', 'Column_Details']
+    assert sheets['Data']['id'].tolist() == [1, 2]
+    assert list(sheets['Data_2'].columns) == ['info_age', 'score']
+    assert sheets['Data_3']['source_file'].tolist() == ['day2.ndjson', 'day3.json']
+    assert sheets['Data_4']['score'].tolist() == [1.5, 2]
+
+
+def test_convert_in_chunks_matches_in_memory_conversion(tmp_path):
+    records = [{'id': i, 'info': {'name': f"n{i}"}, **({'extra': i * 1.5} if i % 4 == 3 else {})} for i in range(10)]
+    source = tmp_path / "records.json"
+    source.write_text(json.dumps(records), encoding='utf-8')
+
+    output = str(tmp_path / "chunked.csv")
+    result = convert_in_chunks(str(source), output, chunk_records=3, where='id != 5')
+    assert (result['rows'], result['columns'], result['chunks']) == (9, 3, 4)
+
+    expected = pd.json_normalize([record for record in records if record['id'] != 5], sep='_')
+    pd.testing.assert_frame_equal(pd.read_csv(output), expected[['id', 'info_name', 'extra']])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-path statistics shown in the GUI's structure tree
+"""
+
+import json
+import os
+import sys
+
+# Add parent directory to path to import path_profile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from path_profile import PathProfile
+from flattener import FlatTable
+from frame_stats import memory_usage
+
+
+def test_profile_counts_paths_types_and_arrays():
+    profile = PathProfile.from_json([
+        {'id': 1, 'employee': {'name': 'A', 'skills': ['x', 'y', 'z']}, 'note': None},
+        {'id': 2, 'employee': {'name': 'B', 'skills': []}, 'note': 2.5},
+        {'id': 3, 'employee': 'unknown'},
+    ])
+    assert profile.count == 3
+    assert list(profile.children) == ['id', 'employee', 'note']
+
+    employee = profile.children['employee']
+    assert employee.count == 3
+    assert employee.type_summary() == "object 2, string 1"
+
+    skills = employee.children['skills']
+    assert skills.dotted == "employee.skills"
+    assert skills.count == 2
+    assert skills.array_summary() == "0–3 (avg 1.5)"
+    assert profile.children['note'].types == {'null': 1, 'number': 1}
+    assert profile.children['id'].array_summary() == ""
+
+
+def test_file_scan_predicts_columns_and_memory(tmp_path):
+    records = [{'id': i, 'info': {'name': f"n{i}", 'tags': ['a'] * (i % 3)}} for i in range(30)]
+    path = tmp_path / "records.ndjson"
+    path.write_text("\n".join(json.dumps(record) for record in records), encoding='utf-8')
+
+    profile = PathProfile.from_file(str(path))
+    assert profile.count == 30
+    assert profile.max_depth == 2
+    assert profile.node(('info', 'tags')).array_distribution() == "0: 10, 1: 10, 2–3: 10"
+
+    for max_level, select in ((None, None), (0, None), (None, ['!info.tags'])):
+        df = FlatTable.from_json(records, select=select).to_dataframe(max_level=max_level)
+        columns = profile.columns(max_level, select)
+        assert ['_'.join(path) for path in columns] == list(df.columns)
+        assert 0.7 < profile.estimated_memory(columns) / memory_usage(df) < 1.3
+    assert "📊 Estimated columns: 3" in profile.report()
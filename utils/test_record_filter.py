@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for row filter expressions
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import record_filter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from record_filter import RecordFilter, compile_filter
+from flattener import FlatTable
+
+RECORDS = [
+    {'id': 1, 'status': 'active', 'date': '2026-02-01', 'employee': {'department': 'Sales', 'score': 4.8}},
+    {'id': 2, 'status': 'inactive', 'date': '2025-12-31', 'employee': {'department': 'Support', 'score': 3.1}},
+    {'id': 3, 'status': 'active', 'date': '2025-06-01', 'employee': {'department': 'Engineering'}},
+    {'id': 4, 'status': 'active', 'date': '2026-01-01T08:00:00Z'},
+]
+
+
+def matching_ids(expression):
+    row_filter = RecordFilter(expression)
+    return [record['id'] for record in RECORDS if row_filter(record)]
+
+
+def test_comparisons_and_boolean_logic():
+    assert matching_ids('status == "active"') == [1, 3, 4]
+    assert matching_ids("status != 'active' or id >= 3") == [2, 3, 4]
+    assert matching_ids('not (status == "active")') == [2]
+    assert matching_ids('1 < id <= 3') == [2, 3]
+
+
+def test_unquoted_iso_dates_compare_as_strings():
+    assert matching_ids('date >= 2026-01-01') == [1, 4]
+    assert matching_ids('date < 2026-01-01T00:00:00Z and status == "active"') == [3]
+
+
+def test_dotted_paths_and_membership():
+    assert matching_ids('employee.department in ["Sales", "Support"]') == [1, 2]
+    assert matching_ids('employee.department not in ("Sales",)') == [2, 3, 4]
+
+
+def test_missing_fields_and_type_mismatches_do_not_match():
+    assert matching_ids('employee.score > 4') == [1]
+    assert matching_ids('employee.score == null') == [3, 4]
+    assert matching_ids('status > 3') == []
+
+
+def test_rejects_unsupported_expressions():
+    for expression in ('__import__("os").system("true")', 'id + 1 == 2', 'status ==', 'lambda: 1'):
+        try:
+            RecordFilter(expression)
+        except ValueError:
+            pass
+        else:
+            assert False, f"Expected ValueError for {expression}"
+    assert compile_filter('  ') is None
+
+
+def test_flat_table_skips_rejected_records():
+    table = FlatTable.from_json(RECORDS, where='employee.department == "Engineering"')
+    df = table.to_dataframe()
+    assert df['id'].tolist() == [3]
+    assert table.n_filtered == 3
+    # Paths seen only in rejected records never become columns
+    assert 'employee_score' not in df.columns
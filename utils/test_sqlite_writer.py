@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming flattened records into SQLite with child tables
+"""
+
+import os
+import sqlite3
+import sys
+
+# Add parent directory to path to import sqlite_writer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sqlite_writer import write_sqlite
+from type_coercion import TypeCoercer
+
+RECORDS = [
+    {'id': 1, 'customer': {'name': 'a'}, 'orders': [{'sku': 'X', 'tags': ['new', 'sale']}, {'sku': 'Y'}]},
+    {'id': 2, 'customer': {'name': 'b', 'vip': True}, 'orders': []},
+    {'id': 3, 'score': 1.5, 'orders': [{'sku': 'Z', 'qty': 2}], 'notes': ['late']},
+]
+
+
+def test_arrays_become_child_tables_across_chunks(tmp_path):
+    path = str(tmp_path / "out.db")
+    result = write_sqlite(RECORDS, path, chunk_records=2, index_columns=['customer_name'])
+    assert result['rows'] == 3
+    assert result['tables'] == {'records': 3, 'records_orders': 3, 'records_orders_tags': 2, 'records_notes': 1}
+
+    connection = sqlite3.connect(path)
+    columns = {row[1]: row[2] for row in connection.execute("PRAGMA table_info(records)")}
+    # Columns first seen in the second chunk are added to the table
+    assert columns == {'_row_id': 'INTEGER', 'id': 'INTEGER', 'customer_name': 'TEXT', 'customer_vip': 'INTEGER',
+                       'score': 'REAL'}
+
+    joined = connection.execute(
+        "SELECT r.id, o._position, o.sku, o.qty, t.value FROM records r "
+        "JOIN records_orders o ON o._parent_id = r._row_id "
+        "LEFT JOIN records_orders_tags t ON t._parent_id = o._row_id ORDER BY o._row_id, t._position"
+    ).fetchall()
+    assert joined == [(1, 0, 'X', None, 'new'), (1, 0, 'X', None, 'sale'), (1, 1, 'Y', None, None),
+                      (3, 0, 'Z', 2, None)]
+    assert connection.execute("SELECT value FROM records_notes WHERE _parent_id = 3").fetchall() == [('late',)]
+
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'idx_records_customer_name', 'idx_records_orders__parent_id'} <= indexes
+    connection.close()
+
+
+def test_options_filter_and_arrays_as_text(tmp_path):
+    path = str(tmp_path / "out.sqlite")
+    result = write_sqlite(RECORDS, path, separator=".", where="id >= 2", select=['id', 'orders'],
+                          child_tables=False, table='orders')
+    assert result == {'rows': 2, 'columns': 2, 'tables': {'orders': 2}}
+
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT id, orders FROM orders ORDER BY id").fetchall() == [
+        (2, '[]'), (3, '[{"sku": "Z", "qty": 2}]')
+    ]
+    connection.close()
+
+    # An existing database is replaced
+    assert write_sqlite([], path)['tables'] == {'records': 0}
+
+
+def test_null_removal_and_type_conversion_match_the_table_view(tmp_path):
+    records = [{'id': 1, 'note': '', 'gone': None, 'created': '2026-03-01T10:00:00Z', 'amount': '12.50'},
+               {'id': 2, 'note': 'b', 'gone': '', 'created': '2026-03-02 08:15', 'amount': '7'}]
+    path = str(tmp_path / "out.db")
+    write_sqlite(records, path, chunk_records=1, remove_nulls=True, coerce=TypeCoercer(infer=True))
+
+    connection = sqlite3.connect(path)
+    columns = {row[1]: row[2] for row in connection.execute("PRAGMA table_info(records)")}
+    # note is added by the chunk that first has a value; gone never has one
+    assert columns == {'_row_id': 'INTEGER', 'id': 'INTEGER', 'created': 'TEXT', 'amount': 'REAL', 'note': 'TEXT'}
+    assert connection.execute("SELECT note, created, amount FROM records ORDER BY id").fetchall() == [
+        (None, '2026-03-01 10:00:00', 12.5), ('b', '2026-03-02 08:15:00', 7.0)
+    ]
+    connection.close()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Guards against heavy imports creeping into command-line start-up
+"""
+
+import os
+import sys
+
+# Add parent directory to path to import benchmark_startup
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from benchmark_startup import heavy_modules_loaded, SAMPLE
+
+
+def test_cli_modules_import_without_heavy_dependencies():
+    for module in ('json_to_excel', 'watch_folder', 'conversion_server', 'flattener', 'exporters', 'frame_stats',
+                   'merge_files', 'batch_jobs', 'xlsx_writer', 'table_query', 'path_profile',
+                   'memory_guard', 'table_file', 'sqlite_writer', 'incremental', 'type_coercion'):
+        assert heavy_modules_loaded(f"import {module}") == [], module
+
+
+def run_cli(*argv):
+    """Return probe code running json_to_excel.main() with the given arguments"""
+    return "\n".join([
+        "import json_to_excel",
+        f"sys.argv = ['json_to_excel.py'] + {list(argv)!r}",
+        "try:",
+        "    json_to_excel.main()",
+        "except SystemExit as e:",
+        "    assert not e.code, e.code",
+    ])
+
+
+def test_help_does_not_import_pandas():
+    assert heavy_modules_loaded(run_cli('--help')) == []
+
+
+def test_small_csv_conversion_uses_pure_python_path(tmp_path):
+    output = str(tmp_path / "out.csv")
+    assert heavy_modules_loaded(run_cli(SAMPLE, output)) == []
+    with open(output, 'r', encoding='utf-8') as file:
+        assert file.readline().startswith('employee_id,skills,projects,personal_name')
+
+
+def test_scan_does_not_import_pandas():
+    assert heavy_modules_loaded(run_cli(SAMPLE, '--scan')) == []
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for saving flattened tables and reopening them without re-flattening
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+# Add parent directory to path to import table_file
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from flattener import FlatTable, conversion_options, flatten_file
+from merge_files import convert_in_chunks
+from table_file import is_table_file, load_table, read_table_metadata, save_table, table_metadata
+
+RECORDS = [
+    {'id': 1, 'info': {'name': 'a', 'tags': ['x', 'y']}, 'code': 5, 'score': 1.5},
+    {'id': 2, 'info': {'name': 'b'}, 'code': 'X7'},
+    {'id': 3, 'flag': True},
+]
+
+
+def test_table_round_trip_keeps_values_and_metadata(tmp_path):
+    df = FlatTable.from_json(RECORDS).to_dataframe(sparse_threshold=0.5)
+    options = conversion_options(sparse_threshold=0.5)
+    path = str(tmp_path / "data.feather")
+    save_table(df, path, table_metadata(df, "data.json", options))
+
+    assert is_table_file(path) and not is_table_file("data.json")
+    metadata = read_table_metadata(path)
+    assert metadata['source'] == "data.json"
+    assert metadata['options'] == options
+    assert metadata['stats']['rows'] == 3 and metadata['stats']['columns'] == len(df.columns)
+
+    loaded, _ = load_table(path)
+    assert list(loaded.columns) == list(df.columns)
+    assert loaded['id'].tolist() == [1, 2, 3]
+    assert loaded['score'].tolist()[0] == 1.5
+    # Mixed columns come back as text, nested values as text
+    assert loaded['code'].fillna('').tolist() == ['5', 'X7', '']
+    assert loaded['info_tags'].tolist()[0] == "['x', 'y']"
+
+    # A saved table is accepted wherever a JSON file is flattened
+    assert flatten_file(path).equals(loaded)
+
+
+def test_chunked_conversion_writes_table_file(tmp_path):
+    source = tmp_path / "data.ndjson"
+    source.write_text("\n".join(json.dumps(record) for record in RECORDS * 3), encoding='utf-8')
+
+    streamed = str(tmp_path / "streamed.feather")
+    result = convert_in_chunks(str(source), streamed, chunk_records=2)
+    assert result['chunks'] == 5
+
+    df, metadata = load_table(streamed)
+    assert metadata['source'] == "data.ndjson"
+    assert metadata['stats']['rows'] == len(df) == 9
+    assert df['info_name'].fillna('').tolist()[:3] == ['a', 'b', '']
+    assert df['code'].fillna('').tolist()[:3] == ['5', 'X7', '']
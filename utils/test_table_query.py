@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the indexed filter, search and sort used by the GUI's table view
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import table_query
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from table_query import TableQuery
+from type_coercion import TypeCoercer
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'employee_name': ["Ann", "Bob", "Cid", "Dee", None],
+        'employee_department': ["Sales", "IT", "Sales", None, "IT"],
+        'age': [31, 25, None, 42, 29],
+        'active': [True, False, True, True, False],
+    })
+
+
+def test_filter_matches_record_filter_semantics():
+    query = TableQuery(sample_frame())
+    assert list(query.filter('employee.department == "Sales"')) == [0, 2]
+    assert list(query.filter('employee_department != "Sales"')) == [1, 3, 4]
+    assert list(query.filter('age >= 29 and active')) == [0, 3]
+    assert list(query.filter('25 < age <= 31')) == [0, 4]
+    assert list(query.filter('age == null or not active')) == [1, 2, 4]
+    assert list(query.filter('employee_department in ["IT", null]')) == [1, 3, 4]
+    assert list(query.filter('age > null')) == []
+    assert list(query.filter('')) == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        query.filter('salary > 10')
+    with pytest.raises(ValueError):
+        query.filter('age >')
+
+
+def test_search_and_sort_return_positions():
+    query = TableQuery(sample_frame())
+    assert list(query.search("sAL")) == [0, 2]
+    assert list(query.sort(query.all_rows(), 'age')) == [1, 4, 0, 3, 2]
+    assert list(query.sort(query.all_rows(), 'age', descending=True)) == [3, 0, 4, 1, 2]
+    assert list(query.view('active', "e", sort_column='employee_name', descending=True)) == [3, 2, 0]
+    assert list(query.view(text="nobody")) == []
+
+
+def test_filters_compare_iso_literals_with_converted_dates():
+    df = pd.DataFrame({
+        'id': [1, 2, 3, 4],
+        'created': ["2025-12-31T23:00:00Z", "2026-01-01T00:30:00+02:00", "2026-02-01", "not a date"],
+    })
+    query = TableQuery(TypeCoercer(infer=False, rules=[('created', 'datetime')]).coerce_frame(df))
+    assert list(query.filter('created >= "2026-01-01"')) == [2]
+    assert list(query.filter('created <= "2026-01-01T00:00:00+01:00"')) == [0, 1]
+    assert list(query.filter('created == "2026-02-01"')) == [2]
+    # Values that did not convert are still found as text
+    assert list(query.filter('created == "not a date"')) == [3]
+    assert list(query.sort(query.all_rows(), 'created', descending=True)) == [3, 2, 0, 1]
+
+    dates = TableQuery(df.assign(created=pd.to_datetime(["2026-01-01", None, "2026-03-01", "2025-01-01"])))
+    assert list(dates.filter('created > "2025-06-30"')) == [0, 2]
+    assert list(dates.sort(dates.all_rows(), 'created')) == [3, 0, 2, 1]
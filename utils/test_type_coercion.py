@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for converting flattened text columns to dates, numbers and booleans
+"""
+
+import csv
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import type_coercion
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from merge_files import convert_in_chunks
+from type_coercion import TypeCoercer, datetime_format, parse_coercion_rules
+
+RECORDS = [
+    {'id': 1, 'created': '2026-03-01T10:00:00Z', 'amount': '12.50', 'active': 'true', 'zip': '01234',
+     'updated_ms': 1767225600000, 'note': 'a'},
+    {'id': 2, 'created': '2026-03-01T12:30:00+02:00', 'amount': '7', 'active': 'false', 'zip': '99999',
+     'updated_ms': None, 'note': 'b'},
+    {'id': 3, 'created': '2026-03-02 08:15', 'amount': 'n/a', 'active': None, 'zip': '10001',
+     'updated_ms': 1767225601500, 'note': 'c'},
+]
+
+
+def test_rules_and_inference_convert_columns():
+    df = pd.DataFrame(RECORDS)
+    coercer = TypeCoercer(parse_coercion_rules("updated_*=epoch_ms, amount=number"), infer=True)
+    converted = coercer.coerce_frame(df)
+
+    assert coercer.coerced == {'created': 'datetime', 'amount': 'number', 'active': 'bool',
+                               'updated_ms': 'epoch_ms'}
+    # Offsets are converted to UTC; a second date format in the column is detected and cached
+    assert converted['created'].tolist() == [pd.Timestamp('2026-03-01 10:00'), pd.Timestamp('2026-03-01 10:30'),
+                                             pd.Timestamp('2026-03-02 08:15')]
+    assert coercer.plans['created'] == ('datetime', ('%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%d %H:%M'))
+    assert converted['updated_ms'].tolist()[0] == pd.Timestamp('2026-01-01')
+    # Values that do not parse are kept as they were
+    assert converted['amount'].tolist() == [12.5, 7.0, 'n/a']
+    assert converted['active'].tolist() == [True, False, None]
+    # Leading zeros look like identifiers, and plain text is left alone
+    assert converted['zip'].tolist() == ['01234', '99999', '10001']
+    assert converted['note'].tolist() == ['a', 'b', 'c']
+
+    assert datetime_format('2026-03-01') == '%Y-%m-%d'
+    assert datetime_format('2026-03-01T10:00:00.250+0100') == '%Y-%m-%dT%H:%M:%S.%f%z'
+    assert datetime_format('March 1') is None
+    with pytest.raises(ValueError):
+        parse_coercion_rules("amount=money")
+
+
+def test_long_integer_ids_are_not_inferred_as_numbers():
+    df = pd.DataFrame({'order_id': ['1234567890123456789', '42'], 'snowflake': ['175928847299117063', None],
+                       'quantity': ['9007199254740992', '3']})
+    coercer = TypeCoercer(infer=True)
+    converted = coercer.coerce_frame(df)
+    # float64 would turn 1234567890123456789 into 1234567890123456768
+    assert converted['order_id'].tolist() == ['1234567890123456789', '42']
+    assert converted['snowflake'].tolist()[0] == '175928847299117063'
+    assert coercer.coerced == {'quantity': 'number'}
+    assert converted['quantity'].tolist() == [2 ** 53, 3]
+
+
+def test_chunked_conversion_reuses_detected_types(tmp_path):
+    source = tmp_path / "data.ndjson"
+    source.write_text("\n".join(json.dumps(record) for record in RECORDS), encoding='utf-8')
+
+    coercer = TypeCoercer(parse_coercion_rules("updated_ms=epoch_ms"), infer=True)
+    result = convert_in_chunks(str(source), str(tmp_path / "out.csv"), chunk_records=1, coerce=coercer)
+    # Decided on the first chunk: later chunks are parsed the same way, even "n/a" stays in its column
+    assert result['types']['created'] == 'datetime'
+    assert result['types']['active'] == 'bool'
+    assert result['types']['amount'] == 'str'
+
+    with open(tmp_path / "out.csv", newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    assert [row['created'] for row in rows] == ['2026-03-01 10:00:00', '2026-03-01 10:30:00', '2026-03-02 08:15:00']
+    assert [row['amount'] for row in rows] == ['12.5', '7', 'n/a']
+    assert rows[2]['updated_ms'] == '2026-01-01 00:00:01.500000'
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the watch-folder conversion service
+"""
+
+import os
+import sys
+import json
+
+# Add parent directory to path to import watch_folder
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from watch_folder import WatchFolderService, MANIFEST_NAME, STATUS_NAME
+
+
+def make_service(tmp_path):
+    return WatchFolderService(
+        str(tmp_path / "in"), str(tmp_path / "out"),
+        workers=1, max_queue=1, poll_interval=0, use_cache=False
+    )
+
+
+def test_converts_settled_files_and_skips_processed_ones(tmp_path):
+    os.makedirs(tmp_path / "in")
+    for name in ("a", "b"):
+        with open(tmp_path / "in" / f"{name}.json", 'w', encoding='utf-8') as file:
+            json.dump([{'id': 1, 'info': {'name': name}}], file)
+    with open(tmp_path / "in" / "broken.json", 'w', encoding='utf-8') as file:
+        file.write("{not json")
+
+    service = make_service(tmp_path)
+    service.start()
+    service.scan()  # First sighting: waits for the files to settle
+    assert service.status()['in_flight'] == 0
+
+    # Queue depth is bounded: the remaining files wait in the backlog
+    service.scan()
+    assert service.status()['backlog'] == 2
+    service.shutdown()
+
+    while service.status()['converted'] + service.status()['failed'] < 3:
+        service.start()
+        service.scan()
+        service.shutdown()
+
+    status = service.status()
+    assert status['converted'] == 2
+    assert status['failed'] == 1
+    assert os.path.exists(tmp_path / "out" / "a_converted.xlsx")
+    assert os.path.exists(tmp_path / "out" / STATUS_NAME)
+    assert not [name for name in os.listdir(tmp_path / "out") if name.startswith('.tmp')]
+
+    with open(tmp_path / "out" / MANIFEST_NAME, 'r', encoding='utf-8') as file:
+        manifest = json.load(file)
+    assert manifest['a.json']['status'] == 'done'
+    assert manifest['broken.json']['status'] == 'failed'
+
+    # A restarted service finds nothing left to do
+    restarted = make_service(tmp_path)
+    restarted.start()
+    restarted.scan()
+    restarted.scan()
+    restarted.shutdown()
+    assert restarted.status()['converted'] == 0
+    assert restarted.status()['backlog'] == 0
+
+
+def test_failed_manifest_write_still_frees_the_slot(tmp_path, capsys):
+    os.makedirs(tmp_path / "in")
+    with open(tmp_path / "in" / "a.json", 'w', encoding='utf-8') as file:
+        json.dump([{'id': 1}], file)
+
+    service = make_service(tmp_path)
+
+    def full_disk(path, data):
+        raise OSError("No space left on device")
+
+    service._write_json_atomic = full_disk
+    service.start()
+    service.scan()
+    service.scan()
+    service.shutdown()
+
+    assert service.status()['converted'] == 1
+    assert 'No space left on device' in capsys.readouterr().err
+    # The only slot was given back, so the watcher keeps taking work
+    assert service._slots.acquire(blocking=False)
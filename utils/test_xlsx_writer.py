@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the native XLSX writer
+"""
+
+import os
+import sys
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# Add parent directory to path to import xlsx_writer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import exporters
+from exporters import write_excel
+from flattener import FlatTable
+from xlsx_writer import column_letter, write_workbook
+
+
+def sample_frame():
+    records = [
+        {'id': i, 'info': {'name': f"n{i % 3}", 'score': i * 1.5 if i % 2 else None}, 'ok': bool(i % 2),
+         'mixed': 'x' if i % 2 else 3, 'note': ' <a & b> ', 'tags': ['a', 'b'] if i == 2 else None}
+        for i in range(7)
+    ]
+    return FlatTable.from_json(records).to_dataframe()
+
+
+def test_column_letters():
+    assert [column_letter(index) for index in (1, 26, 27, 52, 16384)] == ['A', 'Z', 'AA', 'AZ', 'XFD']
+
+
+def test_native_output_matches_openpyxl_output(tmp_path):
+    df = sample_frame()
+    write_excel(df, str(tmp_path / "reference.xlsx"), "test.json")
+    assert write_excel(df, str(tmp_path / "native.xlsx"), "test.json", engine='native') == ['Data']
+
+    native = pd.read_excel(tmp_path / "native.xlsx", sheet_name=None)
+    reference = pd.read_excel(tmp_path / "reference.xlsx", sheet_name=None)
+    assert list(native) == list(reference) == ['Data', 'Summary', 'Column_Details']
+    pd.testing.assert_frame_equal(native['Data'], reference['Data'])
+    pd.testing.assert_frame_equal(native['Column_Details'], reference['Column_Details'])
+    assert native['Data']['tags'].tolist()[2] == "['a', 'b']"
+
+    worksheet = load_workbook(tmp_path / "native.xlsx")['Data']
+    header = worksheet['A1']
+    assert header.font.b and header.font.color.rgb == 'FFFFFFFF' and header.fill.fgColor.rgb == 'FF366092'
+    letter = next(cell.column_letter for cell in worksheet[1] if cell.value == 'note')
+    assert worksheet.column_dimensions[letter].width == len(' <a & b> ') + 2
+
+
+def test_native_writer_splits_at_sheet_limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(exporters, 'EXCEL_MAX_ROWS', 4)
+    sheets = write_excel(sample_frame(), str(tmp_path / "out.xlsx"), "test.json", engine='native')
+    assert sheets == ['Data', 'Data_2', 'Data_3']
+    assert pd.read_excel(tmp_path / "out.xlsx", sheet_name='Data_3')['id'].tolist() == [6]
+
+
+def test_parallel_workbook_is_identical_for_any_worker_count(tmp_path):
+    df = exporters.stringify_nested(sample_frame())
+    sheets = [('All_Data', df, 'data', True)] + [
+        (f"Part_{start}", df.iloc[start:start + 2], 'data', True) for start in range(0, len(df), 2)
+    ] + [('Summary', pd.DataFrame({'Metric': ['Rows'], 'Value': [len(df)]}), 'plain', False)]
+
+    serial, parallel = str(tmp_path / "serial.xlsx"), str(tmp_path / "parallel.xlsx")
+    assert write_workbook(serial, sheets, workers=1) == ['All_Data', 'Part_0', 'Part_2', 'Part_4', 'Part_6',
+                                                         'Summary']
+    write_workbook(parallel, sheets, workers=3)
+    with open(serial, 'rb') as first, open(parallel, 'rb') as second:
+        assert first.read() == second.read()
+
+    # Strings are stored inline in each sheet and read back like shared ones
+    written = pd.read_excel(parallel, sheet_name=None)
+    assert written['All_Data']['note'].tolist() == [' <a & b> '] * len(df)
+    assert written['Part_6']['id'].tolist() == [6]
+    assert written['All_Data']['mixed'].tolist() == [3, 'x', 3, 'x', 3, 'x', 3]
+    assert load_workbook(parallel)['Part_2']['A1'].fill.fgColor.rgb == 'FF366092'
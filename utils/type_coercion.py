@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Type coercion for flattened columns: dates, epoch timestamps, numbers and booleans
+Usage: TypeCoercer(parse_coercion_rules("created_at=datetime,amount=number"), infer=True).coerce_frame(df)
+
+JSON has no date type and APIs often send numbers and booleans as strings, so
+flattened columns end up as Python strings: Excel shows them as text and
+every value costs a string object. A TypeCoercer converts columns chosen by
+rules (column names or glob patterns mapped to a kind) and, with infer=True,
+text columns whose sampled values all look like one kind:
+
+- datetime: ISO-8601 dates and times; values with a UTC offset are converted
+  to UTC and stored without the offset, as Excel cannot hold one
+- epoch_ms: milliseconds since 1970-01-01 (numbers or numeric strings); only
+  applied by rule, as any large integer would pass for one
+- number: integer and decimal strings; integers too long to stay exact as
+  float64 are not inferred, as they are usually identifiers
+- bool: true/false, yes/no, 1/0 (inferred from true/false only)
+
+Columns are parsed whole with pandas' vectorized parsers. The kind of each
+column, and for dates the exact format, is decided once from the first
+values seen and cached, so chunked conversions detect it on the first chunk
+and parse later chunks with a fixed format. Values that do not parse keep
+their original value instead of becoming empty.
+"""
+
+import re
+from fnmatch import fnmatchcase
+
+# Column kinds a rule can ask for
+COERCION_KINDS = ('datetime', 'epoch_ms', 'number', 'bool')
+
+# Values sampled per column when inferring its kind
+INFER_SAMPLE = 200
+
+_BOOL_WORDS = {'true': True, 'false': False, 'yes': True, 'no': False, '1': True, '0': False}
+_INFERRED_BOOL_WORDS = {'true', 'false'}
+
+# Leading zeros (other than "0" or "0.5") suggest an identifier such as a zip code, not a number
+_NUMBER = re.compile(r'^[+-]?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?$|^[+-]?\.\d+$')
+
+# Integers beyond this lose precision as float64, which a column with gaps becomes;
+# longer digit strings are usually identifiers such as order numbers or snowflake IDs
+_MAX_EXACT_INTEGER = 2 ** 53
+
+_ISO_DATETIME = re.compile(
+    r'^\d{4}-\d{2}-\d{2}'
+    r'(?:(?P<sep>[T ])\d{2}:\d{2}(?P<seconds>:\d{2}(?P<fraction>\.\d{1,9})?)?(?P<zone>Z|[+-]\d{2}:?\d{2})?)?$'
+)
+
+
+def parse_coercion_rules(text):
+    """
+    Parse "column=kind" rules separated by commas, e.g. "created_at=datetime, *_ms=epoch_ms"
+
+    Returns:
+        list: (column name or glob pattern, kind) pairs in order, or None if text is empty
+
+    Raises:
+        ValueError: For a rule without a kind or with an unknown kind
+    """
+    if not text or not text.strip():
+        return None
+    rules = []
+    for rule in text.split(','):
+        if not rule.strip():
+            continue
+        pattern, _, kind = rule.partition('=')
+        pattern, kind = pattern.strip(), kind.strip().lower()
+        if not pattern or kind not in COERCION_KINDS:
+            raise ValueError(f"Invalid coercion rule '{rule.strip()}': expected column=kind with kind one of "
+                             f"{', '.join(COERCION_KINDS)}")
+        rules.append((pattern, kind))
+    return rules
+
+
+def datetime_format(text):
+    """Return the strptime format of an ISO-8601 date or time string, or None if it is not one"""
+    match = _ISO_DATETIME.match(text.strip())
+    if match is None:
+        return None
+    fmt = '%Y-%m-%d'
+    if match.group('sep'):
+        fmt += match.group('sep') + '%H:%M'
+        if match.group('seconds'):
+            fmt += ':%S'
+        if match.group('fraction'):
+            fmt += '.%f'
+        if match.group('zone'):
+            fmt += '%z'
+    return fmt
+
+
+def _is_inexact_integer(text):
+    """Return True for an integer string that int64 or float64 cannot hold exactly"""
+    return '.' not in text and 'e' not in text.lower() and abs(int(text)) > _MAX_EXACT_INTEGER
+
+
+def infer_kind(values):
+    """
+    Return (kind, date formats) if every sampled string value looks like one kind, else None
+
+    Args:
+        values (list): Non-null sample values of a column
+    """
+    if not values or not all(isinstance(value, str) for value in values):
+        return None
+    stripped = [value.strip() for value in values]
+    if all(value.lower() in _INFERRED_BOOL_WORDS for value in stripped):
+        return 'bool', ()
+    if all(_NUMBER.match(value) for value in stripped):
+        if any(_is_inexact_integer(value) for value in stripped):
+            return None
+        return 'number', ()
+    formats = []
+    for value in stripped:
+        fmt = datetime_format(value)
+        if fmt is None:
+            return None
+        if fmt not in formats:
+            formats.append(fmt)
+    return 'datetime', tuple(formats)
+
+
+def _to_datetime(text, fmt):
+    """Parse a Series of date strings in one format, missing where a value does not match"""
+    import pandas as pd
+
+    if '%z' in fmt:
+        # Offsets may differ from value to value: convert to UTC, then drop the offset
+        return pd.to_datetime(text, format=fmt, errors='coerce', utc=True).dt.tz_convert(None)
+    return pd.to_datetime(text, format=fmt, errors='coerce')
+
+
+class TypeCoercer:
+    """Converts flattened columns by rule or inference, caching each column's kind and date formats"""
+
+    def __init__(self, rules=None, infer=False):
+        """
+        Args:
+            rules (list): (column name or glob pattern, kind) pairs; the first match wins (default: None)
+            infer (bool): Also convert text columns whose values all look like one kind (default: False)
+        """
+        self.rules = list(rules or [])
+        self.infer = infer
+        # Column name -> (kind, date formats) or None, decided from the first values seen
+        self.plans = {}
+
+    def __bool__(self):
+        return bool(self.rules) or self.infer
+
+    @property
+    def coerced(self):
+        """Return {column: kind} for the columns converted so far"""
+        return {name: plan[0] for name, plan in self.plans.items() if plan is not None}
+
+    def _rule_kind(self, name):
+        for pattern, kind in self.rules:
+            if fnmatchcase(name, pattern):
+                return kind
+        return None
+
+    def _plan(self, name, series):
+        """Return the cached (kind, formats) of a column, deciding it from series if needed"""
+        if name in self.plans:
+            return self.plans[name]
+        present = series.dropna()
+        if present.empty:
+            return None  # Decide once values arrive
+
+        from pandas.api import types
+
+        kind = self._rule_kind(name)
+        sample = present.iloc[:INFER_SAMPLE].tolist()
+        if kind is None:
+            plan = infer_kind(sample) if self.infer and types.is_string_dtype(series.dtype) else None
+        elif kind == 'datetime':
+            formats = []
+            for value in sample:
+                fmt = datetime_format(value) if isinstance(value, str) else None
+                if fmt is not None and fmt not in formats:
+                    formats.append(fmt)
+            plan = (kind, tuple(formats))
+        else:
+            plan = (kind, ())
+        self.plans[name] = plan
+        return plan
+
+    def coerce_series(self, name, series):
+        """Return series converted according to its column's plan (unchanged if it has none)"""
+        import pandas as pd
+        from pandas.api import types
+
+        if isinstance(series.dtype, (pd.SparseDtype, pd.CategoricalDtype)):
+            return series  # Kept in their compact storage
+        plan = self._plan(name, series)
+        if plan is None:
+            return series
+        kind, formats = plan
+
+        if types.is_bool_dtype(series.dtype) or types.is_datetime64_any_dtype(series.dtype):
+            return series  # Already typed
+        if types.is_numeric_dtype(series.dtype):
+            if kind == 'epoch_ms':
+                return pd.to_datetime(series, unit='ms', errors='coerce')
+            if kind == 'bool':
+                parsed = series.map({1: True, 0: False})
+            else:
+                return series
+        elif kind == 'datetime':
+            parsed = self._parse_datetime(name, series, formats)
+        elif kind == 'epoch_ms':
+            parsed = pd.to_datetime(pd.to_numeric(series, errors='coerce'), unit='ms', errors='coerce')
+        elif kind == 'number':
+            parsed = pd.to_numeric(series, errors='coerce')
+        else:
+            parsed = self._parse_bool(series)
+
+        failed = parsed.isna() & series.notna()
+        if failed.any():
+            # Keep what did not parse rather than losing it
+            parsed = parsed.astype(object)
+            parsed[failed] = series[failed]
+        return parsed
+
+    def _parse_datetime(self, name, series, formats):
+        """Parse date strings with the column's cached formats, learning formats of values that fail"""
+        import pandas as pd
+
+        text = series
+        if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+            text = series.where(series.map(lambda value: isinstance(value, str)))
+        formats = list(formats)
+        if formats:
+            parsed = _to_datetime(text, formats[0])
+        else:
+            parsed = pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+        position = 1 if formats else 0
+        while True:
+            remaining = text.notna() & parsed.isna()
+            if not remaining.any():
+                break
+            if position == len(formats):
+                # Values in a format not seen yet: detect it from the first one and cache it
+                fmt = next((fmt for fmt in map(datetime_format, text[remaining]) if fmt not in formats), None)
+                if fmt is None:
+                    break
+                formats.append(fmt)
+                self.plans[name] = ('datetime', tuple(formats))
+            parsed[remaining] = _to_datetime(text[remaining], formats[position]).astype(parsed.dtype)
+            position += 1
+        return parsed
+
+    @staticmethod
+    def _parse_bool(series):
+        """Map boolean words and 1/0 to True/False; anything else becomes missing"""
+        parsed = series.map(_BOOL_WORDS)
+        unmatched = parsed.isna() & series.notna()
+        if unmatched.any():
+            # Other spellings, e.g. " TRUE"
+            parsed[unmatched] = series[unmatched].astype(str).str.strip().str.lower().map(_BOOL_WORDS)
+        return parsed.astype(object).where(parsed.notna(), None)
+
+    def coerce_frame(self, df):
+        """Return a copy of df with every planned column converted"""
+        df = df.copy(deep=False)
+        for position, name in enumerate(df.columns):
+            column = df.iloc[:, position]
+            converted = self.coerce_series(str(name), column)
+            if converted is not column:
+                df.isetitem(position, converted)
+        return df
+
+    def coerce_values(self, name, values):
+        """Convert a list of column values, returning plain Python values with None for missing"""
+        import pandas as pd
+
+        if not self:
+            return values
+        series = pd.Series(values, dtype=object)
+        converted = self.coerce_series(name, series)
+        if converted is series:
+            return values
+        missing = converted.isna().to_numpy()
+        return [None if empty else value.to_pydatetime() if isinstance(value, pd.Timestamp) else value
+                for value, empty in zip(converted.astype(object).tolist(), missing)]
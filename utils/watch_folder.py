@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Headless service that watches a directory and converts JSON files as they land
+Usage: python watch_folder.py input_dir output_dir [--workers 4]
+
+New or modified *.json files are converted to Excel by a pool of worker
+processes. Outputs are written atomically, files already converted are
+skipped via a manifest kept in the output directory, and throughput/backlog
+counters are written to status.json after every scan.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add this directory to path to import the converter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+MANIFEST_NAME = ".watch_manifest.json"
+STATUS_NAME = "status.json"
+
+# Conversion cache shared by the conversions run in one worker process
+_worker_cache = None
+
+
+def _init_worker():
+    """Leave Ctrl+C handling to the service so workers finish their current file"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _convert_file(input_path, output_path, separator, max_level, use_cache):
+    """
+    Convert one file in a worker process, writing the output atomically
+
+    Returns:
+        tuple: (success, error message or None, seconds taken)
+    """
+    global _worker_cache
+    from json_to_excel import json_to_excel
+    from conversion_cache import ConversionCache
+
+    if use_cache and _worker_cache is None:
+        try:
+            _worker_cache = ConversionCache()
+        except OSError:
+            use_cache = False
+
+    started = time.perf_counter()
+    output_dir = os.path.dirname(output_path)
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, prefix=".tmp_", suffix=".xlsx")
+    os.close(fd)
+
+    # json_to_excel reports progress and errors on stdout
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            success = json_to_excel(input_path, tmp_path, separator, max_level,
+                                    cache=_worker_cache if use_cache else None)
+        if success:
+            os.replace(tmp_path, output_path)
+            return True, None, time.perf_counter() - started
+        errors = [line for line in log.getvalue().splitlines() if line.startswith("❌")]
+        return False, errors[-1] if errors else "Conversion failed", time.perf_counter() - started
+    except Exception as e:
+        return False, str(e), time.perf_counter() - started
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class WatchFolderService:
+    """Continuously convert JSON files dropped into a directory"""
+
+    def __init__(self, input_dir, output_dir, workers=None, max_queue=None,
+                 poll_interval=2.0, separator="_", max_level=None, use_cache=True):
+        """
+        Args:
+            input_dir (str): Directory to watch for *.json files
+            output_dir (str): Directory receiving the Excel outputs
+            workers (int): Worker processes (default: CPU count)
+            max_queue (int): Maximum files submitted but not finished (default: 2 per worker)
+            poll_interval (float): Seconds between directory scans (default: 2.0)
+            separator (str): Separator for nested keys (default: "_")
+            max_level (int): Maximum nesting level to flatten (default: None - all levels)
+            use_cache (bool): Reuse cached flattened results (default: True)
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue or self.workers * 2
+        self.poll_interval = poll_interval
+        self.separator = separator
+        self.max_level = max_level
+        self.use_cache = use_cache
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.status_path = os.path.join(output_dir, STATUS_NAME)
+        self.manifest = self._load_manifest()
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._stop = threading.Event()
+        self._executor = None
+
+        # (size, mtime_ns) seen on the previous scan, to wait for writes to settle
+        self._last_seen = {}
+        self._in_flight = set()
+
+        self.started_at = time.time()
+        self.counters = {
+            'converted': 0,
+            'failed': 0,
+            'bytes_converted': 0,
+            'in_flight': 0,
+            'backlog': 0,
+        }
+
+    def _load_manifest(self):
+        """Load the record of processed files from the output directory"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json_atomic(self, path, data):
+        """Write JSON via a temporary file so readers never see partial content"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=2)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _output_path(self, name):
+        return os.path.join(self.output_dir, f"{os.path.splitext(name)[0]}_converted.xlsx")
+
+    def _pending_files(self):
+        """Return settled input files that are new or changed since their last conversion"""
+        pending = []
+        seen = {}
+        for entry in os.scandir(self.input_dir):
+            if not entry.is_file() or not entry.name.lower().endswith('.json'):
+                continue
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime_ns)
+            seen[entry.name] = signature
+
+            # Only pick up files whose size and mtime held steady for one scan
+            if self._last_seen.get(entry.name) != signature:
+                continue
+            if entry.name in self._in_flight:
+                continue
+            # Converted or failed files are retried only once they change
+            record = self.manifest.get(entry.name)
+            if record and (record.get('size'), record.get('mtime_ns')) == signature:
+                continue
+            pending.append((entry.name, entry.path, signature))
+
+        self._last_seen = seen
+        return pending
+
+    def scan(self):
+        """Submit pending files to the worker pool without exceeding the queue bound"""
+        pending = self._pending_files()
+        submitted = 0
+        for name, path, signature in pending:
+            if not self._slots.acquire(blocking=False):
+                break
+            with self._lock:
+                self._in_flight.add(name)
+                self.counters['in_flight'] += 1
+            future = self._executor.submit(
+                _convert_file, path, self._output_path(name),
+                self.separator, self.max_level, self.use_cache
+            )
+            future.add_done_callback(
+                lambda done, name=name, signature=signature: self._finished(name, signature, done)
+            )
+            submitted += 1
+
+        with self._lock:
+            self.counters['backlog'] = len(pending) - submitted
+        self.write_status()
+
+    def _finished(self, name, signature, future):
+        """Record the outcome of a conversion and free its queue slot, even if the manifest cannot be written"""
+        try:
+            self._record_outcome(name, signature, future)
+        finally:
+            self._slots.release()
+
+    def _record_outcome(self, name, signature, future):
+        """Update the counters and the manifest with a finished conversion"""
+        try:
+            success, error, seconds = future.result()
+        except Exception as e:
+            success, error, seconds = False, str(e), 0.0
+
+        with self._lock:
+            self._in_flight.discard(name)
+            self.counters['in_flight'] -= 1
+            if success:
+                self.counters['converted'] += 1
+                self.counters['bytes_converted'] += signature[0]
+            else:
+                self.counters['failed'] += 1
+            self.manifest[name] = {
+                'status': 'done' if success else 'failed',
+                'size': signature[0],
+                'mtime_ns': signature[1],
+                'output': self._output_path(name) if success else None,
+                'error': error,
+                'seconds': round(seconds, 3),
+                'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            }
+            try:
+                self._write_json_atomic(self.manifest_path, self.manifest)
+            except OSError as e:
+                # The record stays in memory and is written with the next outcome
+                print(f"⚠️  Could not write the manifest {self.manifest_path}: {e}", file=sys.stderr)
+
+    def status(self):
+        """Return the current counters with derived throughput figures"""
+        with self._lock:
+            status = dict(self.counters)
+        uptime = max(time.time() - self.started_at, 1e-9)
+        status['uptime_seconds'] = round(uptime, 1)
+        status['files_per_second'] = round(status['converted'] / uptime, 3)
+        status['mb_per_second'] = round(status['bytes_converted'] / 1024 / 1024 / uptime, 3)
+        return status
+
+    def write_status(self):
+        """Publish the counters to status.json in the output directory"""
+        try:
+            self._write_json_atomic(self.status_path, self.status())
+        except OSError:
+            pass
+
+    def start(self):
+        """Start the worker pool"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def stop(self):
+        """Ask run_forever() to return after the current scan"""
+        self._stop.set()
+
+    def shutdown(self):
+        """Wait for in-flight conversions and stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.write_status()
+
+    def run_forever(self):
+        """Scan the input directory every poll_interval seconds until stopped"""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                self.scan()
+                self._stop.wait(self.poll_interval)
+        finally:
+            self.shutdown()
+
+
+def main():
+    """Main function for command-line usage"""
+    parser = argparse.ArgumentParser(description="Watch a directory and convert JSON files to Excel as they arrive")
+    parser.add_argument("input_dir", help="Directory to watch for JSON files")
+    parser.add_argument("output_dir", help="Directory for Excel outputs, manifest and status.json")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=None, help="Maximum files queued for conversion (default: 2 per worker)")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between scans (default: 2)")
+    parser.add_argument("--separator", default="_", help="Separator for nested keys (default: _)")
+    parser.add_argument("--max-level", type=int, default=None, help="Maximum nesting level to flatten (default: all levels)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse and re-flatten inputs")
+    args = parser.parse_args()
+
+    service = WatchFolderService(
+        args.input_dir, args.output_dir,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        poll_interval=args.interval,
+        separator=args.separator,
+        max_level=args.max_level,
+        use_cache=not args.no_cache
+    )
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: service.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: service.stop())
+
+    print(f"👀 Watching {args.input_dir} → {args.output_dir} ({service.workers} workers)")
+    service.run_forever()
+    status = service.status()
+    print(f"👋 Stopped. Converted: {status['converted']}, failed: {status['failed']}")
+
+
+if __name__ == "__main__":
+    main()
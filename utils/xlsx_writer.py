@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Direct XLSX writer for large exports
+Usage: write_excel(df, "out.xlsx", "data.json", engine="native")
+
+Writes worksheet XML straight from DataFrame columns into the zip container
+instead of going through openpyxl cell objects. String columns are
+dictionary-encoded once (pd.factorize) into the shared strings table, numeric
+columns are converted to text a column at a time, and rows are streamed to the
+zip in chunks so memory stays proportional to one chunk of XML.
+
+The output uses the same header styling as the openpyxl exports: bold white
+text on a blue fill for data sheets, and pandas' bold bordered header for the
+Summary and Column_Details sheets.
+
+write_workbook() renders the sheets of a multi-sheet export in worker
+processes. Each sheet is then self-contained (its strings are written inline
+instead of into the shared table), and the parts are added in sheet order
+with fixed timestamps, so the file is identical for any number of workers.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from xml.sax.saxutils import escape
+
+# Rows converted to XML and written per step
+CHUNK_ROWS = 10000
+
+# Widths match the openpyxl exports: longest value + 2, capped at 50 characters
+MAX_COLUMN_WIDTH = 50
+
+# Cell styles, as indexes into cellXfs in STYLES_XML
+STYLE_DATA_HEADER = 1
+STYLE_HEADER = 2
+STYLE_DATETIME = 3
+
+_HEADER_STYLES = {'data': STYLE_DATA_HEADER, 'plain': STYLE_HEADER}
+
+# Characters XML 1.0 cannot hold; openpyxl refuses them, here they are dropped
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+STYLES_XML = _XML_HEADER + (
+    f'<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+    '<fonts count="3">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FF366092"/><bgColor rgb="FF366092"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="2" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="top"/></xf>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index):
+    """Return the Excel column letter for a 1-based column index"""
+    letters = ''
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xml_text(value):
+    """Escape a string for an XML text node"""
+    return escape(_ILLEGAL_XML_CHARS.sub('', value))
+
+
+def _string_item(value):
+    """Return the <t> element of a string, keeping leading and trailing spaces"""
+    if value != value.strip():
+        return f'<t xml:space="preserve">{_xml_text(value)}</t>'
+    return f'<t>{_xml_text(value)}</t>'
+
+
+def _string_cell(reference, value, strings, style=None):
+    """Return a string cell, in the shared strings table or inline if strings is None"""
+    style = f' s="{style}"' if style is not None else ''
+    if strings is None:
+        return f'<c r="{reference}"{style} t="inlineStr"><is>{_string_item(value)}</is></c>'
+    return f'<c r="{reference}"{style} t="s"><v>{strings.add(value)}</v></c>'
+
+
+def _zip_info(name):
+    """Return a deflated zip entry with a fixed timestamp, so equal workbooks are equal files"""
+    info = zipfile.ZipInfo(name, date_time=_ZIP_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+class SharedStrings:
+    """Shared strings table; each distinct string is stored once"""
+
+    def __init__(self):
+        self.index = {}
+        self.count = 0
+
+    def add(self, value):
+        """Return the table index of value, adding it if new"""
+        self.count += 1
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.index)
+        return position
+
+    def add_many(self, values, uses):
+        """Return table indexes for distinct values used `uses` times in total"""
+        self.count += uses
+        positions = []
+        for value in values:
+            position = self.index.get(value)
+            if position is None:
+                position = self.index[value] = len(self.index)
+            positions.append(position)
+        return positions
+
+    def to_xml(self):
+        """Return the sharedStrings.xml part"""
+        items = ''.join(f'<si>{_string_item(value)}</si>' for value in self.index)
+        return (f'{_XML_HEADER}<sst xmlns="{_MAIN_NS}" count="{self.count}" uniqueCount="{len(self.index)}">'
+                f'{items}</sst>')
+
+
+class XlsxWorkbook:
+    """XLSX file written sheet by sheet; use as a context manager"""
+
+    def __init__(self, output_file):
+        """
+        Args:
+            output_file (str): Path to the .xlsx file to create
+        """
+        self.output_file = output_file
+        self.sheet_names = []
+        self.strings = SharedStrings()
+        self.zip = zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.zip.close()
+
+    def add_sheet(self, name, df, header_style='plain', auto_width=False):
+        """
+        Write df as a worksheet with a header row
+
+        Args:
+            name (str): Sheet name (at most 31 characters)
+            df (DataFrame): Data; list/dict values must already be strings
+            header_style (str): 'data' (white on blue) or 'plain' (bold, bordered) (default: 'plain')
+            auto_width (bool): Size columns to their longest value (default: False)
+        """
+        self.sheet_names.append(name)
+        with self.zip.open(_zip_info(f"xl/worksheets/sheet{len(self.sheet_names)}.xml"), 'w',
+                           force_zip64=True) as part:
+            write_sheet_xml(part, df, header_style, auto_width, self.strings)
+
+    def add_sheet_file(self, name, sheet_file):
+        """Add a worksheet already rendered by render_sheet()"""
+        self.sheet_names.append(name)
+        with open(sheet_file, 'rb') as source, \
+                self.zip.open(_zip_info(f"xl/worksheets/sheet{len(self.sheet_names)}.xml"), 'w',
+                              force_zip64=True) as part:
+            shutil.copyfileobj(source, part)
+
+    def close(self):
+        """Write the workbook, styles and shared strings parts and close the file"""
+        sheets = ''.join(
+            f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{index}" r:id="rId{index}"/>'
+            for index, name in enumerate(self.sheet_names, 1)
+        )
+        self.zip.writestr(_zip_info("xl/workbook.xml"),
+                          f'{_XML_HEADER}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+                          f'<sheets>{sheets}</sheets></workbook>')
+
+        n_sheets = len(self.sheet_names)
+        relationships = ''.join(
+            f'<Relationship Id="rId{index}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, n_sheets + 1)
+        )
+        relationships += (f'<Relationship Id="rId{n_sheets + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+                          f'<Relationship Id="rId{n_sheets + 2}" Type="{_REL_NS}/sharedStrings" '
+                          f'Target="sharedStrings.xml"/>')
+        self.zip.writestr(_zip_info("xl/_rels/workbook.xml.rels"),
+                          f'{_XML_HEADER}<Relationships xmlns="{_PKG_REL_NS}">{relationships}</Relationships>')
+        self.zip.writestr(_zip_info("xl/styles.xml"), STYLES_XML)
+        self.zip.writestr(_zip_info("xl/sharedStrings.xml"), self.strings.to_xml())
+
+        self.zip.writestr(_zip_info("_rels/.rels"), f'{_XML_HEADER}<Relationships xmlns="{_PKG_REL_NS}">'
+                                                    f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" '
+                                                    f'Target="xl/workbook.xml"/></Relationships>')
+
+        content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+        overrides = ''.join(
+            f'<Override PartName="/xl/worksheets/sheet{index}.xml" ContentType="{content_type}.worksheet+xml"/>'
+            for index in range(1, n_sheets + 1)
+        )
+        self.zip.writestr(_zip_info("[Content_Types].xml"), (
+            f'{_XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{content_type}.sheet.main+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{content_type}.styles+xml"/>'
+            f'<Override PartName="/xl/sharedStrings.xml" ContentType="{content_type}.sharedStrings+xml"/>'
+            f'{overrides}</Types>'
+        ))
+        self.zip.close()
+
+
+def write_sheet_xml(part, df, header_style='plain', auto_width=False, strings=None):
+    """
+    Write the worksheet XML of df to a binary file object
+
+    Args:
+        part (file): Binary file object, e.g. a zip entry opened for writing
+        df (DataFrame): Data; list/dict values must already be strings
+        header_style (str): 'data' (white on blue) or 'plain' (bold, bordered) (default: 'plain')
+        auto_width (bool): Size columns to their longest value (default: False)
+        strings (SharedStrings): Table for string values (default: None - strings written inline)
+    """
+    letters = [column_letter(index) for index in range(1, len(df.columns) + 1)]
+    last_cell = f"{letters[-1]}{len(df) + 1}" if letters else "A1"
+
+    part.write(f'{_XML_HEADER}<worksheet xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+               f'<dimension ref="A1:{last_cell}"/>'.encode('utf-8'))
+    if auto_width and letters:
+        part.write(_cols_xml(df).encode('utf-8'))
+    part.write(b'<sheetData>')
+
+    style = _HEADER_STYLES[header_style]
+    header = ''.join(_string_cell(f"{letter}1", str(column), strings, style)
+                     for letter, column in zip(letters, df.columns))
+    part.write(f'<row r="1">{header}</row>'.encode('utf-8'))
+
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS]
+        first_row = start + 2
+        columns = [
+            _column_cells(chunk.iloc[:, position], letter, first_row, strings)
+            for position, letter in enumerate(letters)
+        ]
+        part.write(''.join(
+            f'<row r="{row}">{"".join(cells)}</row>'
+            for row, cells in enumerate(zip(*columns), first_row)
+        ).encode('utf-8'))
+
+    part.write(b'</sheetData></worksheet>')
+
+
+def _cols_xml(df):
+    """Return the <cols> element sizing each column like the openpyxl exports"""
+    widths = []
+    for position, column in enumerate(df.columns, 1):
+        lengths = df.iloc[:, position - 1].dropna().astype(str).str.len()
+        longest = max(len(str(column)), int(lengths.max()) if len(lengths) else 0)
+        width = min(longest + 2, MAX_COLUMN_WIDTH)
+        widths.append(f'<col min="{position}" max="{position}" width="{width}" customWidth="1"/>')
+    return f"<cols>{''.join(widths)}</cols>"
+
+
+def _column_cells(series, letter, first_row, strings):
+    """Return the cell XML of one column for consecutive rows ('' for empty cells)"""
+    import numpy as np
+    import pandas as pd
+    from pandas.api import types
+
+    rows = range(first_row, first_row + len(series))
+    missing = series.isna().to_numpy()
+
+    if types.is_bool_dtype(series.dtype):
+        values = series.to_numpy(dtype=object)
+        return ['' if empty else f'<c r="{letter}{row}" t="b"><v>{int(value)}</v></c>'
+                for row, value, empty in zip(rows, values, missing)]
+
+    if types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        missing = ~np.isfinite(values)
+        if types.is_integer_dtype(series.dtype):
+            text = series.to_numpy(dtype=object, na_value=0)
+        else:
+            text = values.astype(str)
+        return ['' if empty else f'<c r="{letter}{row}"><v>{value}</v></c>'
+                for row, value, empty in zip(rows, text, missing)]
+
+    if types.is_datetime64_any_dtype(series.dtype):
+        if getattr(series.dt, 'tz', None) is not None:
+            series = series.dt.tz_localize(None)
+        serials = ((series - pd.Timestamp('1899-12-30')) / pd.Timedelta(days=1)).to_numpy(dtype=float,
+                                                                                       na_value=np.nan)
+        return ['' if empty else f'<c r="{letter}{row}" s="{STYLE_DATETIME}"><v>{value}</v></c>'
+                for row, value, empty in zip(rows, serials, missing)]
+
+    if types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+        # Dictionary-encode: each distinct string is looked up (or escaped) once
+        codes, uniques = pd.factorize(series)
+        if strings is None:
+            items = np.array([f'<is>{_string_item(value)}</is>' for value in uniques] + [''], dtype=object)
+            return ['' if code < 0 else f'<c r="{letter}{row}" t="inlineStr">{item}</c>'
+                    for row, code, item in zip(rows, codes, items[codes])]
+        positions = np.array(strings.add_many(list(uniques), int((codes >= 0).sum())) + [-1])
+        return ['' if code < 0 else f'<c r="{letter}{row}" t="s"><v>{position}</v></c>'
+                for row, code, position in zip(rows, codes, positions[codes])]
+
+    # Mixed values, one cell at a time
+    cells = []
+    for row, value, empty in zip(rows, series.to_numpy(dtype=object), missing):
+        if empty:
+            cells.append('')
+        elif isinstance(value, (bool, np.bool_)):
+            cells.append(f'<c r="{letter}{row}" t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float, np.integer, np.floating)) and np.isfinite(value):
+            cells.append(f'<c r="{letter}{row}"><v>{value}</v></c>')
+        else:
+            cells.append(_string_cell(f"{letter}{row}", str(value), strings))
+    return cells
+
+
+def render_sheet(df, sheet_file, header_style='plain', auto_width=False):
+    """Write the self-contained worksheet XML of df to sheet_file (run in worker processes)"""
+    with open(sheet_file, 'wb') as part:
+        write_sheet_xml(part, df, header_style, auto_width)
+    return sheet_file
+
+
+def write_workbook(output_file, sheets, workers=None):
+    """
+    Write several sheets to one XLSX file, rendering them in parallel
+
+    Args:
+        output_file (str): Path to the .xlsx file to create
+        sheets (list): (name, DataFrame, header_style, auto_width) for each sheet in order
+        workers (int): Worker processes (default: None - CPU count; 1 renders in this process)
+
+    Returns:
+        list: Names of the sheets written
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(workers or os.cpu_count() or 1, len(sheets)) or 1
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_file)), prefix=".tmp_") as tmp_dir:
+        files = [os.path.join(tmp_dir, f"sheet{index}.xml") for index in range(1, len(sheets) + 1)]
+        with XlsxWorkbook(output_file) as workbook:
+            if workers == 1:
+                for (name, df, header_style, auto_width), sheet_file in zip(sheets, files):
+                    workbook.add_sheet_file(name, render_sheet(df, sheet_file, header_style, auto_width))
+                    os.remove(sheet_file)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    # Largest sheets first, so a big sheet does not start last and finish alone
+                    order = sorted(range(len(sheets)), key=lambda index: -sheets[index][1].size)
+                    futures = {index: executor.submit(render_sheet, sheets[index][1], files[index], *sheets[index][2:])
+                               for index in order}
+                    # Sheets are compressed into the file in order while later ones are still rendering
+                    for index, (name, *_) in enumerate(sheets):
+                        workbook.add_sheet_file(name, futures[index].result())
+                        os.remove(files[index])
+    return [name for name, *_ in sheets]